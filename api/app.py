@@ -1,18 +1,39 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from config import settings
+from api.metrics import MetricsMiddleware
+from api.timing import TimingMiddleware
 from api.routers import stocks, crypto
+from api.routers.crypto import crypto_pool, crypto_service, ticker_hubs
+from services import StockService
+from services import indicators, metrics, singleflight
+from services.cassette import cassettes
+from services.rate_limit import scheduler as rate_limits
+from services.resilience import guards, track_staleness
+from services.warmup import CacheWarmer
 
 
 def create_app() -> FastAPI:
     """Create and configure FastAPI application"""
     
+    warmer = CacheWarmer.for_watchlist(crypto_service)
+    
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        warmer.start()
+        try:
+            yield
+        finally:
+            await warmer.stop()
+    
     app = FastAPI(
         title=settings.API_TITLE,
         version=settings.API_VERSION,
         description=settings.API_DESCRIPTION,
         docs_url="/docs",
-        redoc_url="/redoc"
+        redoc_url="/redoc",
+        lifespan=lifespan
     )
     
     # Add CORS middleware
@@ -24,6 +45,24 @@ def create_app() -> FastAPI:
         allow_headers=["*"],
     )
     
+    @app.middleware("http")
+    async def flag_stale_responses(request: Request, call_next):
+        # Set when a circuit breaker forced a fallback to old cached data
+        with track_staleness() as stale:
+            response = await call_next(request)
+        if stale:
+            response.headers["Warning"] = '110 - "Response is Stale"'
+            response.headers["X-Data-Stale"] = ",".join(sorted(stale))
+            response.headers["X-Data-Age"] = str(int(max(stale.values())))
+        return response
+    
+    if settings.SERVER_TIMING_ENABLED or settings.TIMING_LOG_ENABLED or settings.PROFILING_TOKEN:
+        app.add_middleware(TimingMiddleware)
+    
+    if settings.METRICS_ENABLED:
+        # Added last so it is outermost and times the other middleware too
+        app.add_middleware(MetricsMiddleware)
+    
     # Include routers
     app.include_router(stocks.router, prefix="/api/v1/stocks", tags=["stocks"])
     app.include_router(crypto.router, prefix="/api/v1/crypto", tags=["crypto"])
@@ -41,6 +80,30 @@ def create_app() -> FastAPI:
     async def health_check():
         return {"status": "healthy"}
     
+    @app.get("/cache/stats")
+    async def cache_stats():
+        return {
+            "stocks": StockService.cache_stats(),
+            "crypto": crypto_pool.cache_stats(),
+            "singleflight": singleflight.group.stats(),
+            "rate_limits": rate_limits.stats(),
+            "upstream": guards.stats(),
+            "cassettes": cassettes.stats(),
+            "indicators": indicators.engine.stats(),
+            "live": {exchange_id: hub.stats() for exchange_id, hub in ticker_hubs.items()},
+            "warmup": warmer.stats()
+        }
+    
+    if settings.METRICS_ENABLED:
+        metrics.register_caches("stock", StockService.cache_stats)
+        metrics.register_caches("api", lambda: [
+            cache for caches in crypto_pool.cache_stats().values() for cache in caches
+        ])
+        
+        @app.get("/metrics", include_in_schema=False)
+        async def prometheus_metrics():
+            return Response(metrics.registry.render(), media_type=metrics.CONTENT_TYPE)
+    
     return app
 
 
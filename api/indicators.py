@@ -0,0 +1,35 @@
+from fastapi import HTTPException, Query
+from pydantic import ValidationError
+from models.common import IndicatorParams, SUPPORTED_INDICATORS
+
+
+def indicator_params(
+    indicators: str = Query(default=",".join(SUPPORTED_INDICATORS), description="Comma-separated indicators (sma, ema, rsi, macd, bbands, vwap)"),
+    sma_period: int = Query(default=20, description="SMA window"),
+    ema_period: int = Query(default=20, description="EMA span"),
+    rsi_period: int = Query(default=14, description="RSI (Wilder) period"),
+    macd_fast: int = Query(default=12, description="MACD fast EMA span"),
+    macd_slow: int = Query(default=26, description="MACD slow EMA span"),
+    macd_signal: int = Query(default=9, description="MACD signal EMA span"),
+    bb_period: int = Query(default=20, description="Bollinger band window"),
+    bb_std: float = Query(default=2.0, description="Bollinger band width in standard deviations")
+) -> IndicatorParams:
+    """Build IndicatorParams from query parameters, rejecting invalid ones with a 400"""
+    try:
+        return IndicatorParams(
+            indicators=indicators,
+            sma_period=sma_period,
+            ema_period=ema_period,
+            rsi_period=rsi_period,
+            macd_fast=macd_fast,
+            macd_slow=macd_slow,
+            macd_signal=macd_signal,
+            bb_period=bb_period,
+            bb_std=bb_std
+        )
+    except ValidationError as e:
+        detail = "; ".join(
+            f"{'.'.join(str(part) for part in error['loc']) or 'params'}: {error['msg'].removeprefix('Value error, ')}"
+            for error in e.errors()
+        )
+        raise HTTPException(status_code=400, detail=detail)
@@ -0,0 +1,48 @@
+import time
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from services.metrics import http_request_duration, http_requests, http_requests_in_flight
+
+
+class MetricsMiddleware:
+    """
+    Record request count, latency and in-flight gauges per route template
+    
+    A plain ASGI middleware, so it adds no task or body buffering per
+    request. Routes are labelled by their template (/api/v1/stocks/{symbol})
+    to keep label cardinality bounded; unmatched paths share one label.
+    """
+    
+    def __init__(self, app: ASGIApp):
+        self.app = app
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        method = scope["method"]
+        status = 500
+        
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+        
+        http_requests_in_flight.inc(method)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            http_requests_in_flight.dec(method)
+            route = route_template(scope)
+            http_request_duration.observe(elapsed, method, route)
+            http_requests.inc(method, route, str(status))
+
+
+def route_template(scope: Scope) -> str:
+    """Path template of the route the router matched (stored in the shared scope)"""
+    # Routes of an included router keep their own path; the effective context adds the prefix
+    route = scope.get("fastapi", {}).get("effective_route_context") or scope.get("route")
+    return getattr(route, "path", None) or "<unmatched>"
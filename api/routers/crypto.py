@@ -1,34 +1,234 @@
-from fastapi import APIRouter, HTTPException, Query
-from typing import List
-from models.crypto import CryptoData, CryptoHistory, CryptoListItem
-from services import CryptoService
+import asyncio
+import json
+import math
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, Query, WebSocket, WebSocketDisconnect
+from fastapi.responses import JSONResponse, StreamingResponse
+from typing import AsyncIterator, Dict, List, Optional
+from config import settings
+from models.crypto import CryptoData, CryptoHistory, CryptoListItem, CryptoTickerBatch, ConsolidatedQuote
+from models.common import HistoryFormat, StreamFormat, IndicatorParams, IndicatorSeries
+from services import CryptoService, ExchangePool
+from services.executor import run_blocking
+from services.resilience import CircuitOpenError
+from services.ticker_hub import TickerHub, Subscription
+from api.indicators import indicator_params
+from api.streaming import stream_history, arrow_available
 
 router = APIRouter()
 
-# Initialize crypto service
-crypto_service = CryptoService()
+# Exchange clients are created on first use; crypto_service is the default exchange
+crypto_pool = ExchangePool()
+crypto_service = crypto_pool.get()
+
+# Live ticker fan-out per exchange: one poller per subscribed symbol, shared by all clients
+ticker_hubs: Dict[str, TickerHub] = {}
+
+
+def exchange_service(
+    exchange: Optional[str] = Query(default=None, description="Exchange id (e.g., binance, okx); default: CRYPTO_DEFAULT_EXCHANGE")
+) -> CryptoService:
+    """Resolve the `exchange` query parameter to its service, rejecting unsupported ids with 400"""
+    try:
+        return crypto_pool.get(exchange)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def _ticker_hub(service: CryptoService) -> TickerHub:
+    hub = ticker_hubs.get(service.exchange.id)
+    if hub is None:
+        hub = ticker_hubs[service.exchange.id] = TickerHub(service.get_live_ticker)
+    return hub
+
+
+def _parse_symbols(symbols: str) -> List[str]:
+    return list(dict.fromkeys(
+        CryptoService._normalize_symbol(s.strip()) for s in symbols.split(",") if s.strip()
+    ))
+
+
+@router.get("/stream")
+async def stream_crypto_tickers(
+    symbols: str = Query(..., description="Comma-separated symbols or pairs (e.g., BTC,ETH,SOL/USDT)"),
+    service: CryptoService = Depends(exchange_service)
+):
+    """
+    Stream live ticker updates as Server-Sent Events
+    
+    - **symbols**: Comma-separated crypto symbols or trading pairs
+    
+    Each symbol starts with a `snapshot` event; afterwards only `delta` events
+    carrying the fields that changed are sent. Upstream failures arrive as `error` events.
+    """
+    symbols = _parse_symbols(symbols)
+    if not symbols:
+        raise HTTPException(status_code=400, detail="No symbols provided")
+    if len(symbols) > settings.LIVE_MAX_SYMBOLS:
+        raise HTTPException(status_code=400, detail=f"At most {settings.LIVE_MAX_SYMBOLS} symbols per stream")
+    
+    async def events() -> AsyncIterator[str]:
+        subscription = _ticker_hub(service).subscription()
+        subscription.subscribe(symbols)
+        try:
+            while True:
+                try:
+                    messages = await asyncio.wait_for(subscription.next_batch(), settings.LIVE_HEARTBEAT_INTERVAL)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield "".join(
+                    f"event: {message['type']}\ndata: {json.dumps(message, separators=(',', ':'))}\n\n"
+                    for message in messages
+                )
+        finally:
+            subscription.close()
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.websocket("/ws")
+async def crypto_ticker_socket(websocket: WebSocket):
+    """
+    Live ticker updates over WebSocket
+    
+    Send `{"action": "subscribe" | "unsubscribe", "symbols": ["BTC", "ETH/USDT"]}`
+    (`symbols` may also be one comma-separated string; invalid messages get an
+    `error` reply and leave the session open);
+    symbols may also be given up front as `?symbols=BTC,ETH` and the exchange
+    as `?exchange=okx`. Messages are the same `snapshot`, `delta` and `error`
+    objects as the SSE stream.
+    """
+    await websocket.accept()
+    try:
+        service = crypto_pool.get(websocket.query_params.get("exchange"))
+    except ValueError as e:
+        await websocket.send_json({"type": "error", "error": str(e)})
+        await websocket.close(code=1008)
+        return
+    subscription = _ticker_hub(service).subscription()
+    subscription.subscribe(_parse_symbols(websocket.query_params.get("symbols", ""))[:settings.LIVE_MAX_SYMBOLS])
+    
+    sender = asyncio.create_task(_send_updates(websocket, subscription))
+    try:
+        while True:
+            try:
+                request = json.loads(await websocket.receive_text())
+            except (ValueError, KeyError):  # Not JSON, or a binary frame
+                await websocket.send_json({"type": "error", "error": "Messages must be JSON objects"})
+                continue
+            action = request.get("action") if isinstance(request, dict) else None
+            if action not in ("subscribe", "unsubscribe"):
+                await websocket.send_json({"type": "error", "error": "Expected an action of subscribe or unsubscribe"})
+                continue
+            symbols = request.get("symbols") or []
+            if isinstance(symbols, str):
+                symbols = [symbols]
+            if not isinstance(symbols, list) or not all(isinstance(symbol, str) for symbol in symbols):
+                await websocket.send_json({"type": "error", "error": "symbols must be a string or a list of strings"})
+                continue
+            symbols = _parse_symbols(",".join(symbols))
+            if action == "subscribe":
+                room = settings.LIVE_MAX_SYMBOLS - len(subscription.symbols)
+                subscription.subscribe(symbols[:max(room, 0)])
+            else:
+                subscription.unsubscribe(symbols)
+            await websocket.send_json({"type": "subscribed", "symbols": sorted(subscription.symbols)})
+    except WebSocketDisconnect:
+        pass
+    finally:
+        sender.cancel()
+        subscription.close()
+
+
+async def _send_updates(websocket: WebSocket, subscription: Subscription) -> None:
+    # A slow client only delays this task; pending updates are coalesced meanwhile
+    try:
+        while True:
+            for message in await subscription.next_batch():
+                await websocket.send_json(message)
+    except (WebSocketDisconnect, RuntimeError):
+        pass
+
+
+@router.get("/tickers", response_model=CryptoTickerBatch)
+async def get_crypto_tickers(
+    symbols: str = Query(..., description="Comma-separated symbols or pairs (e.g., BTC,ETH,SOL/USDT)"),
+    service: CryptoService = Depends(exchange_service)
+):
+    """
+    Get real-time data for several cryptocurrencies from one bulk ticker snapshot
+    
+    - **symbols**: Comma-separated crypto symbols or trading pairs
+    
+    Symbols that cannot be resolved are listed under `errors` instead of failing the batch.
+    """
+    try:
+        return await run_blocking(service.get_tickers, symbols.split(","))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except CircuitOpenError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(math.ceil(e.retry_after))})
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching tickers: {str(e)}")
 
 
 @router.get("/{symbol}", response_model=CryptoData)
-async def get_crypto_data(symbol: str):
+async def get_crypto_data(symbol: str, service: CryptoService = Depends(exchange_service)):
     """
     Get real-time cryptocurrency data
     
     - **symbol**: Crypto symbol or trading pair (e.g., BTC, ETH, BTC/USDT)
     """
     try:
-        return crypto_service.get_crypto_data(symbol)
+        return await run_blocking(service.get_crypto_data, symbol)
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
+    except CircuitOpenError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(math.ceil(e.retry_after))})
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching crypto data: {str(e)}")
 
 
+@router.get("/{symbol}/consolidated", response_model=ConsolidatedQuote)
+async def get_consolidated_quote(
+    symbol: str,
+    exchanges: Optional[str] = Query(default=None, description="Comma-separated exchange ids (default: CRYPTO_EXCHANGES)"),
+    timeout: Optional[float] = Query(default=None, gt=0, le=30, description="Per-exchange timeout in seconds")
+):
+    """
+    Get the best bid/ask and volume-weighted price across several exchanges
+    
+    - **symbol**: Crypto symbol or trading pair
+    - **exchanges**: Exchanges to query concurrently
+    - **timeout**: Per-exchange budget; slower venues are reported with an error instead of delaying the response
+    
+    Each venue's price, bid, ask, 24h volume and latency is listed under `venues`.
+    """
+    names = [e.strip() for e in exchanges.split(",") if e.strip()] if exchanges else None
+    try:
+        return await crypto_pool.consolidated_quote(symbol, names, timeout)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except CircuitOpenError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(math.ceil(e.retry_after))})
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching consolidated quote: {str(e)}")
+
+
 @router.get("/{symbol}/history", response_model=CryptoHistory)
 async def get_crypto_history(
     symbol: str,
     timeframe: str = Query(default="1d", description="Timeframe (1m, 5m, 15m, 30m, 1h, 4h, 1d, 1w, 1M)"),
-    limit: int = Query(default=100, ge=1, le=1000, description="Number of data points")
+    limit: int = Query(default=100, ge=1, le=1000, description="Number of data points"),
+    start: Optional[datetime] = Query(default=None, description="Range start (ISO 8601, UTC if no offset)"),
+    end: Optional[datetime] = Query(default=None, description="Range end (ISO 8601, default: now)"),
+    format: HistoryFormat = Query(default=HistoryFormat.ROWS, description="rows (DataPoint list) or columnar (t/o/h/l/c/v arrays)"),
+    service: CryptoService = Depends(exchange_service)
 ):
     """
     Get historical cryptocurrency data
@@ -36,18 +236,86 @@ async def get_crypto_history(
     - **symbol**: Crypto symbol or trading pair
     - **timeframe**: Candle timeframe
     - **limit**: Number of data points to retrieve
+    - **start** / **end**: Return every candle in this range instead of the last `limit`
+    - **format**: `columnar` returns `{t:[epoch_ms...], o:[...], h:[...], l:[...], c:[...], v:[...]}`
     """
     try:
-        return crypto_service.get_history(symbol, timeframe, limit)
+        if format == HistoryFormat.COLUMNAR:
+            columns = await run_blocking(service.get_history_columns, symbol, timeframe, limit, start, end)
+            return JSONResponse(content=columns)
+        return await run_blocking(service.get_history, symbol, timeframe, limit, start, end)
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
+    except CircuitOpenError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(math.ceil(e.retry_after))})
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching history: {str(e)}")
 
 
+@router.get("/{symbol}/history/stream")
+async def stream_crypto_history(
+    symbol: str,
+    timeframe: str = Query(default="1d", description="Timeframe (1m, 5m, 15m, 30m, 1h, 4h, 1d, 1w, 1M)"),
+    limit: int = Query(default=100, ge=1, le=1000, description="Number of data points"),
+    start: Optional[datetime] = Query(default=None, description="Range start (ISO 8601, UTC if no offset)"),
+    end: Optional[datetime] = Query(default=None, description="Range end (ISO 8601, default: now)"),
+    format: StreamFormat = Query(default=StreamFormat.NDJSON, description="ndjson or arrow (Arrow IPC stream)"),
+    service: CryptoService = Depends(exchange_service)
+):
+    """
+    Stream historical cryptocurrency data page by page
+    
+    - **symbol**: Crypto symbol or trading pair
+    - **timeframe**: Candle timeframe
+    - **limit**: Number of data points to retrieve
+    - **start** / **end**: Stream every candle in this range instead of the last `limit`
+    - **format**: `ndjson` (one `{t,o,h,l,c,v}` object per line) or `arrow` (IPC record batches)
+    """
+    if format == StreamFormat.ARROW and not arrow_available():
+        raise HTTPException(status_code=501, detail="Arrow streaming requires pyarrow to be installed")
+    try:
+        chunks = service.iter_history_columns(symbol, timeframe, limit, start, end)
+        return await stream_history(chunks, format)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except CircuitOpenError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(math.ceil(e.retry_after))})
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error streaming history: {str(e)}")
+
+
+@router.get("/{symbol}/indicators", response_model=IndicatorSeries)
+async def get_crypto_indicators(
+    symbol: str,
+    timeframe: str = Query(default="1d", description="Timeframe (1m, 5m, 15m, 30m, 1h, 4h, 1d, 1w, 1M)"),
+    limit: int = Query(default=200, ge=1, le=1000, description="Number of candles"),
+    params: IndicatorParams = Depends(indicator_params),
+    service: CryptoService = Depends(exchange_service)
+):
+    """
+    Get technical indicators computed over historical cryptocurrency data
+    
+    - **symbol**: Crypto symbol or trading pair
+    - **timeframe**: Candle timeframe
+    - **limit**: Number of candles to return indicators for
+    - **indicators**: Any of sma, ema, rsi, macd, bbands, vwap (periods are configurable)
+    
+    Returns `t` (epoch ms) and one value array per indicator, null during warm-up.
+    """
+    try:
+        return await run_blocking(service.get_indicators, symbol, timeframe, limit, params)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except CircuitOpenError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(math.ceil(e.retry_after))})
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error computing indicators: {str(e)}")
+
+
 @router.get("/list/all", response_model=List[CryptoListItem])
 async def list_cryptocurrencies(
-    limit: int = Query(default=100, ge=1, le=500)
+    limit: int = Query(default=100, ge=1, le=500),
+    service: CryptoService = Depends(exchange_service)
 ):
     """
     List available cryptocurrencies
@@ -55,7 +323,9 @@ async def list_cryptocurrencies(
     - **limit**: Maximum number of cryptos to return (1-500)
     """
     try:
-        return crypto_service.list_cryptocurrencies(limit)
+        return await run_blocking(service.list_cryptocurrencies, limit)
+    except CircuitOpenError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(math.ceil(e.retry_after))})
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error listing cryptocurrencies: {str(e)}")
 
@@ -63,7 +333,8 @@ async def list_cryptocurrencies(
 @router.get("/search/{query}")
 async def search_crypto(
     query: str,
-    limit: int = Query(default=10, ge=1, le=50)
+    limit: int = Query(default=10, ge=1, le=50),
+    service: CryptoService = Depends(exchange_service)
 ):
     """
     Search for cryptocurrency symbols
@@ -72,6 +343,8 @@ async def search_crypto(
     - **limit**: Maximum number of results (1-50)
     """
     try:
-        return crypto_service.search_symbols(query, limit)
+        return await run_blocking(service.search_symbols, query, limit)
+    except CircuitOpenError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(math.ceil(e.retry_after))})
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error searching crypto: {str(e)}")
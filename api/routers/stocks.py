@@ -1,11 +1,39 @@
-from fastapi import APIRouter, HTTPException, Query
+import math
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import JSONResponse
 from typing import Optional
-from models.stock import StockData, StockQuote, StockHistory
+from models.stock import StockData, StockQuote, StockQuoteBatch, StockHistory
+from models.common import HistoryFormat, StreamFormat, IndicatorParams, IndicatorSeries
 from services import StockService
+from services.executor import run_blocking
+from services.resilience import CircuitOpenError
+from api.indicators import indicator_params
+from api.streaming import stream_history, arrow_available
 
 router = APIRouter()
 
 
+@router.get("/quotes", response_model=StockQuoteBatch)
+async def get_stock_quotes(
+    symbols: str = Query(..., description="Comma-separated ticker symbols (e.g., AAPL,MSFT,TSLA)")
+):
+    """
+    Get real-time quotes for several stocks in one batched request
+    
+    - **symbols**: Comma-separated stock ticker symbols
+    
+    Symbols that cannot be resolved are listed under `errors` instead of failing the batch.
+    """
+    try:
+        return await run_blocking(StockService.get_quotes, symbols.split(","))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except CircuitOpenError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(math.ceil(e.retry_after))})
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching quotes: {str(e)}")
+
+
 @router.get("/{symbol}", response_model=StockData)
 async def get_stock_data(symbol: str):
     """
@@ -14,9 +42,11 @@ async def get_stock_data(symbol: str):
     - **symbol**: Stock ticker symbol (e.g., AAPL, GOOGL, TSLA)
     """
     try:
-        return StockService.get_stock_data(symbol)
+        return await run_blocking(StockService.get_stock_data, symbol)
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
+    except CircuitOpenError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(math.ceil(e.retry_after))})
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching stock data: {str(e)}")
 
@@ -29,9 +59,11 @@ async def get_stock_quote(symbol: str):
     - **symbol**: Stock ticker symbol
     """
     try:
-        return StockService.get_quote(symbol)
+        return await run_blocking(StockService.get_quote, symbol)
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
+    except CircuitOpenError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(math.ceil(e.retry_after))})
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching quote: {str(e)}")
 
@@ -40,7 +72,8 @@ async def get_stock_quote(symbol: str):
 async def get_stock_history(
     symbol: str,
     period: str = Query(default="1mo", description="Time period (1d, 5d, 1mo, 3mo, 6mo, 1y, 2y, 5y, max)"),
-    interval: str = Query(default="1d", description="Data interval (1m, 5m, 15m, 30m, 1h, 1d, 1wk, 1mo)")
+    interval: str = Query(default="1d", description="Data interval (1m, 5m, 15m, 30m, 1h, 1d, 1wk, 1mo)"),
+    format: HistoryFormat = Query(default=HistoryFormat.ROWS, description="rows (DataPoint list) or columnar (t/o/h/l/c/v arrays)")
 ):
     """
     Get historical stock data
@@ -48,15 +81,75 @@ async def get_stock_history(
     - **symbol**: Stock ticker symbol
     - **period**: Time period for historical data
     - **interval**: Data point interval
+    - **format**: `columnar` returns `{t:[epoch_ms...], o:[...], h:[...], l:[...], c:[...], v:[...]}`
     """
     try:
-        return StockService.get_history(symbol, period, interval)
+        if format == HistoryFormat.COLUMNAR:
+            columns = await run_blocking(StockService.get_history_columns, symbol, period, interval)
+            return JSONResponse(content=columns)
+        return await run_blocking(StockService.get_history, symbol, period, interval)
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
+    except CircuitOpenError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(math.ceil(e.retry_after))})
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching history: {str(e)}")
 
 
+@router.get("/{symbol}/history/stream")
+async def stream_stock_history(
+    symbol: str,
+    period: str = Query(default="1mo", description="Time period (1d, 5d, 1mo, 3mo, 6mo, 1y, 2y, 5y, max)"),
+    interval: str = Query(default="1d", description="Data interval (1m, 5m, 15m, 30m, 1h, 1d, 1wk, 1mo)"),
+    format: StreamFormat = Query(default=StreamFormat.NDJSON, description="ndjson or arrow (Arrow IPC stream)")
+):
+    """
+    Stream historical stock data in chunks
+    
+    - **symbol**: Stock ticker symbol
+    - **period**: Time period for historical data
+    - **interval**: Data point interval
+    - **format**: `ndjson` (one `{t,o,h,l,c,v}` object per line) or `arrow` (IPC record batches)
+    """
+    if format == StreamFormat.ARROW and not arrow_available():
+        raise HTTPException(status_code=501, detail="Arrow streaming requires pyarrow to be installed")
+    try:
+        return await stream_history(StockService.iter_history_columns(symbol, period, interval), format)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except CircuitOpenError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(math.ceil(e.retry_after))})
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error streaming history: {str(e)}")
+
+
+@router.get("/{symbol}/indicators", response_model=IndicatorSeries)
+async def get_stock_indicators(
+    symbol: str,
+    period: str = Query(default="6mo", description="Time period (1d, 5d, 1mo, 3mo, 6mo, 1y, 2y, 5y, max)"),
+    interval: str = Query(default="1d", description="Data interval (1m, 5m, 15m, 30m, 1h, 1d, 1wk, 1mo)"),
+    params: IndicatorParams = Depends(indicator_params)
+):
+    """
+    Get technical indicators computed over historical stock data
+    
+    - **symbol**: Stock ticker symbol
+    - **period**: Time period for historical data
+    - **interval**: Data point interval
+    - **indicators**: Any of sma, ema, rsi, macd, bbands, vwap (periods are configurable)
+    
+    Returns `t` (epoch ms) and one value array per indicator, null during warm-up.
+    """
+    try:
+        return await run_blocking(StockService.get_indicators, symbol, period, interval, params)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except CircuitOpenError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(math.ceil(e.retry_after))})
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error computing indicators: {str(e)}")
+
+
 @router.get("/search/{query}")
 async def search_stocks(
     query: str,
@@ -69,6 +162,8 @@ async def search_stocks(
     - **limit**: Maximum number of results (1-50)
     """
     try:
-        return StockService.search_symbols(query, limit)
+        return await run_blocking(StockService.search_symbols, query, limit)
+    except CircuitOpenError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(math.ceil(e.retry_after))})
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error searching stocks: {str(e)}")
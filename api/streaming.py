@@ -0,0 +1,87 @@
+import io
+import json
+from typing import AsyncIterator, Dict, Iterator
+import numpy as np
+from fastapi.responses import StreamingResponse
+from models.common import StreamFormat
+from services.conversion import COLUMNS, columns_to_lists
+from services.executor import run_blocking
+
+try:
+    import pyarrow as pa
+except ImportError:  # Arrow IPC output is optional
+    pa = None
+
+
+def arrow_available() -> bool:
+    """Whether Arrow IPC streaming can be served"""
+    return pa is not None
+
+
+async def stream_history(
+    chunks: Iterator[Dict[str, np.ndarray]],
+    format: StreamFormat
+) -> StreamingResponse:
+    """
+    Wrap a blocking column-chunk iterator in a streaming response
+    
+    The first chunk is pulled before the response starts so errors such as
+    unknown symbols still surface as regular HTTP errors. Each later chunk is
+    pulled on the service worker pool, encoded and sent before the next one
+    is produced.
+    
+    Args:
+        chunks: Iterator of t/o/h/l/c/v column dicts (e.g. iter_history_columns)
+        format: NDJSON or Arrow IPC
+        
+    Returns:
+        StreamingResponse sending the chunks as they are produced
+    """
+    first = await run_blocking(next, chunks, None)
+    
+    async def columns() -> AsyncIterator[Dict[str, np.ndarray]]:
+        chunk = first
+        while chunk is not None:
+            yield chunk
+            chunk = await run_blocking(next, chunks, None)
+    
+    if format == StreamFormat.ARROW:
+        return StreamingResponse(_encode_arrow(columns()), media_type="application/vnd.apache.arrow.stream")
+    return StreamingResponse(_encode_ndjson(columns()), media_type="application/x-ndjson")
+
+
+async def _encode_ndjson(columns: AsyncIterator[Dict[str, np.ndarray]]) -> AsyncIterator[bytes]:
+    async for chunk in columns:
+        lists = columns_to_lists(chunk)
+        lines = [
+            json.dumps(dict(zip(COLUMNS, row)), separators=(",", ":"))
+            for row in zip(*(lists[key] for key in COLUMNS))
+        ]
+        yield ("\n".join(lines) + "\n").encode()
+
+
+async def _encode_arrow(columns: AsyncIterator[Dict[str, np.ndarray]]) -> AsyncIterator[bytes]:
+    schema = pa.schema(
+        [("t", pa.timestamp("ms", tz="UTC"))] + [(key, pa.float64()) for key in COLUMNS[1:]]
+    )
+    buffer = io.BytesIO()
+    writer = pa.ipc.new_stream(buffer, schema)
+    
+    async for chunk in columns:
+        batch = pa.record_batch(
+            [pa.array(chunk["t"], type=pa.timestamp("ms", tz="UTC"))]
+            + [pa.array(chunk[key], type=pa.float64()) for key in COLUMNS[1:]],
+            schema=schema
+        )
+        writer.write_batch(batch)
+        yield _drain(buffer)
+    
+    writer.close()
+    yield _drain(buffer)
+
+
+def _drain(buffer: io.BytesIO) -> bytes:
+    data = buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate()
+    return data
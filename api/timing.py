@@ -0,0 +1,103 @@
+import asyncio
+import cProfile
+import hmac
+from urllib.parse import parse_qs
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import PlainTextResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from config import settings
+from api.metrics import route_template
+from services.tracing import log_timing, server_timing, trace_request
+
+# cProfile can only profile one request on the event-loop thread at a time
+_profile_lock = asyncio.Lock()
+
+
+class TimingMiddleware:
+    """
+    Break each request down into phases and report them
+    
+    Phases (route, queue, service, ratelimit, upstream, convert, validate,
+    serialize, total) go out in a Server-Timing header and, when
+    TIMING_LOG_ENABLED is set, in one JSON log line per request.
+    
+    Requests with `?profile=1` and an X-Profile-Token header matching
+    PROFILING_TOKEN are run under cProfile instead, and answered with the
+    profile report rather than the normal response.
+    """
+    
+    def __init__(self, app: ASGIApp):
+        self.app = app
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        if b"profile=" in scope["query_string"] and _profile_requested(scope):
+            if not _profile_authorized(scope):
+                response = PlainTextResponse("Profiling requires a valid X-Profile-Token", status_code=403)
+                await response(scope, receive, send)
+                return
+            await self._profile(scope, receive, send)
+            return
+        
+        status = 500
+        spans = None
+        
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status, spans
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                spans = trace.finish()
+                if settings.SERVER_TIMING_ENABLED:
+                    MutableHeaders(scope=message).append("Server-Timing", server_timing(spans))
+            await send(message)
+        
+        with trace_request() as trace:
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                if settings.TIMING_LOG_ENABLED:
+                    log_timing("request", f"{scope['method']} {route_template(scope)}", status, spans or trace.finish())
+    
+    async def _profile(self, scope: Scope, receive: Receive, send: Send) -> None:
+        status = 500
+        
+        async def discard(message: Message) -> None:
+            # The profile report replaces the endpoint's response
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+        
+        async with _profile_lock:
+            with trace_request(profile=True) as trace:
+                # Service calls are profiled on their worker threads; this covers
+                # routing, validation and serialization on the event loop (and
+                # whatever other requests run on it meanwhile)
+                profiler = cProfile.Profile()
+                profiler.enable()
+                try:
+                    await self.app(scope, receive, discard)
+                finally:
+                    profiler.disable()
+                spans = trace.finish()
+        
+        report = trace.profile_report(profiler, settings.PROFILE_TOP_N)
+        response = PlainTextResponse(
+            f"{scope['method']} {scope['path']} -> {status}\n{server_timing(spans)}\n\n{report}",
+            headers={"Server-Timing": server_timing(spans)}
+        )
+        await response(scope, receive, send)
+
+
+def _profile_requested(scope: Scope) -> bool:
+    values = parse_qs(scope["query_string"].decode("latin-1")).get("profile", [])
+    return any(value.lower() in ("1", "true", "yes") for value in values)
+
+
+def _profile_authorized(scope: Scope) -> bool:
+    if not settings.PROFILING_TOKEN:
+        return False
+    token = Headers(scope=scope).get("x-profile-token", "")
+    return hmac.compare_digest(token.encode(), settings.PROFILING_TOKEN.encode())
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Throughput of the REST API under parallel load, with and without the
+worker-pool offload.
+
+yfinance is replaced with a stand-in that sleeps for a fixed latency, so the
+numbers reflect how many upstream calls overlap rather than network speed.
+
+Usage:
+    python benchmarks/concurrency.py --requests 200 --concurrency 50 --latency 0.05
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+import numpy as np
+import pandas as pd
+import yfinance as yf
+
+
+class SlowTicker:
+    """yfinance.Ticker stand-in with a fixed blocking latency"""
+    
+    latency = 0.05
+    
+    def __init__(self, symbol, session=None):
+        self.ticker = symbol
+    
+    def history(self, period="1mo", interval="1d", **kwargs):
+        time.sleep(self.latency)
+        index = pd.date_range("2024-01-01", periods=30, freq="D")
+        close = np.linspace(100.0, 110.0, len(index))
+        return pd.DataFrame(
+            {"Open": close, "High": close, "Low": close, "Close": close, "Volume": 1000.0},
+            index=index
+        )
+
+
+async def _inline(func, *args, **kwargs):
+    return func(*args, **kwargs)
+
+
+async def run(requests: int, concurrency: int) -> float:
+    from api.app import app
+    
+    semaphore = asyncio.Semaphore(concurrency)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def one(i: int):
+            async with semaphore:
+                response = await client.get(f"/api/v1/stocks/SYM{i}/history")
+                response.raise_for_status()
+        
+        start = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(requests)))
+        return requests / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="REST API concurrency benchmark")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.05, help="Fake upstream latency (seconds)")
+    args = parser.parse_args()
+    
+    SlowTicker.latency = args.latency
+    yf.Ticker = SlowTicker
+    
+    from api.routers import stocks
+    
+    offloaded = asyncio.run(run(args.requests, args.concurrency))
+    
+    stocks.run_blocking = _inline
+    blocking = asyncio.run(run(args.requests, args.concurrency))
+    
+    print(f"requests={args.requests} concurrency={args.concurrency} latency={args.latency}s")
+    print(f"blocking on event loop : {blocking:8.1f} req/s")
+    print(f"worker-pool offload    : {offloaded:8.1f} req/s")
+    print(f"speedup                : {offloaded / blocking:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
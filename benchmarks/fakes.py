@@ -0,0 +1,274 @@
+"""
+Deterministic local stand-ins for yfinance and a CCXT exchange.
+
+Every upstream call sleeps for a configurable latency with uniform jitter
+(drawn from a seeded generator) and is counted per provider method, so a
+benchmark can report how many upstream calls each client request cost.
+Prices are derived from the symbol and timestamp, so repeated runs return
+the same data.
+
+Usage (before the service modules are imported):
+    import fakes
+    fakes.install(latency_mean=0.05, jitter=0.02, seed=1)
+"""
+import collections
+import random
+import threading
+import time
+import zlib
+
+import ccxt
+import numpy as np
+import pandas as pd
+import yfinance as yf
+
+# Yahoo bars per regular session for each interval; daily and coarser are per day
+_BARS_PER_DAY = {
+    "1m": 390, "2m": 195, "5m": 78, "15m": 26, "30m": 13, "60m": 7, "90m": 5, "1h": 7,
+    "1d": 1, "5d": 0.2, "1wk": 0.2, "1mo": 0.05, "3mo": 0.016,
+}
+_FREQ = {
+    "1m": "1min", "2m": "2min", "5m": "5min", "15m": "15min", "30m": "30min", "60m": "60min",
+    "90m": "90min", "1h": "60min", "1d": "B", "5d": "5B", "1wk": "W-MON", "1mo": "MS", "3mo": "QS",
+}
+_TRADING_DAYS = {
+    "1d": 1, "5d": 5, "1mo": 21, "3mo": 63, "6mo": 126, "1y": 252, "2y": 504,
+    "5y": 1260, "10y": 2520, "ytd": 120, "max": 5000,
+}
+# Fixed end of every stock series, so results do not depend on the wall clock
+_ANCHOR = pd.Timestamp("2024-06-28 15:59", tz="America/New_York")
+
+
+class Latency:
+    """Thread-safe seeded sampler of upstream call latency"""
+    
+    def __init__(self, mean: float = 0.05, jitter: float = 0.0, seed: int = 1):
+        self.mean = mean
+        self.jitter = jitter
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+    
+    def sleep(self) -> None:
+        with self._lock:
+            delay = self._random.uniform(self.mean - self.jitter, self.mean + self.jitter)
+        if delay > 0:
+            time.sleep(delay)
+
+
+latency = Latency()
+calls = collections.Counter()
+_calls_lock = threading.Lock()
+
+
+def _upstream(provider: str, method: str) -> None:
+    with _calls_lock:
+        calls[f"{provider}.{method}"] += 1
+    latency.sleep()
+
+
+def reset_calls() -> None:
+    with _calls_lock:
+        calls.clear()
+
+
+def _price(symbol: str) -> float:
+    return 20.0 + zlib.crc32(symbol.encode()) % 480
+
+
+def _walk(symbol: str, count: int, offset: int = 0) -> np.ndarray:
+    """Deterministic price path for a symbol, indexed from `offset`"""
+    steps = np.arange(offset, offset + count, dtype=np.float64)
+    return _price(symbol) * (1 + 0.05 * np.sin(steps / 17.0) + 0.02 * np.sin(steps / 3.0))
+
+
+class FakeTicker:
+    """yfinance.Ticker stand-in"""
+    
+    def __init__(self, symbol, session=None):
+        self.ticker = symbol.upper()
+    
+    def history(self, period="1mo", interval="1d", start=None, end=None, **kwargs):
+        _upstream("yahoo", "Ticker.history")
+        if start is not None:
+            return _range_frame(self.ticker, start, end, interval)
+        return _history_frame(self.ticker, period, interval)
+    
+    @property
+    def info(self):
+        _upstream("yahoo", "Ticker.info")
+        price = _price(self.ticker)
+        return {
+            "symbol": self.ticker,
+            "longName": f"{self.ticker} Holdings Inc",
+            "currency": "USD",
+            "exchange": "NMS",
+            "sector": "Technology",
+            "industry": "Software",
+            "marketCap": price * 1e8,
+            "trailingPE": 25.0,
+            "dividendYield": 0.01,
+            "fiftyTwoWeekHigh": price * 1.2,
+            "fiftyTwoWeekLow": price * 0.8,
+            "previousClose": price,
+            "averageVolume": 1e6,
+        }
+
+
+def _history_frame(symbol: str, period: str, interval: str) -> pd.DataFrame:
+    days = _TRADING_DAYS.get(period, 21)
+    rows = max(1, min(int(days * _BARS_PER_DAY.get(interval, 1)), 20000))
+    index = pd.date_range(end=_ANCHOR, periods=rows, freq=_FREQ.get(interval, "B"))
+    close = _walk(symbol, rows)
+    return pd.DataFrame(
+        {
+            "Open": close * 0.998,
+            "High": close * 1.01,
+            "Low": close * 0.99,
+            "Close": close,
+            "Volume": np.full(rows, 1e5),
+        },
+        index=index
+    )
+
+
+def _range_frame(symbol: str, start, end, interval: str) -> pd.DataFrame:
+    """Bars in [start, end), as Ticker.history(start=..., end=...) returns them"""
+    first = pd.Timestamp(start).tz_localize(_ANCHOR.tz)
+    last = min(pd.Timestamp(end).tz_localize(_ANCHOR.tz) - pd.Timedelta(minutes=1), _ANCHOR)
+    index = pd.date_range(start=first + pd.Timedelta(hours=15, minutes=59), end=last, freq=_FREQ.get(interval, "B"))
+    close = _walk(symbol, len(index))
+    return pd.DataFrame(
+        {
+            "Open": close * 0.998,
+            "High": close * 1.01,
+            "Low": close * 0.99,
+            "Close": close,
+            "Volume": np.full(len(index), 1e5),
+        },
+        index=index
+    )
+
+
+def fake_download(tickers, period="5d", interval="1d", **kwargs):
+    """yfinance.download stand-in returning (field, ticker) columns"""
+    tickers = [tickers] if isinstance(tickers, str) else list(tickers)
+    # yfinance fetches each ticker separately, in parallel threads
+    with _calls_lock:
+        calls["yahoo.download"] += len(tickers)
+    latency.sleep()
+    frames = {ticker: _history_frame(ticker, period, interval) for ticker in tickers}
+    frame = pd.concat(frames, axis=1).swaplevel(axis=1).sort_index(axis=1)
+    frame.columns.names = ["Price", "Ticker"]
+    return frame
+
+
+class FakeExchange:
+    """
+    CCXT exchange stand-in
+    
+    Unified methods go through `throttle` and `fetch` like real CCXT
+    requests, so the service's rate limiter, circuit breaker and metrics
+    see every call.
+    """
+    
+    id = "binance"
+    rateLimit = 50
+    apiKey = ""
+    has = {"fetchTickers": True, "fetchOHLCV": True}
+    timeframes = {tf: tf for tf in ("1m", "5m", "15m", "30m", "1h", "4h", "1d", "1w", "1M")}
+    pairs = 200
+    ohlcv_limit = 1000  # Most candles one fetch_ohlcv call returns, as on Binance
+    
+    def __init__(self, config=None):
+        self.features = {"spot": {"fetchOHLCV": {"limit": self.ohlcv_limit}}}
+        self.markets = None
+        self.currencies = {}
+    
+    def throttle(self, cost=None):
+        pass
+    
+    def fetch(self, url, method="GET", headers=None, body=None):
+        _upstream(self.id, url)
+    
+    def _request(self, path):
+        self.throttle(1)
+        self.fetch(path)
+    
+    def milliseconds(self):
+        return int(time.time() * 1000)
+    
+    def parse_timeframe(self, timeframe):
+        return ccxt.Exchange.parse_timeframe(timeframe)
+    
+    def set_sandbox_mode(self, enabled):
+        pass
+    
+    def set_markets(self, markets, currencies=None):
+        self.markets = markets
+    
+    def load_markets(self, reload=False):
+        if self.markets is not None and not reload:
+            return self.markets
+        self._request("load_markets")
+        bases = ["BTC", "ETH"] + [f"C{i}" for i in range(self.pairs)]
+        self.markets = {
+            f"{base}/USDT": {
+                "id": f"{base}USDT", "symbol": f"{base}/USDT", "base": base, "quote": "USDT",
+                "active": True, "type": "spot", "spot": True,
+            }
+            for base in bases
+        }
+        return self.markets
+    
+    def _ticker(self, symbol):
+        if symbol not in (self.markets or {}):
+            raise ccxt.BadSymbol(f"{self.id} does not have market symbol {symbol}")
+        price = _price(symbol)
+        return {
+            "symbol": symbol, "timestamp": self.milliseconds(), "last": price, "close": price,
+            "open": price * 0.98, "high": price * 1.02, "low": price * 0.97,
+            "bid": price * 0.9995, "ask": price * 1.0005, "change": price * 0.02,
+            "percentage": 2.04, "baseVolume": 1e4, "quoteVolume": price * 1e4, "previousClose": price * 0.98,
+        }
+    
+    def fetch_ticker(self, symbol, params=None):
+        self.load_markets()
+        self._request("fetch_ticker")
+        return self._ticker(symbol)
+    
+    def fetch_tickers(self, symbols=None, params=None):
+        self.load_markets()
+        self._request("fetch_tickers")
+        return {symbol: self._ticker(symbol) for symbol in (symbols or self.markets)}
+    
+    def fetch_ohlcv(self, symbol, timeframe="1d", since=None, limit=None, params=None):
+        self.load_markets()
+        self._request("fetch_ohlcv")
+        if symbol not in self.markets:
+            raise ccxt.BadSymbol(f"{self.id} does not have market symbol {symbol}")
+        step = self.parse_timeframe(timeframe) * 1000
+        now = self.milliseconds() // step * step
+        limit = min(limit or 500, self.ohlcv_limit)
+        start = now - (limit - 1) * step if since is None else -(-since // step) * step
+        count = max(0, min(limit, (now - start) // step + 1))
+        close = _walk(symbol, count, start // step)
+        return [
+            [start + i * step, close[i] * 0.998, close[i] * 1.01, close[i] * 0.99, close[i], 10.0]
+            for i in range(count)
+        ]
+
+
+def install(latency_mean: float = 0.05, jitter: float = 0.0, seed: int = 1) -> None:
+    """
+    Replace yfinance and ccxt.binance with the stand-ins
+    
+    Args:
+        latency_mean: Mean seconds per upstream call
+        jitter: Uniform jitter (+/- seconds) around the mean
+        seed: Seed for the jitter sequence
+    """
+    global latency
+    latency = Latency(latency_mean, jitter, seed)
+    yf.Ticker = FakeTicker
+    yf.download = fake_download
+    ccxt.binance = FakeExchange
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Latency and payload size of the history endpoint, row format versus columnar.
+
+yfinance is replaced with a stand-in that returns a synthetic OHLCV frame
+instantly, so the timings cover conversion, validation and JSON encoding only.
+
+Usage:
+    python benchmarks/history_format.py --candles 10000 --repeat 20
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+import yfinance as yf
+from fastapi.testclient import TestClient
+
+
+class FrameTicker:
+    """yfinance.Ticker stand-in returning a fixed-size frame"""
+    
+    candles = 10000
+    
+    def __init__(self, symbol, session=None):
+        self.ticker = symbol
+    
+    def history(self, period="1mo", interval="1d", **kwargs):
+        index = pd.date_range("2020-01-01", periods=self.candles, freq="min", tz="America/New_York")
+        close = 100.0 + np.cumsum(np.random.default_rng(0).normal(0, 0.1, self.candles))
+        return pd.DataFrame(
+            {"Open": close, "High": close + 0.5, "Low": close - 0.5, "Close": close, "Volume": 1000.0},
+            index=index
+        )
+
+
+def measure(client: TestClient, params: dict, repeat: int):
+    timings = []
+    size = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        response = client.get("/api/v1/stocks/BENCH/history", params=params)
+        timings.append(time.perf_counter() - start)
+        response.raise_for_status()
+        size = len(response.content)
+    return statistics.median(timings), size
+
+
+def main():
+    parser = argparse.ArgumentParser(description="History response format benchmark")
+    parser.add_argument("--candles", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    
+    FrameTicker.candles = args.candles
+    yf.Ticker = FrameTicker
+    
+    from api.app import app
+    client = TestClient(app)
+    
+    rows_latency, rows_size = measure(client, {"interval": "1m"}, args.repeat)
+    cols_latency, cols_size = measure(client, {"interval": "1m", "format": "columnar"}, args.repeat)
+    
+    print(f"candles={args.candles} repeat={args.repeat} (median latency)")
+    print(f"rows     : {rows_latency * 1000:8.1f} ms  {rows_size / 1024:8.1f} KiB")
+    print(f"columnar : {cols_latency * 1000:8.1f} ms  {cols_size / 1024:8.1f} KiB")
+    print(f"speedup  : {rows_latency / cols_latency:8.1f}x  size ratio {cols_size / rows_size:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+"""
+Throughput, latency, memory and upstream-call amplification per endpoint,
+over both the REST API and the MCP server, without touching the network.
+
+yfinance and the CCXT exchange are replaced with the deterministic
+stand-ins in benchmarks/fakes.py (configurable latency and jitter). Each
+scenario runs in a fresh worker process, so it starts with cold caches and
+its peak RSS is its own. Amplification is upstream calls per client request
+(below 1 means caching and request coalescing absorbed part of the load).
+
+Results are written to benchmarks/results/<UTC timestamp>.json and compared
+with the previous run (or --baseline); --max-regression makes the run fail
+when throughput drops or p95 latency grows by more than that fraction.
+
+Usage:
+    python benchmarks/load.py --requests 300 --concurrency 32 --latency 0.05 --jitter 0.02
+    python benchmarks/load.py --scenarios stock_quote,crypto_history --transports rest
+    python benchmarks/load.py --baseline benchmarks/results/20240101T000000Z.json --max-regression 0.2
+"""
+import argparse
+import asyncio
+import glob
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from collections import namedtuple
+from datetime import datetime, timezone
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+
+# asset: which symbol pool the scenario draws from (stock S<n> or crypto C<n>)
+Scenario = namedtuple("Scenario", "asset path tool arguments")
+
+SCENARIOS = {
+    "stock_quote": Scenario(
+        "stock", lambda s, i: f"/api/v1/stocks/{s}/quote",
+        "get_stock_quote", lambda s, i: {"symbol": s}
+    ),
+    "stock_data": Scenario(
+        "stock", lambda s, i: f"/api/v1/stocks/{s}",
+        "get_stock_data", lambda s, i: {"symbol": s}
+    ),
+    "stock_quotes": Scenario(
+        "stock", lambda s, i: f"/api/v1/stocks/quotes?symbols={','.join(_batch(i))}",
+        "get_stock_quotes", lambda s, i: {"symbols": _batch(i)}
+    ),
+    "stock_history": Scenario(
+        "stock", lambda s, i: f"/api/v1/stocks/{s}/history?period=1y",
+        "get_stock_history", lambda s, i: {"symbol": s, "period": "1y"}
+    ),
+    "stock_indicators": Scenario(
+        "stock", lambda s, i: f"/api/v1/stocks/{s}/indicators?period=1y",
+        "get_indicators", lambda s, i: {"symbol": s, "period": "1y"}
+    ),
+    "crypto_data": Scenario(
+        "crypto", lambda s, i: f"/api/v1/crypto/{s}",
+        "get_crypto_data", lambda s, i: {"symbol": s}
+    ),
+    "crypto_history": Scenario(
+        "crypto", lambda s, i: f"/api/v1/crypto/{s}/history?timeframe=1h&limit=500",
+        "get_crypto_history", lambda s, i: {"symbol": s, "timeframe": "1h", "limit": 500}
+    ),
+    "crypto_indicators": Scenario(
+        "crypto", lambda s, i: f"/api/v1/crypto/{s}/indicators?timeframe=1h&limit=200",
+        "get_indicators", lambda s, i: {"symbol": s, "asset_type": "crypto", "interval": "1h", "limit": 200}
+    ),
+}
+TRANSPORTS = ("rest", "mcp")
+
+# Set by the worker from --symbols before any request is built
+_symbols = 50
+
+
+def _symbol(asset: str, i: int) -> str:
+    return f"{'S' if asset == 'stock' else 'C'}{i % _symbols}"
+
+
+def _batch(i: int, size: int = 10) -> list:
+    return [_symbol("stock", i * size + k) for k in range(size)]
+
+
+def _rss_mb() -> float:
+    """Current resident set size (Linux), falling back to the peak"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError):
+        return _peak_rss_mb()
+
+
+def _peak_rss_mb() -> float:
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak / 2**20 if sys.platform == "darwin" else peak / 2**10
+
+
+def _percentile(values: list, q: float) -> float:
+    import numpy as np
+    return round(float(np.percentile(values, q)), 2) if values else 0.0
+
+
+async def _drive(call, requests: int, concurrency: int):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    errors = 0
+    
+    async def one(i: int):
+        nonlocal errors
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                ok = await call(i)
+            except Exception:
+                ok = False
+            latencies.append((time.perf_counter() - start) * 1000)
+            errors += not ok
+    
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    return latencies, errors, time.perf_counter() - start
+
+
+async def _run_rest(scenario: Scenario, args):
+    import httpx
+    from api.app import app
+    
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        async def call(i: int) -> bool:
+            response = await client.get(scenario.path(_symbol(scenario.asset, i), i))
+            return response.is_success
+        
+        return await _measure(call, args)
+
+
+async def _run_mcp(scenario: Scenario, args):
+    from fastmcp import Client
+    from mcp_server.server import mcp
+    
+    async with Client(mcp) as client:
+        async def call(i: int) -> bool:
+            result = await client.call_tool(
+                scenario.tool, scenario.arguments(_symbol(scenario.asset, i), i), raise_on_error=False
+            )
+            content = result.structured_content
+            return not result.is_error and not (isinstance(content, dict) and "error" in content)
+        
+        return await _measure(call, args)
+
+
+async def _measure(call, args):
+    import fakes
+    
+    if args.warmup:
+        await _drive(call, args.warmup, args.concurrency)
+    fakes.reset_calls()
+    rss_before = _rss_mb()
+    latencies, errors, elapsed = await _drive(call, args.requests, args.concurrency)
+    upstream = dict(fakes.calls)
+    upstream_calls = sum(upstream.values())
+    return {
+        "requests": args.requests,
+        "errors": errors,
+        "req_per_s": round(args.requests / elapsed, 1),
+        "p50_ms": _percentile(latencies, 50),
+        "p95_ms": _percentile(latencies, 95),
+        "p99_ms": _percentile(latencies, 99),
+        "max_ms": round(max(latencies), 2),
+        "rss_peak_mb": round(_peak_rss_mb(), 1),
+        "rss_growth_mb": round(_rss_mb() - rss_before, 1),
+        "upstream_calls": upstream_calls,
+        "amplification": round(upstream_calls / args.requests, 3),
+        "upstream": upstream,
+    }
+
+
+def run_worker(args) -> None:
+    """Run one scenario over one transport and print its result as JSON"""
+    global _symbols
+    _symbols = args.symbols
+    
+    # Settings are read from the environment when config is first imported
+    os.environ["DATA_CACHE_DIR"] = tempfile.mkdtemp(prefix="trading-bench-")
+    os.environ["WATCHLIST"] = "[]"
+    os.environ["CRYPTO_EXCHANGES"] = '["binance"]'
+    os.environ["TIMING_LOG_ENABLED"] = "false"
+    os.environ["STOCK_SYMBOLS_REFRESH_INTERVAL"] = "0"
+    if not args.rate_limits:
+        # A rate of 0 disables the upstream token buckets
+        os.environ["UPSTREAM_RATE_LIMITS"] = '{"yahoo": {"rate": 0, "burst": 1}, "binance": {"rate": 0, "burst": 1}}'
+    sys.path.insert(0, ROOT)
+    
+    import fakes
+    fakes.install(args.latency, args.jitter, args.seed)
+    
+    scenario = SCENARIOS[args.worker[0]]
+    runner = _run_rest if args.worker[1] == "rest" else _run_mcp
+    print(json.dumps(asyncio.run(runner(scenario, args))))
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def _latest_result() -> str:
+    paths = sorted(glob.glob(os.path.join(RESULTS_DIR, "*.json")))
+    return paths[-1] if paths else ""
+
+
+def _delta(new: float, old: float) -> float:
+    return (new - old) / old if old else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline REST and MCP load benchmark")
+    parser.add_argument("--requests", type=int, default=300, help="Measured requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--warmup", type=int, default=0, help="Unmeasured requests sent first")
+    parser.add_argument("--symbols", type=int, default=50, help="Distinct symbols requests rotate through")
+    parser.add_argument("--latency", type=float, default=0.05, help="Mean fake upstream latency (seconds)")
+    parser.add_argument("--jitter", type=float, default=0.02, help="Uniform jitter around the latency (seconds)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--rate-limits", action="store_true", help="Keep the configured upstream rate limits")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="Comma-separated scenario names")
+    parser.add_argument("--transports", default=",".join(TRANSPORTS), help="rest, mcp or both")
+    parser.add_argument("--baseline", help="Results file to compare with (default: the latest saved run)")
+    parser.add_argument("--max-regression", type=float, help="Fail if req/s drops or p95 grows by more than this fraction")
+    parser.add_argument("--no-save", action="store_true", help="Do not write the results file")
+    parser.add_argument("--worker", nargs=2, metavar=("SCENARIO", "TRANSPORT"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    
+    if args.worker:
+        run_worker(args)
+        return
+    
+    scenarios = [s.strip() for s in args.scenarios.split(",") if s.strip()]
+    transports = [t.strip() for t in args.transports.split(",") if t.strip()]
+    unknown = [s for s in scenarios if s not in SCENARIOS] + [t for t in transports if t not in TRANSPORTS]
+    if unknown:
+        parser.error(f"Unknown scenario or transport: {', '.join(unknown)}")
+    
+    baseline_path = args.baseline or _latest_result()
+    baseline = {}
+    if baseline_path:
+        with open(baseline_path) as f:
+            baseline = json.load(f).get("results", {})
+    
+    forwarded = [
+        "--requests", str(args.requests), "--concurrency", str(args.concurrency),
+        "--warmup", str(args.warmup), "--symbols", str(args.symbols),
+        "--latency", str(args.latency), "--jitter", str(args.jitter), "--seed", str(args.seed),
+    ] + (["--rate-limits"] if args.rate_limits else [])
+    
+    print(f"requests={args.requests} concurrency={args.concurrency} symbols={args.symbols} "
+          f"latency={args.latency}s±{args.jitter}s" + (f"  baseline={os.path.basename(baseline_path)}" if baseline else ""))
+    print(f"{'scenario':<18} {'via':<4} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+          f"{'errors':>6} {'rss MB':>7} {'ampl':>6} {'Δreq/s':>8} {'Δp95':>8}")
+    
+    results = {}
+    regressions = []
+    for name in scenarios:
+        for transport in transports:
+            key = f"{transport}:{name}"
+            worker = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--worker", name, transport] + forwarded,
+                capture_output=True, text=True
+            )
+            if worker.returncode != 0:
+                print(f"{name:<18} {transport:<4} failed:\n{worker.stderr.strip()}")
+                continue
+            r = results[key] = json.loads(worker.stdout.strip().splitlines()[-1])
+            
+            old = baseline.get(key)
+            d_rate = _delta(r["req_per_s"], old["req_per_s"]) if old else None
+            d_p95 = _delta(r["p95_ms"], old["p95_ms"]) if old else None
+            if old and args.max_regression is not None and (d_rate < -args.max_regression or d_p95 > args.max_regression):
+                regressions.append(key)
+            print(f"{name:<18} {transport:<4} {r['req_per_s']:>8.1f} {r['p50_ms']:>8.1f} {r['p95_ms']:>8.1f} "
+                  f"{r['p99_ms']:>8.1f} {r['errors']:>6} {r['rss_peak_mb']:>7.1f} {r['amplification']:>6.2f} "
+                  + (f"{d_rate:>+8.1%} {d_p95:>+8.1%}" if old else f"{'-':>8} {'-':>8}"))
+    
+    if not args.no_save and results:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        path = os.path.join(RESULTS_DIR, datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ") + ".json")
+        with open(path, "w") as f:
+            json.dump({
+                "timestamp": datetime.now(timezone.utc).isoformat(),
+                "commit": _git_commit(),
+                "python": platform.python_version(),
+                "config": {k: v for k, v in vars(args).items() if k not in ("worker", "baseline", "no_save")},
+                "results": results,
+            }, f, indent=2)
+        print(f"saved {os.path.relpath(path, ROOT)}")
+    
+    if regressions:
+        print(f"regressions beyond {args.max_regression:.0%}: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Latency of a single stock quote, before and after the lightweight quote path.
+
+"before" waits for both the price bars and the ticker.info record, as
+get_quote used to; "after" is the current StockService.get_quote, which only
+waits for the price bars. Each sample uses a new symbol, so every quote is a
+cold-cache request. yfinance is replaced with a stand-in whose history() and
+info calls sleep for the given latencies.
+
+Usage:
+    python benchmarks/quote_latency.py --samples 50 --history-latency 0.08 --info-latency 0.4
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+import yfinance as yf
+
+
+class SlowTicker:
+    """yfinance.Ticker stand-in with separate history and info latencies"""
+    
+    history_latency = 0.08
+    info_latency = 0.4
+    
+    def __init__(self, symbol, session=None):
+        self.ticker = symbol
+    
+    def history(self, period="5d", interval="1d", **kwargs):
+        time.sleep(self.history_latency)
+        index = pd.date_range("2024-01-01", periods=5, freq="D")
+        close = np.linspace(100.0, 104.0, len(index))
+        return pd.DataFrame(
+            {"Open": close, "High": close + 1, "Low": close - 1, "Close": close, "Volume": 1000.0},
+            index=index
+        )
+    
+    @property
+    def info(self):
+        time.sleep(self.info_latency)
+        return {"longName": f"{self.ticker} Inc", "marketCap": 1e9, "trailingPE": 20.0}
+
+
+def measure(quote, samples: int, prefix: str) -> dict:
+    latencies = []
+    for i in range(samples):
+        start = time.perf_counter()
+        quote(f"{prefix}{i}")
+        latencies.append((time.perf_counter() - start) * 1000)
+    return {
+        "p50_ms": round(float(np.percentile(latencies, 50)), 1),
+        "p95_ms": round(float(np.percentile(latencies, 95)), 1),
+        "mean_ms": round(float(np.mean(latencies)), 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stock quote latency benchmark")
+    parser.add_argument("--samples", type=int, default=50)
+    parser.add_argument("--history-latency", type=float, default=0.08, help="Fake history() latency (seconds)")
+    parser.add_argument("--info-latency", type=float, default=0.4, help="Fake ticker.info latency (seconds)")
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    args = parser.parse_args()
+    
+    SlowTicker.history_latency = args.history_latency
+    SlowTicker.info_latency = args.info_latency
+    yf.Ticker = SlowTicker
+    
+    from services.stock_service import StockService
+    
+    def before(symbol: str):
+        return StockService._build_quote(
+            symbol,
+            StockService._get_price(symbol),
+            StockService._get_fundamentals(symbol)
+        )
+    
+    results = {
+        "samples": args.samples,
+        "history_latency_s": args.history_latency,
+        "info_latency_s": args.info_latency,
+        "before": measure(before, args.samples, "OLD"),
+        "after": measure(StockService.get_quote, args.samples, "NEW"),
+    }
+    
+    print(f"samples={args.samples} history={args.history_latency}s info={args.info_latency}s (cold cache)")
+    for name in ("before", "after"):
+        r = results[name]
+        print(f"{name:<7}: p50 {r['p50_ms']:7.1f} ms   p95 {r['p95_ms']:7.1f} ms   mean {r['mean_ms']:7.1f} ms")
+    
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
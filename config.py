@@ -20,6 +20,110 @@ class Settings(BaseSettings):
     # CORS
     CORS_ORIGINS: list = ["*"]
     
+    # Streaming responses
+    STREAM_CHUNK_SIZE: int = 5000
+    
+    # Local Storage
+    DATA_CACHE_DIR: str = ".cache"
+    CANDLE_STORE_ENABLED: bool = True
+    
+    # Concurrency Settings
+    SERVICE_THREAD_POOL_SIZE: int = 32
+    
+    # Cache Settings (seconds)
+    CACHE_MAX_ENTRIES: int = 2048
+    STOCK_PRICE_TTL: float = 15.0
+    STOCK_PRICE_STALE_TTL: float = 60.0
+    STOCK_FUNDAMENTALS_TTL: float = 6 * 60 * 60
+    STOCK_FUNDAMENTALS_STALE_TTL: float = 24 * 60 * 60
+    STOCK_HISTORY_TTL: float = 60.0
+    CRYPTO_MARKETS_TTL: float = 60 * 60
+    CRYPTO_MARKETS_STALE_TTL: float = 24 * 60 * 60
+    CRYPTO_TICKER_TTL: float = 10.0
+    
+    # Exchanges selectable through the `exchange` parameter (CCXT ids)
+    CRYPTO_DEFAULT_EXCHANGE: str = "binance"
+    CRYPTO_EXCHANGES: list = ["binance", "okx", "bybit", "kraken", "coinbase"]
+    CRYPTO_CONSOLIDATED_TIMEOUT: float = 2.0  # Per-venue budget for consolidated quotes
+    
+    # Exchange credentials (optional; market data endpoints are public)
+    OKX_API_KEY: str = ""
+    OKX_SECRET_KEY: str = ""
+    OKX_PASSPHRASE: str = ""
+    OKX_SANDBOX: bool = False
+    
+    # Upstream request budgets (token buckets shared by all callers of a provider);
+    # exchanges default to their CCXT rateLimit, others to UPSTREAM_DEFAULT_RATE/BURST
+    UPSTREAM_RATE_LIMITS: dict = {"yahoo": {"rate": 2.0, "burst": 10}}
+    UPSTREAM_DEFAULT_RATE: float = 5.0  # Requests per second
+    UPSTREAM_DEFAULT_BURST: float = 5.0
+    
+    # Circuit breaker per provider/exchange and hedged reads
+    CIRCUIT_FAILURE_THRESHOLD: int = 5  # Consecutive failures before the circuit opens
+    CIRCUIT_RESET_TIMEOUT: float = 30.0  # Seconds open before a probe call is allowed
+    CIRCUIT_SLOW_CALL_SECONDS: float = 5.0  # Slower calls count as failures
+    CIRCUIT_STALE_MAX_AGE: float = 24 * 60 * 60  # Oldest cached value served while open
+    HEDGE_ENABLED: bool = False
+    HEDGE_PERCENTILE: float = 95.0  # Second attempt after this latency percentile
+    HEDGE_MIN_DELAY: float = 0.05
+    HEDGE_MIN_SAMPLES: int = 20
+    
+    # Prometheus /metrics endpoint and request/upstream/MCP tool instrumentation
+    METRICS_ENABLED: bool = True
+    
+    # Per-request phase timing (Server-Timing header, JSON log lines) and profiling
+    SERVER_TIMING_ENABLED: bool = True
+    TIMING_LOG_ENABLED: bool = False
+    TIMING_LOG_MIN_DURATION: float = 0.0  # Seconds; only slower requests are logged
+    PROFILING_TOKEN: str = ""  # Enables ?profile=1 for requests sending it in X-Profile-Token
+    PROFILE_TOP_N: int = 40  # Functions listed in a profile report
+    
+    # Provider mode: live, record (call upstream and save every response to a
+    # cassette) or replay (serve saved responses only, never calling upstream)
+    PROVIDER_MODE: str = "live"
+    CASSETTE_DIR: str = ""  # Default: <DATA_CACHE_DIR>/cassettes
+    REPLAY_RECORDED_LATENCY: bool = False  # Replay at the recorded latency instead of at once
+    
+    # Crypto ticker fallback for exchanges without a bulk fetchTickers call
+    CRYPTO_TICKER_CHUNK_SIZE: int = 20
+    CRYPTO_TICKER_CONCURRENCY: int = 8
+    
+    # Quote currencies ranked first among equally good symbol search matches
+    CRYPTO_PREFERRED_QUOTES: list = ["USDT", "USDC", "USD", "BTC", "ETH", "EUR"]
+    
+    # Stock symbol directory (bundled listing unless a file or refreshed copy exists)
+    STOCK_SYMBOLS_FILE: str = ""
+    STOCK_SYMBOLS_URL: str = "https://www.nasdaqtrader.com/dynamic/SymDir/nasdaqtraded.txt"
+    STOCK_SYMBOLS_REFRESH_INTERVAL: float = 0.0  # Seconds; 0 keeps the listing offline
+    STOCK_SEARCH_FUZZY_THRESHOLD: float = 0.4
+    
+    # Crypto timeframes fetched upstream; coarser ones are resampled locally
+    CRYPTO_BASE_TIMEFRAMES: list = ["1m", "1h", "1d"]
+    RESAMPLE_MAX_BASE_CANDLES: int = 5000
+    
+    # Crypto range history pagination
+    CRYPTO_OHLCV_PAGE_SIZE: int = 1000  # Upper bound; exchanges returning fewer per call get smaller pages
+    CRYPTO_HISTORY_CONCURRENCY: int = 4
+    
+    # Technical indicator state kept per series for incremental updates
+    INDICATOR_CACHE_ENTRIES: int = 256
+    INDICATOR_STATE_TTL: float = 60 * 60
+    INDICATOR_MAX_POINTS: int = 5000  # Committed candles kept per cached series (more if one request spans more)
+    
+    # Live ticker streams (WebSocket / SSE)
+    LIVE_POLL_INTERVAL: float = 1.0
+    LIVE_HEARTBEAT_INTERVAL: float = 15.0
+    LIVE_MAX_SYMBOLS: int = 50
+    
+    # Watchlist kept warm by the background scheduler; pairs with '/' are crypto
+    WATCHLIST: list = []
+    WATCHLIST_REFRESH_AHEAD: float = 0.8  # Refresh at this fraction of each TTL
+    WATCHLIST_MIN_SPACING: float = 0.2  # Seconds between upstream refresh calls
+    WATCHLIST_BUDGET_SHARE: float = 0.5  # Fraction of each provider's rate limit refreshes may plan to use
+    WATCHLIST_STARTUP_SPREAD: float = 10.0
+    WATCHLIST_HISTORY_PERIODS: list = ["1mo"]
+    WATCHLIST_CANDLE_INTERVAL: float = 300.0
+    
     class Config:
         env_file = ".env"
         case_sensitive = False
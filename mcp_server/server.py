@@ -4,20 +4,116 @@ import os
 # Add parent directory to path to import services
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+import functools
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import List, Optional
 from fastmcp import FastMCP
-from services import StockService, CryptoService
+from fastmcp.server.middleware import Middleware
+from starlette.requests import Request
+from starlette.responses import Response
+from config import settings
+from services import StockService, ExchangePool, metrics
+from models.common import IndicatorParams
+from services.executor import run_blocking
+from services.resilience import track_staleness
+from services.tracing import log_timing, trace_request
+from services.warmup import CacheWarmer
 
 # Initialize services
 stock_service = StockService()
-crypto_service = CryptoService()
+crypto_pool = ExchangePool()
+
+
+@asynccontextmanager
+async def lifespan(server: FastMCP):
+    """Keep watchlist data warm for as long as the server runs"""
+    warmer = CacheWarmer.for_watchlist(crypto_pool.get())
+    warmer.start()
+    try:
+        yield {}
+    finally:
+        await warmer.stop()
+
 
 # Create FastMCP server
-mcp = FastMCP("trading-data-mcp")
+mcp = FastMCP("trading-data-mcp", lifespan=lifespan)
+
+
+def _tool_outcome(result) -> str:
+    # Tools report failures as an {"error": ...} result rather than raising
+    content = getattr(result, "structured_content", None)
+    if getattr(result, "is_error", False) or (isinstance(content, dict) and "error" in content):
+        return "error"
+    return "ok"
+
+
+class ToolMetrics(Middleware):
+    """Record call count, latency and in-flight gauges per MCP tool"""
+    
+    async def on_call_tool(self, context, call_next):
+        tool = getattr(context.message, "name", "unknown")
+        metrics.mcp_tool_calls_in_flight.inc(tool)
+        start = time.perf_counter()
+        outcome = "error"
+        try:
+            result = await call_next(context)
+            outcome = _tool_outcome(result)
+            return result
+        finally:
+            metrics.mcp_tool_calls_in_flight.dec(tool)
+            metrics.mcp_tool_duration.observe(time.perf_counter() - start, tool)
+            metrics.mcp_tool_calls.inc(tool, outcome)
+
+
+class ToolTiming(Middleware):
+    """Log the phase breakdown (queue, service, upstream, convert, ...) of every tool call"""
+    
+    async def on_call_tool(self, context, call_next):
+        tool = getattr(context.message, "name", "unknown")
+        outcome = "error"
+        with trace_request() as trace:
+            try:
+                result = await call_next(context)
+                outcome = _tool_outcome(result)
+                return result
+            finally:
+                log_timing("tool", tool, outcome, trace.finish())
+
+
+if settings.TIMING_LOG_ENABLED:
+    mcp.add_middleware(ToolTiming())
+
+if settings.METRICS_ENABLED:
+    mcp.add_middleware(ToolMetrics())
+    metrics.register_caches("stock", stock_service.cache_stats)
+    metrics.register_caches("mcp", lambda: [
+        cache for caches in crypto_pool.cache_stats().values() for cache in caches
+    ])
+    
+    @mcp.custom_route("/metrics", methods=["GET"])
+    async def prometheus_metrics(request: Request) -> Response:
+        return Response(metrics.registry.render(), media_type=metrics.CONTENT_TYPE)
+
+
+def flag_stale(tool):
+    """Mark a tool result served from old cached data while a provider's circuit is open"""
+    @functools.wraps(tool)
+    async def wrapper(*args, **kwargs):
+        with track_staleness() as stale:
+            result = await tool(*args, **kwargs)
+        if stale and isinstance(result, dict) and "error" not in result:
+            result["stale"] = True
+            result["stale_age_seconds"] = round(max(stale.values()), 1)
+        return result
+    return wrapper
 
 
 # Stock data tools
 @mcp.tool()
-def get_stock_data(symbol: str) -> dict:
+@flag_stale
+async def get_stock_data(symbol: str) -> dict:
     """
     Get comprehensive stock market data including price, volume, market cap, and financial metrics.
     
@@ -28,14 +124,15 @@ def get_stock_data(symbol: str) -> dict:
         Comprehensive stock data including current quote and financial information
     """
     try:
-        data = stock_service.get_stock_data(symbol)
+        data = await run_blocking(stock_service.get_stock_data, symbol)
         return data.model_dump()
     except Exception as e:
         return {"error": str(e)}
 
 
 @mcp.tool()
-def get_stock_quote(symbol: str) -> dict:
+@flag_stale
+async def get_stock_quote(symbol: str) -> dict:
     """
     Get real-time stock quote with current price and trading information.
     
@@ -46,14 +143,34 @@ def get_stock_quote(symbol: str) -> dict:
         Real-time quote with price, volume, and change information
     """
     try:
-        quote = stock_service.get_quote(symbol)
+        quote = await run_blocking(stock_service.get_quote, symbol)
         return quote.model_dump()
     except Exception as e:
         return {"error": str(e)}
 
 
 @mcp.tool()
-def get_stock_history(symbol: str, period: str = "1mo", interval: str = "1d") -> dict:
+@flag_stale
+async def get_stock_quotes(symbols: List[str]) -> dict:
+    """
+    Get real-time quotes for many stocks at once in a single batched fetch.
+    
+    Args:
+        symbols: Stock ticker symbols (e.g., ["AAPL", "MSFT", "TSLA"])
+    
+    Returns:
+        Quotes for the resolved symbols plus an error message per symbol that failed
+    """
+    try:
+        batch = await run_blocking(stock_service.get_quotes, symbols)
+        return batch.model_dump()
+    except Exception as e:
+        return {"error": str(e)}
+
+
+@mcp.tool()
+@flag_stale
+async def get_stock_history(symbol: str, period: str = "1mo", interval: str = "1d") -> dict:
     """
     Get historical stock price data with OHLCV (Open, High, Low, Close, Volume).
     
@@ -66,7 +183,7 @@ def get_stock_history(symbol: str, period: str = "1mo", interval: str = "1d") ->
         Historical price data with OHLCV candles
     """
     try:
-        history = stock_service.get_history(symbol, period, interval)
+        history = await run_blocking(stock_service.get_history, symbol, period, interval)
         return history.model_dump()
     except Exception as e:
         return {"error": str(e)}
@@ -74,25 +191,55 @@ def get_stock_history(symbol: str, period: str = "1mo", interval: str = "1d") ->
 
 # Cryptocurrency data tools
 @mcp.tool()
-def get_crypto_data(symbol: str) -> dict:
+@flag_stale
+async def get_crypto_data(symbol: str, exchange: Optional[str] = None) -> dict:
     """
     Get real-time cryptocurrency market data including price, volume, and market metrics.
     
     Args:
         symbol: Crypto symbol or trading pair (e.g., BTC, ETH, BTC/USDT)
+        exchange: Exchange id (e.g., binance, okx). Default: the configured default exchange
     
     Returns:
         Current cryptocurrency market data
     """
     try:
-        data = crypto_service.get_crypto_data(symbol)
+        data = await run_blocking(crypto_pool.get(exchange).get_crypto_data, symbol)
         return data.model_dump()
     except Exception as e:
         return {"error": str(e)}
 
 
 @mcp.tool()
-def get_crypto_history(symbol: str, timeframe: str = "1d", limit: int = 100) -> dict:
+@flag_stale
+async def get_consolidated_quote(symbol: str, exchanges: Optional[List[str]] = None) -> dict:
+    """
+    Get the best bid/ask and volume-weighted price for a trading pair across several exchanges, queried concurrently.
+    
+    Args:
+        symbol: Crypto symbol or trading pair (e.g., BTC, BTC/USDT)
+        exchanges: Exchange ids to compare (e.g., ["binance", "okx"]). Default: all configured exchanges
+    
+    Returns:
+        Best bid and ask with their exchanges, volume-weighted price and per-exchange prices and latency
+    """
+    try:
+        quote = await crypto_pool.consolidated_quote(symbol, exchanges)
+        return quote.model_dump()
+    except Exception as e:
+        return {"error": str(e)}
+
+
+@mcp.tool()
+@flag_stale
+async def get_crypto_history(
+    symbol: str,
+    timeframe: str = "1d",
+    limit: int = 100,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    exchange: Optional[str] = None
+) -> dict:
     """
     Get historical cryptocurrency price data with OHLCV candles.
     
@@ -100,37 +247,86 @@ def get_crypto_history(symbol: str, timeframe: str = "1d", limit: int = 100) ->
         symbol: Crypto symbol or trading pair
         timeframe: Candle timeframe (1m, 5m, 15m, 30m, 1h, 4h, 1d, 1w, 1M). Default: 1d
         limit: Number of data points to retrieve. Default: 100
+        start: Optional range start (ISO 8601). When set, every candle from start to end is returned
+        end: Optional range end (ISO 8601). Default: now
+        exchange: Exchange id (e.g., binance, okx). Default: the configured default exchange
     
     Returns:
         Historical cryptocurrency price data
     """
     try:
-        history = crypto_service.get_history(symbol, timeframe, limit)
+        history = await run_blocking(
+            crypto_pool.get(exchange).get_history,
+            symbol,
+            timeframe,
+            limit,
+            datetime.fromisoformat(start) if start else None,
+            datetime.fromisoformat(end) if end else None
+        )
         return history.model_dump()
     except Exception as e:
         return {"error": str(e)}
 
 
 @mcp.tool()
-def list_cryptocurrencies(limit: int = 100) -> dict:
+@flag_stale
+async def get_indicators(
+    symbol: str,
+    asset_type: str = "stock",
+    interval: str = "1d",
+    period: str = "6mo",
+    limit: int = 200,
+    indicators: str = "sma,ema,rsi,macd,bbands,vwap",
+    exchange: Optional[str] = None
+) -> dict:
+    """
+    Get technical indicators (SMA, EMA, RSI, MACD, Bollinger Bands, VWAP) for a stock or cryptocurrency.
+    
+    Args:
+        symbol: Stock ticker or crypto symbol/trading pair
+        asset_type: Type of asset - "stock" or "crypto". Default: stock
+        interval: Candle interval (stock: 1m-1mo, crypto: 1m-1M). Default: 1d
+        period: Time period for stocks (1d, 5d, 1mo, 3mo, 6mo, 1y, 2y, 5y, max). Default: 6mo
+        limit: Number of candles for crypto. Default: 200
+        indicators: Comma-separated indicators to compute. Default: all
+        exchange: Exchange id for crypto (e.g., binance, okx). Default: the configured default exchange
+    
+    Returns:
+        Candle timestamps (epoch ms) and one value list per indicator
+    """
+    try:
+        params = IndicatorParams(indicators=indicators)
+        if asset_type.lower() == "crypto":
+            series = await run_blocking(crypto_pool.get(exchange).get_indicators, symbol, interval, limit, params)
+        else:
+            series = await run_blocking(StockService.get_indicators, symbol, period, interval, params)
+        return series.model_dump()
+    except Exception as e:
+        return {"error": str(e)}
+
+
+@mcp.tool()
+@flag_stale
+async def list_cryptocurrencies(limit: int = 100, exchange: Optional[str] = None) -> dict:
     """
     List available cryptocurrencies with basic information.
     
     Args:
         limit: Maximum number of cryptocurrencies to return. Default: 100
+        exchange: Exchange id (e.g., binance, okx). Default: the configured default exchange
     
     Returns:
         List of available cryptocurrencies
     """
     try:
-        cryptos = crypto_service.list_cryptocurrencies(limit)
+        cryptos = await run_blocking(crypto_pool.get(exchange).list_cryptocurrencies, limit)
         return {"cryptocurrencies": [c.model_dump() for c in cryptos]}
     except Exception as e:
         return {"error": str(e)}
 
 
 @mcp.tool()
-def search_symbols(query: str, asset_type: str = "stock", limit: int = 10) -> dict:
+async def search_symbols(query: str, asset_type: str = "stock", limit: int = 10, exchange: Optional[str] = None) -> dict:
     """
     Search for stock or cryptocurrency symbols.
     
@@ -138,15 +334,16 @@ def search_symbols(query: str, asset_type: str = "stock", limit: int = 10) -> di
         query: Search query
         asset_type: Type of asset to search (stock or crypto). Default: stock
         limit: Maximum number of results. Default: 10
+        exchange: Exchange id for crypto searches. Default: the configured default exchange
     
     Returns:
         List of matching symbols
     """
     try:
         if asset_type == "stock":
-            results = stock_service.search_symbols(query, limit)
+            results = await run_blocking(stock_service.search_symbols, query, limit)
         else:
-            results = crypto_service.search_symbols(query, limit)
+            results = await run_blocking(crypto_pool.get(exchange).search_symbols, query, limit)
         return {"results": results}
     except Exception as e:
         return {"error": str(e)}
@@ -1,13 +1,21 @@
-from .stock import StockData, StockQuote, StockHistory
-from .crypto import CryptoData, CryptoHistory
-from .common import TimeRange, DataPoint
+from .stock import StockData, StockQuote, StockQuoteBatch, StockHistory
+from .crypto import CryptoData, CryptoTickerBatch, CryptoHistory, VenueQuote, ConsolidatedQuote
+from .common import TimeRange, DataPoint, HistoryFormat, StreamFormat, IndicatorParams, IndicatorSeries
 
 __all__ = [
     "StockData",
     "StockQuote",
+    "StockQuoteBatch",
     "StockHistory",
     "CryptoData",
+    "CryptoTickerBatch",
     "CryptoHistory",
+    "VenueQuote",
+    "ConsolidatedQuote",
     "TimeRange",
     "DataPoint",
+    "HistoryFormat",
+    "StreamFormat",
+    "IndicatorParams",
+    "IndicatorSeries",
 ]
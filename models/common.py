@@ -1,7 +1,7 @@
 from datetime import datetime
 from enum import Enum
-from typing import Optional
-from pydantic import BaseModel, Field, ConfigDict, field_serializer
+from typing import Optional, List, Dict
+from pydantic import BaseModel, Field, ConfigDict, field_serializer, field_validator, model_validator
 
 
 class TimeRange(str, Enum):
@@ -27,6 +27,49 @@ class Interval(str, Enum):
     ONE_DAY = "1d"
     ONE_WEEK = "1wk"
     ONE_MONTH = "1mo"
+    
+    @property
+    def base(self) -> Optional["Interval"]:
+        """Finer interval this one is resampled from locally, or None if fetched directly"""
+        return _DERIVED_INTERVALS.get(self)
+    
+    @property
+    def milliseconds(self) -> Optional[int]:
+        """Fixed bar width, or None for calendar intervals"""
+        return _INTERVAL_MILLISECONDS.get(self)
+
+
+# Coarser intervals built from one fetched base series: intraday from 5m
+# bars (session aligned), weeks and months from daily bars (calendar aligned)
+_DERIVED_INTERVALS = {
+    Interval.FIFTEEN_MINUTES: Interval.FIVE_MINUTES,
+    Interval.THIRTY_MINUTES: Interval.FIVE_MINUTES,
+    Interval.ONE_HOUR: Interval.FIVE_MINUTES,
+    Interval.ONE_WEEK: Interval.ONE_DAY,
+    Interval.ONE_MONTH: Interval.ONE_DAY,
+}
+
+_INTERVAL_MILLISECONDS = {
+    Interval.ONE_MINUTE: 60 * 1000,
+    Interval.FIVE_MINUTES: 5 * 60 * 1000,
+    Interval.FIFTEEN_MINUTES: 15 * 60 * 1000,
+    Interval.THIRTY_MINUTES: 30 * 60 * 1000,
+    Interval.ONE_HOUR: 60 * 60 * 1000,
+    Interval.ONE_DAY: 24 * 60 * 60 * 1000,
+    Interval.ONE_WEEK: 7 * 24 * 60 * 60 * 1000,
+}
+
+
+class HistoryFormat(str, Enum):
+    """Response layout for historical data"""
+    ROWS = "rows"  # List of DataPoint objects
+    COLUMNAR = "columnar"  # Parallel t/o/h/l/c/v arrays
+
+
+class StreamFormat(str, Enum):
+    """Wire format for streamed historical data"""
+    NDJSON = "ndjson"  # One {"t", "o", "h", "l", "c", "v"} object per line
+    ARROW = "arrow"  # Arrow IPC stream of record batches
 
 
 class DataPoint(BaseModel):
@@ -43,6 +86,51 @@ class DataPoint(BaseModel):
         return dt.isoformat()
 
 
+SUPPORTED_INDICATORS = ("sma", "ema", "rsi", "macd", "bbands", "vwap")
+
+
+class IndicatorParams(BaseModel):
+    """Technical indicator selection and periods"""
+    model_config = ConfigDict(frozen=True)
+    
+    indicators: tuple = SUPPORTED_INDICATORS
+    sma_period: int = Field(default=20, ge=1)
+    ema_period: int = Field(default=20, ge=1)
+    rsi_period: int = Field(default=14, ge=1)
+    macd_fast: int = Field(default=12, ge=1)
+    macd_slow: int = Field(default=26, ge=1)
+    macd_signal: int = Field(default=9, ge=1)
+    bb_period: int = Field(default=20, ge=1)
+    bb_std: float = Field(default=2.0, gt=0)
+    
+    @field_validator('indicators', mode='before')
+    @classmethod
+    def parse_indicators(cls, value):
+        if isinstance(value, str):
+            value = value.split(",")
+        names = tuple(dict.fromkeys(name.strip().lower() for name in value if name.strip()))
+        unknown = [name for name in names if name not in SUPPORTED_INDICATORS]
+        if unknown:
+            raise ValueError(f"Unsupported indicators: {', '.join(unknown)} (choose from {', '.join(SUPPORTED_INDICATORS)})")
+        if not names:
+            raise ValueError("At least one indicator is required")
+        return names
+    
+    @model_validator(mode='after')
+    def check_macd_periods(self):
+        if self.macd_fast >= self.macd_slow:
+            raise ValueError("macd_fast must be shorter than macd_slow")
+        return self
+
+
+class IndicatorSeries(BaseModel):
+    """Technical indicators aligned to candle timestamps"""
+    symbol: str
+    interval: str
+    t: List[int]  # Candle open time, epoch ms (UTC)
+    values: Dict[str, List[Optional[float]]]
+
+
 class MarketStatus(str, Enum):
     """Market status"""
     OPEN = "open"
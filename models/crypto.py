@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import Optional, List
+from typing import Optional, List, Dict
 from pydantic import BaseModel, Field, ConfigDict, field_serializer
 from .common import DataPoint
 
@@ -37,6 +37,40 @@ class CryptoData(BaseModel):
         return dt.isoformat() if dt else None
 
 
+class CryptoTickerBatch(BaseModel):
+    """Real-time data for several cryptocurrencies"""
+    tickers: List[CryptoData]
+    errors: Dict[str, str] = Field(default_factory=dict)
+
+
+class VenueQuote(BaseModel):
+    """Top-of-book quote from one exchange"""
+    exchange: str
+    price: Optional[float] = None
+    bid: Optional[float] = None
+    ask: Optional[float] = None
+    volume_24h: Optional[float] = None  # Base currency
+    latency_ms: float
+    error: Optional[str] = None
+
+
+class ConsolidatedQuote(BaseModel):
+    """Best prices for one trading pair across several exchanges"""
+    symbol: str
+    best_bid: Optional[float] = None
+    best_bid_exchange: Optional[str] = None
+    best_ask: Optional[float] = None
+    best_ask_exchange: Optional[str] = None
+    vwap: Optional[float] = None  # Last prices weighted by each venue's 24h volume
+    volume_24h: float = 0.0
+    venues: List[VenueQuote]
+    timestamp: datetime
+    
+    @field_serializer('timestamp')
+    def serialize_timestamp(self, dt: datetime) -> str:
+        return dt.isoformat()
+
+
 class CryptoHistory(BaseModel):
     """Historical cryptocurrency data"""
     symbol: str
@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import Optional, List
+from typing import Optional, List, Dict
 from pydantic import BaseModel, Field, ConfigDict, field_serializer
 from .common import DataPoint, MarketStatus
 
@@ -26,6 +26,12 @@ class StockQuote(BaseModel):
         return dt.isoformat()
 
 
+class StockQuoteBatch(BaseModel):
+    """Real-time quotes for several stocks"""
+    quotes: List[StockQuote]
+    errors: Dict[str, str] = Field(default_factory=dict)
+
+
 class StockData(BaseModel):
     """Comprehensive stock data"""
     symbol: str
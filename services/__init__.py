@@ -1,4 +1,5 @@
 from .stock_service import StockService
 from .crypto_service import CryptoService
+from .exchange_pool import ExchangePool
 
-__all__ = ["StockService", "CryptoService"]
+__all__ = ["StockService", "CryptoService", "ExchangePool"]
@@ -0,0 +1,247 @@
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable, Optional
+from config import settings
+from services.rate_limit import Priority, bind_priority
+from services.resilience import CircuitOpenError, mark_stale
+
+
+# Shared pool for stale-while-revalidate background refreshes
+_refresh_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="cache-refresh")
+
+
+class TTLCache:
+    """Bounded, thread-safe LRU cache with a freshness TTL and stale-while-revalidate"""
+    
+    def __init__(
+        self,
+        name: str,
+        ttl: float,
+        maxsize: int = 1024,
+        stale_ttl: float = 0.0
+    ):
+        """
+        Initialize the cache
+        
+        Args:
+            name: Cache name used in stats output
+            ttl: Seconds an entry is considered fresh
+            maxsize: Maximum number of entries before LRU eviction
+            stale_ttl: Extra seconds a stale entry may still be served while it is refreshed
+        """
+        self.name = name
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.stale_ttl = stale_ttl
+        
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._refreshing: set = set()
+        self._lock = threading.Lock()
+        
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.refreshes = 0
+        self.fallbacks = 0
+    
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return a fresh cached value, or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.monotonic() - entry[1] >= self.ttl:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return entry[0]
+    
+    def set(self, key: Hashable, value: Any, age: float = 0.0) -> None:
+        """
+        Store a value, evicting least recently used entries when full
+        
+        Args:
+            key: Cache key
+            value: Value to store
+            age: Seconds the value is already old (e.g. restored from disk)
+        """
+        with self._lock:
+            self._store(key, value, age)
+    
+    def invalidate(self, key: Hashable) -> None:
+        """Drop a single entry"""
+        with self._lock:
+            self._entries.pop(key, None)
+    
+    def clear(self) -> None:
+        """Drop every entry"""
+        with self._lock:
+            self._entries.clear()
+    
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        """
+        Return the cached value for key, loading it on a miss
+        
+        Fresh entries are returned directly. Entries inside the stale window
+        are returned immediately while a single background refresh runs.
+        Anything older is loaded synchronously; if the provider's circuit is
+        open, an entry up to CIRCUIT_STALE_MAX_AGE old is served instead and
+        the request is flagged as stale.
+        
+        Args:
+            key: Cache key
+            loader: Zero-argument callable producing the value
+            
+        Returns:
+            Cached or freshly loaded value
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                age = now - entry[1]
+                if age < self.ttl:
+                    self.hits += 1
+                    self._entries.move_to_end(key)
+                    return entry[0]
+                if age < self.ttl + self.stale_ttl:
+                    self.stale_hits += 1
+                    self._entries.move_to_end(key)
+                    self._schedule(key, loader)
+                    return entry[0]
+            self.misses += 1
+        
+        try:
+            value = loader()
+        except CircuitOpenError:
+            fallback = self.get_fallback(key)
+            if fallback is None:
+                raise
+            return fallback
+        self.set(key, value)
+        return value
+    
+    def get_fallback(self, key: Hashable) -> Optional[Any]:
+        """
+        Return the last value for key even if expired, flagging the request as stale
+        
+        Used when the provider cannot be reached; values older than
+        CIRCUIT_STALE_MAX_AGE are not served.
+        
+        Args:
+            key: Cache key
+            
+        Returns:
+            The last cached value, or None
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            age = time.monotonic() - entry[1]
+            if age >= settings.CIRCUIT_STALE_MAX_AGE:
+                return None
+            self.fallbacks += 1
+        mark_stale(self.name, age)
+        return entry[0]
+    
+    def get_or_schedule(self, key: Hashable, loader: Callable[[], Any]) -> Optional[Any]:
+        """
+        Return the cached value for key without ever waiting on the loader
+        
+        Fresh and stale entries behave as in get_or_load. On a miss a single
+        background load is started and None is returned, so the caller can
+        answer with what it has and later calls find the value cached.
+        
+        Args:
+            key: Cache key
+            loader: Zero-argument callable producing the value
+            
+        Returns:
+            Cached value, or None while it is being loaded
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                age = now - entry[1]
+                if age < self.ttl:
+                    self.hits += 1
+                    self._entries.move_to_end(key)
+                    return entry[0]
+                if age < self.ttl + self.stale_ttl:
+                    self.stale_hits += 1
+                    self._entries.move_to_end(key)
+                    self._schedule(key, loader)
+                    return entry[0]
+            self.misses += 1
+            self._schedule(key, loader)
+            return None
+    
+    def refresh(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        """
+        Load a value and store it regardless of the current entry's age
+        
+        Used to renew entries ahead of expiry; on failure the existing entry
+        is left untouched and the exception propagates.
+        
+        Args:
+            key: Cache key
+            loader: Zero-argument callable producing the value
+            
+        Returns:
+            The freshly loaded value
+        """
+        value = loader()
+        with self._lock:
+            self._store(key, value)
+            self.refreshes += 1
+        return value
+    
+    def stats(self) -> Dict[str, Any]:
+        """Return hit, miss and eviction counters"""
+        with self._lock:
+            lookups = self.hits + self.stale_hits + self.misses
+            return {
+                'name': self.name,
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'ttl': self.ttl,
+                'stale_ttl': self.stale_ttl,
+                'hits': self.hits,
+                'stale_hits': self.stale_hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'refreshes': self.refreshes,
+                'fallbacks': self.fallbacks,
+                'hit_ratio': (self.hits + self.stale_hits) / lookups if lookups else 0.0,
+            }
+    
+    def _store(self, key: Hashable, value: Any, age: float = 0.0) -> None:
+        self._entries[key] = (value, time.monotonic() - age)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+    
+    def _schedule(self, key: Hashable, loader: Callable[[], Any]) -> None:
+        # Caller holds the lock
+        if key not in self._refreshing:
+            self._refreshing.add(key)
+            # Nobody waits on a background refresh, so it yields to interactive calls
+            _refresh_executor.submit(bind_priority(self._refresh, Priority.PREFETCH), key, loader)
+    
+    def _refresh(self, key: Hashable, loader: Callable[[], Any]) -> None:
+        try:
+            value = loader()
+        except Exception:
+            # Keep serving the stale value; the next lookup past the window reloads
+            return
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+        with self._lock:
+            self._store(key, value)
+            self.refreshes += 1
@@ -0,0 +1,147 @@
+import os
+import sqlite3
+import threading
+from typing import List, Optional
+from config import settings
+
+
+class CandleStore:
+    """On-disk OHLCV store keyed by exchange, symbol and timeframe (SQLite)"""
+    
+    def __init__(self, path: str):
+        """
+        Open (or create) the candle database
+        
+        Args:
+            path: SQLite file path; ':memory:' keeps the store in memory
+        """
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS candles (
+                exchange TEXT NOT NULL,
+                symbol TEXT NOT NULL,
+                timeframe TEXT NOT NULL,
+                ts INTEGER NOT NULL,
+                open REAL NOT NULL,
+                high REAL NOT NULL,
+                low REAL NOT NULL,
+                close REAL NOT NULL,
+                volume REAL NOT NULL,
+                PRIMARY KEY (exchange, symbol, timeframe, ts)
+            ) WITHOUT ROWID
+            """
+        )
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS series (
+                exchange TEXT NOT NULL,
+                symbol TEXT NOT NULL,
+                timeframe TEXT NOT NULL,
+                first_ts INTEGER,
+                PRIMARY KEY (exchange, symbol, timeframe)
+            ) WITHOUT ROWID
+            """
+        )
+    
+    def read(
+        self,
+        exchange: str,
+        symbol: str,
+        timeframe: str,
+        start: Optional[int] = None,
+        end: Optional[int] = None,
+        limit: Optional[int] = None
+    ) -> List[list]:
+        """
+        Read stored candles in ascending timestamp order
+        
+        Args:
+            exchange: Exchange identifier
+            symbol: Trading pair
+            timeframe: Candle timeframe
+            start: Inclusive lower bound (epoch ms)
+            end: Inclusive upper bound (epoch ms)
+            limit: Return only the newest `limit` candles in the range
+            
+        Returns:
+            List of [timestamp, open, high, low, close, volume] rows
+        """
+        query = (
+            "SELECT ts, open, high, low, close, volume FROM candles "
+            "WHERE exchange = ? AND symbol = ? AND timeframe = ?"
+        )
+        params: list = [exchange, symbol, timeframe]
+        if start is not None:
+            query += " AND ts >= ?"
+            params.append(start)
+        if end is not None:
+            query += " AND ts <= ?"
+            params.append(end)
+        query += " ORDER BY ts DESC"
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+        
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        rows.reverse()
+        return [list(row) for row in rows]
+    
+    def write(self, exchange: str, symbol: str, timeframe: str, candles: List[list]) -> None:
+        """
+        Persist closed candles; existing rows for the same timestamp are kept
+        
+        Args:
+            exchange: Exchange identifier
+            symbol: Trading pair
+            timeframe: Candle timeframe
+            candles: [timestamp, open, high, low, close, volume] rows
+        """
+        if not candles:
+            return
+        rows = [(exchange, symbol, timeframe, int(c[0]), c[1], c[2], c[3], c[4], c[5] or 0.0) for c in candles]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO candles VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+    
+    def first_timestamp(self, exchange: str, symbol: str, timeframe: str) -> Optional[int]:
+        """Return the earliest candle the exchange is known to have, if recorded"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT first_ts FROM series WHERE exchange = ? AND symbol = ? AND timeframe = ?",
+                (exchange, symbol, timeframe)
+            ).fetchone()
+        return row[0] if row else None
+    
+    def set_first_timestamp(self, exchange: str, symbol: str, timeframe: str, ts: int) -> None:
+        """Record that the exchange has no candles before ts"""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO series VALUES (?, ?, ?, ?)",
+                (exchange, symbol, timeframe, int(ts))
+            )
+
+
+_store: Optional[CandleStore] = None
+_store_lock = threading.Lock()
+
+
+def get_candle_store() -> Optional[CandleStore]:
+    """Return the process-wide candle store, or None when it is disabled"""
+    global _store
+    if not settings.CANDLE_STORE_ENABLED:
+        return None
+    with _store_lock:
+        if _store is None:
+            _store = CandleStore(os.path.join(settings.DATA_CACHE_DIR, "candles.sqlite"))
+        return _store
@@ -0,0 +1,281 @@
+import gzip
+import importlib
+import json
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+import pandas as pd
+from config import settings
+
+# Query parameters that change on every request (clocks, signatures) and are
+# ignored when a request has no exact recording
+_VOLATILE_PARAMS = {
+    'timestamp', 'signature', 'recvwindow', 'nonce', 'starttime', 'endtime',
+    'since', 'start', 'end', 'from', 'to', 'after', 'before', '_',
+}
+
+# Library call arguments holding absolute dates; loose keys make them relative to the call day
+_TIME_ARGS = ('start', 'end')
+
+# Modules whose exception types a recorded error may be re-raised as
+_ERROR_MODULES = ('builtins', 'ccxt', 'yfinance', 'requests', 'curl_cffi', 'urllib3')
+
+# (exact key, loose key) of one upstream call
+KeyFunc = Callable[[str, tuple, dict], Tuple[str, str]]
+
+
+class CassetteMiss(LookupError):
+    """Raised in replay mode when no response was recorded for a call"""
+
+
+def call_key(method: str, args: tuple, kwargs: dict) -> Tuple[str, str]:
+    """Key a library call by method name and arguments; start/end become days from today in the loose key"""
+    key = json.dumps([method, list(args), kwargs], sort_keys=True, default=str)
+    bounds = {name: _days_from_today(kwargs[name]) for name in _TIME_ARGS if kwargs.get(name) is not None}
+    if not bounds:
+        return key, key
+    return key, json.dumps([method, list(args), {**kwargs, **bounds}], sort_keys=True, default=str)
+
+
+def _days_from_today(value: Any) -> Any:
+    """Express a date as an offset from the current day (e.g. today-30d), so rolling windows match later"""
+    try:
+        day = pd.Timestamp(value)
+    except (TypeError, ValueError):
+        return value
+    if day.tzinfo is not None:
+        day = day.tz_localize(None)
+    return f"today{(day.normalize() - _today()).days:+d}d"
+
+
+def _today() -> pd.Timestamp:
+    return pd.Timestamp.now().normalize()
+
+
+def http_key(method: str, args: tuple, kwargs: dict) -> Tuple[str, str]:
+    """Key a CCXT fetch(url, method, headers, body) call; headers are left out"""
+    url, http_method, _, body = (list(args) + [None] * 4)[:4]
+    http_method = http_method or kwargs.get('method') or 'GET'
+    body = body or kwargs.get('body') or ''
+    parts = urlsplit(url)
+    stable = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if k.lower() not in _VOLATILE_PARAMS]
+    loose_url = urlunsplit(parts._replace(query=urlencode(stable)))
+    return f"{http_method} {url} {body}", f"{http_method} {loose_url}"
+
+
+def _encode(value: Any) -> Any:
+    """Make a provider response JSON-serializable (DataFrames become column lists)"""
+    if isinstance(value, pd.DataFrame):
+        index = value.index
+        is_datetime = isinstance(index, pd.DatetimeIndex)
+        return {'__frame__': {
+            'index': index.as_unit('ns').asi8.tolist() if is_datetime else index.tolist(),
+            'datetime': is_datetime,
+            'tz': str(index.tz) if is_datetime and index.tz is not None else None,
+            'unit': index.unit if is_datetime else None,
+            'index_name': index.name,
+            'columns': [list(c) if isinstance(c, tuple) else c for c in value.columns],
+            'column_names': list(value.columns.names),
+            'data': [value.iloc[:, i].tolist() for i in range(value.shape[1])],
+        }}
+    return value
+
+
+def _decode(value: Any) -> Any:
+    if isinstance(value, dict) and '__frame__' in value:
+        spec = value['__frame__']
+        if spec['datetime']:
+            index = pd.to_datetime(spec['index'], utc=spec['tz'] is not None)
+            if spec['tz'] is not None:
+                index = index.tz_convert(spec['tz'])
+            index = index.as_unit(spec['unit'])
+        else:
+            index = pd.Index(spec['index'])
+        index.name = spec['index_name']
+        columns = spec['columns']
+        if columns and isinstance(columns[0], list):
+            columns = pd.MultiIndex.from_tuples([tuple(c) for c in columns], names=spec['column_names'])
+        frame = pd.DataFrame(dict(enumerate(spec['data'])), index=index)
+        frame.columns = columns
+        return frame
+    return value
+
+
+def _rebuild_error(spec: dict) -> Exception:
+    """Re-create a recorded exception, falling back to RuntimeError"""
+    module, _, name = spec['type'].rpartition('.')
+    if module.split('.')[0] in _ERROR_MODULES:
+        try:
+            cls = getattr(importlib.import_module(module), name)
+            if isinstance(cls, type) and issubclass(cls, Exception):
+                return cls(spec['message'])
+        except (ImportError, AttributeError, TypeError):
+            pass
+    return RuntimeError(f"{spec['type']}: {spec['message']}")
+
+
+class CassetteStore:
+    """
+    Record upstream responses to disk, or serve them back instead of the provider
+    
+    live: calls go to the provider untouched.
+    record: calls go to the provider, and every response or error is
+        appended to <dir>/<provider>.jsonl.gz with its latency.
+    replay: calls never reach the provider. A call gets the responses
+        recorded for the same arguments in their original order (repeating
+        the last one); failing that, one recorded for the same request
+        minus clock/signature parameters. Responses come back at once, or
+        after their recorded latency with REPLAY_RECORDED_LATENCY.
+    """
+    
+    def __init__(self, mode: str, path: str):
+        """
+        Initialize the store
+        
+        Args:
+            mode: live, record or replay
+            path: Directory holding one cassette file per provider
+        """
+        if mode not in ('live', 'record', 'replay'):
+            raise ValueError(f"Unknown provider mode: {mode} (expected live, record or replay)")
+        self.mode = mode
+        self.path = path
+        self._lock = threading.Lock()
+        self._exact: Dict[str, Dict[str, List[str]]] = {}
+        self._loose: Dict[str, Dict[str, List[str]]] = {}
+        self._cursors: Dict[Tuple[str, str], int] = {}
+        self.recorded = 0
+        self.replayed = 0
+        self.loose_hits = 0
+        self.misses = 0
+    
+    @property
+    def replaying(self) -> bool:
+        return self.mode == 'replay'
+    
+    def wrap(
+        self,
+        provider: str,
+        method: str,
+        func: Callable[..., Any],
+        key: KeyFunc = call_key
+    ) -> Callable[..., Any]:
+        """
+        Route a blocking upstream call through the cassette
+        
+        Args:
+            provider: Provider name, which selects the cassette file (e.g. yahoo, binance)
+            method: Call label stored with each record (e.g. Ticker.history, fetch)
+            func: The upstream call
+            key: Builds the (exact, loose) lookup keys from the call's arguments
+            
+        Returns:
+            func itself in live mode, otherwise a recording or replaying wrapper
+        """
+        if self.mode == 'live':
+            return func
+        if self.mode == 'record':
+            def record(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    result = func(*args, **kwargs)
+                except Exception as e:
+                    self._append(provider, method, key(method, args, kwargs), time.perf_counter() - start, error=e)
+                    raise
+                self._append(provider, method, key(method, args, kwargs), time.perf_counter() - start, result=result)
+                return result
+            return record
+        
+        def replay(*args, **kwargs):
+            return self._replay(provider, method, key(method, args, kwargs))
+        return replay
+    
+    def _append(
+        self,
+        provider: str,
+        method: str,
+        keys: Tuple[str, str],
+        latency: float,
+        result: Any = None,
+        error: Optional[Exception] = None
+    ) -> None:
+        record = {'key': keys[0], 'loose': keys[1], 'method': method, 'latency': round(latency, 4)}
+        if error is not None:
+            record['error'] = {'type': f"{type(error).__module__}.{type(error).__qualname__}", 'message': str(error)}
+        else:
+            record['result'] = _encode(result)
+        line = json.dumps(record, default=str) + "\n"
+        with self._lock:
+            os.makedirs(self.path, exist_ok=True)
+            # Each append adds a gzip member; readers see them as one stream
+            with gzip.open(self._file(provider), 'at', encoding='utf-8') as f:
+                f.write(line)
+            self.recorded += 1
+    
+    def _replay(self, provider: str, method: str, keys: Tuple[str, str]) -> Any:
+        exact, loose = self._index(provider)
+        with self._lock:
+            lines = exact.get(keys[0])
+            cursor_key = (provider, keys[0])
+            if lines is None:
+                lines = loose.get(keys[1])
+                cursor_key = (provider, keys[1])
+                if lines is None:
+                    self.misses += 1
+                    raise CassetteMiss(f"No recorded {provider} response for {method} {keys[0]}")
+                self.loose_hits += 1
+            position = self._cursors.get(cursor_key, 0)
+            self._cursors[cursor_key] = position + 1
+            self.replayed += 1
+        record = json.loads(lines[min(position, len(lines) - 1)])
+        if settings.REPLAY_RECORDED_LATENCY:
+            time.sleep(record['latency'])
+        if 'error' in record:
+            raise _rebuild_error(record['error'])
+        return _decode(record['result'])
+    
+    def _index(self, provider: str) -> Tuple[Dict[str, List[str]], Dict[str, List[str]]]:
+        """Load a provider's cassette into memory on first use"""
+        exact = self._exact.get(provider)
+        if exact is not None:
+            return exact, self._loose[provider]
+        with self._lock:
+            if provider not in self._exact:
+                exact, loose = {}, {}
+                try:
+                    with gzip.open(self._file(provider), 'rt', encoding='utf-8') as f:
+                        for line in f:
+                            # Lines are kept raw and decoded per call, so callers
+                            # never share (and mutate) one response object
+                            record = json.loads(line)
+                            exact.setdefault(record['key'], []).append(line)
+                            loose.setdefault(record['loose'], []).append(line)
+                except FileNotFoundError:
+                    pass
+                self._loose[provider] = loose
+                self._exact[provider] = exact
+            return self._exact[provider], self._loose[provider]
+    
+    def _file(self, provider: str) -> str:
+        return os.path.join(self.path, f"{provider}.jsonl.gz")
+    
+    def stats(self) -> Dict[str, Any]:
+        """Return the mode, cassette directory and record/replay counters"""
+        with self._lock:
+            return {
+                'mode': self.mode,
+                'path': self.path,
+                'recorded': self.recorded,
+                'replayed': self.replayed,
+                'loose_hits': self.loose_hits,
+                'misses': self.misses,
+                'indexed': {provider: len(keys) for provider, keys in self._exact.items()},
+            }
+
+
+cassettes = CassetteStore(
+    settings.PROVIDER_MODE,
+    settings.CASSETTE_DIR or os.path.join(settings.DATA_CACHE_DIR, "cassettes")
+)
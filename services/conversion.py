@@ -0,0 +1,113 @@
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence
+import numpy as np
+import pandas as pd
+from models.common import DataPoint
+from services.tracing import traced
+
+# Column keys of the compact history format
+COLUMNS = ('t', 'o', 'h', 'l', 'c', 'v')
+
+
+@traced("convert")
+def frame_to_columns(frame: pd.DataFrame) -> Dict[str, np.ndarray]:
+    """
+    Convert a yfinance OHLCV DataFrame into column arrays
+    
+    Args:
+        frame: DataFrame indexed by timestamp with Open/High/Low/Close/Volume columns
+        
+    Returns:
+        Dict of NumPy arrays keyed by t (epoch ms), o, h, l, c, v
+    """
+    index = frame.index
+    if index.tz is None:
+        index = index.tz_localize('UTC')
+    return {
+        't': index.as_unit('ms').asi8,
+        'o': frame['Open'].to_numpy(dtype=np.float64),
+        'h': frame['High'].to_numpy(dtype=np.float64),
+        'l': frame['Low'].to_numpy(dtype=np.float64),
+        'c': frame['Close'].to_numpy(dtype=np.float64),
+        'v': frame['Volume'].to_numpy(dtype=np.float64),
+    }
+
+
+@traced("convert")
+def candles_to_columns(candles: List[list]) -> Dict[str, np.ndarray]:
+    """
+    Convert ccxt OHLCV rows into column arrays
+    
+    Args:
+        candles: [timestamp, open, high, low, close, volume] rows
+        
+    Returns:
+        Dict of NumPy arrays keyed by t (epoch ms), o, h, l, c, v
+    """
+    matrix = np.asarray(candles, dtype=np.float64).reshape(-1, 6)
+    columns = {key: matrix[:, i] for i, key in enumerate(COLUMNS)}
+    columns['t'] = columns['t'].astype(np.int64)
+    return columns
+
+
+@traced("convert")
+def columns_to_candles(columns: Dict[str, np.ndarray]) -> List[list]:
+    """Convert column arrays back into ccxt-style [t, o, h, l, c, v] rows"""
+    return [
+        list(row)
+        for row in zip(*(columns[key].tolist() for key in COLUMNS))
+    ]
+
+
+@traced("convert")
+def columns_to_lists(columns: Dict[str, np.ndarray]) -> Dict[str, list]:
+    """Convert column arrays into JSON-ready lists (NaN becomes null)"""
+    result = {}
+    for key in COLUMNS:
+        values = columns[key]
+        if values.dtype.kind == 'f' and np.isnan(values).any():
+            result[key] = np.where(np.isnan(values), None, values).tolist()
+        else:
+            result[key] = values.tolist()
+    return result
+
+
+# Per-row model construction is where pydantic validation cost shows up
+@traced("validate")
+def columns_to_data_points(
+    columns: Dict[str, np.ndarray],
+    timestamps: Optional[Sequence[datetime]] = None
+) -> List[DataPoint]:
+    """
+    Build DataPoint objects from column arrays in one pass
+    
+    Values are pulled out of the arrays as whole Python lists up front, and
+    rows are built with model_construct: the arrays already hold floats and
+    the timestamps datetimes, so per-row pydantic validation would only
+    repeat what the conversion guarantees.
+    
+    Args:
+        columns: Column arrays as produced by frame_to_columns or candles_to_columns
+        timestamps: Datetimes to use instead of `t` (e.g. a tz-aware DataFrame index);
+            by default `t` is converted to local naive datetimes
+            
+    Returns:
+        List of DataPoint objects in column order
+    """
+    if timestamps is None:
+        timestamps = [datetime.fromtimestamp(ms / 1000) for ms in columns['t'].tolist()]
+    
+    # Every field is given, so the fields set is shared instead of derived per row
+    construct = DataPoint.model_construct
+    fields_set = set(DataPoint.model_fields)
+    return [
+        construct(fields_set, timestamp=ts, open=o, high=h, low=l, close=c, volume=v)
+        for ts, o, h, l, c, v in zip(
+            timestamps,
+            columns['o'].tolist(),
+            columns['h'].tolist(),
+            columns['l'].tolist(),
+            columns['c'].tolist(),
+            columns['v'].tolist()
+        )
+    ]
@@ -1,49 +1,636 @@
-from datetime import datetime
-from typing import Optional, List
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Optional, List, Dict, Callable, Iterator
 import ccxt
-from models.crypto import CryptoData, CryptoHistory, CryptoListItem
-from models.common import DataPoint
+import numpy as np
+from config import settings
+from models.crypto import CryptoData, CryptoHistory, CryptoListItem, CryptoTickerBatch
+from models.common import DataPoint, IndicatorParams, IndicatorSeries
+from services import metrics
+from services.cache import TTLCache
+from services.cassette import cassettes, http_key
+from services.candle_store import get_candle_store
+from services.conversion import candles_to_columns, columns_to_candles, columns_to_lists, columns_to_data_points
+from services.indicators import engine as indicator_engine, values_to_lists
+from services.rate_limit import Priority, bind_priority, current_priority, priority, scheduler
+from services.resample import resample_fixed, DAY_MS, WEEK_OFFSET_MS
+from services.resilience import CircuitOpenError, guards, mark_stale
+from services.singleflight import coalesce
+from services.symbol_index import SymbolIndex
+
+logger = logging.getLogger(__name__)
+
+# CCXT client methods reported by name in the upstream metrics
+_INSTRUMENTED_METHODS = ("load_markets", "fetch_ticker", "fetch_tickers", "fetch_ohlcv")
+
+
+def _to_millis(dt: datetime) -> int:
+    """Convert a datetime to epoch milliseconds, reading naive values as UTC"""
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return int(dt.timestamp() * 1000)
 
 
 class CryptoService:
     """Service for fetching cryptocurrency data using CCXT"""
     
-    def __init__(self, exchange_id: str = 'binance'):
+    def __init__(self, exchange_id: str = 'binance', config: Optional[dict] = None):
         """
         Initialize crypto service with exchange
         
         Args:
             exchange_id: Exchange identifier (default: binance)
+            config: Extra CCXT client options (e.g. apiKey, secret, password)
         """
         exchange_class = getattr(ccxt, exchange_id)
         self.exchange = exchange_class({
             'enableRateLimit': True,
+            **(config or {}),
         })
+        # Every CCXT request (including load_markets) passes through throttle(cost);
+        # routing it to the shared bucket applies the priorities and endpoint weights
+        self._limiter = scheduler.bucket(exchange_id, rate=1000 / self.exchange.rateLimit)
+        if cassettes.replaying:
+            # Recorded responses spend no upstream budget
+            self.exchange.throttle = lambda cost=None: 0.0
+        else:
+            self.exchange.throttle = lambda cost=None: self._limiter.acquire(1 if cost is None else cost)
+        # ...and every HTTP round trip through fetch(), which the circuit breaker wraps;
+        # only network-level errors and timeouts count against the exchange
+        self._guard = guards.guard(
+            exchange_id,
+            is_failure=lambda e: isinstance(e, ccxt.NetworkError),
+            bucket=self._limiter
+        )
+        # Record/replay happens at the HTTP level, so CCXT still parses every response
+        fetch = cassettes.wrap(exchange_id, "fetch", self.exchange.fetch, key=http_key)
+        self.exchange.fetch = lambda url, method='GET', headers=None, body=None: metrics.observe_upstream(
+            exchange_id, metrics.current_upstream_method(),
+            self._guard.call, fetch, url, method, headers, body,
+            # Signed requests carry a nonce and cannot be sent twice
+            hedge=method == 'GET' and not self.exchange.apiKey
+        )
+        # Label those round trips with the unified method that made them
+        for name in _INSTRUMENTED_METHODS:
+            setattr(self.exchange, name, metrics.upstream_method(name, getattr(self.exchange, name)))
+        
+        self._store = get_candle_store()
+        self._markets_lock = threading.Lock()
+        self._markets_cache = TTLCache(
+            f"crypto_markets:{exchange_id}",
+            ttl=settings.CRYPTO_MARKETS_TTL,
+            maxsize=1,
+            stale_ttl=settings.CRYPTO_MARKETS_STALE_TTL
+        )
+        self._markets_path = os.path.join(settings.DATA_CACHE_DIR, "markets", f"{exchange_id}.json")
+        self._markets_restored = False
+        self._symbol_index = SymbolIndex([], ())
+        self._quote_pairs: List[str] = []
+        self._ticker_cache = TTLCache(
+            f"crypto_tickers:{exchange_id}",
+            ttl=settings.CRYPTO_TICKER_TTL,
+            maxsize=settings.CACHE_MAX_ENTRIES * 4
+        )
+        # Keyed by (symbol, UTC day start), so entries roll over at the daily boundary
+        self._daily_close_cache = TTLCache(
+            f"crypto_daily_close:{exchange_id}",
+            ttl=DAY_MS / 1000,
+            maxsize=settings.CACHE_MAX_ENTRIES * 4
+        )
+    
+    def _get_markets(self) -> dict:
+        """
+        Return the exchange market metadata, reloading it once it expires
+        
+        After startup the on-disk snapshot is used first, so no network round
+        trip is needed; once it is older than CRYPTO_MARKETS_TTL it keeps being
+        served while a single background reload runs.
+        """
+        if not self._markets_restored:
+            self._restore_markets()
+        return self._markets_cache.get_or_load('markets', self._fetch_markets)
+    
+    def _fetch_markets(self) -> dict:
+        markets = self.exchange.load_markets(reload=True)
+        self._write_markets_snapshot(markets)
+        self._build_index(markets)
+        return markets
+    
+    def _restore_markets(self) -> None:
+        """Seed the market cache and index from the on-disk snapshot, if usable"""
+        with self._markets_lock:
+            if self._markets_restored:
+                return
+            self._markets_restored = True
+            try:
+                age = time.time() - os.path.getmtime(self._markets_path)
+                if age >= settings.CRYPTO_MARKETS_TTL + settings.CRYPTO_MARKETS_STALE_TTL:
+                    return
+                with open(self._markets_path) as f:
+                    snapshot = json.load(f)
+            except (OSError, ValueError):
+                return
+        
+        markets = snapshot['markets']
+        self.exchange.set_markets(markets, snapshot.get('currencies'))
+        self._build_index(markets)
+        self._markets_cache.set('markets', markets, age=max(age, 0.0))
+    
+    def _write_markets_snapshot(self, markets: dict) -> None:
+        # Write to a temporary file and rename so readers never see a partial snapshot
+        try:
+            os.makedirs(os.path.dirname(self._markets_path), exist_ok=True)
+            temp_path = f"{self._markets_path}.{os.getpid()}.tmp"
+            with open(temp_path, "w") as f:
+                json.dump({'markets': markets, 'currencies': self.exchange.currencies}, f, default=str)
+            os.replace(temp_path, self._markets_path)
+        except (OSError, TypeError, ValueError) as e:
+            logger.warning("Could not save market snapshot for %s: %s", self.exchange.id, e)
+    
+    def _build_index(self, markets: dict) -> None:
+        """Rebuild the symbol search index and listing, then swap them in at once"""
+        records = [
+            {
+                'symbol': symbol,
+                'name': market.get('base') or symbol.split('/')[0],
+                'quote': market.get('quote') or '',
+                'exchange': self.exchange.id,
+                'type': 'crypto'
+            }
+            for symbol, market in markets.items()
+        ]
+        # Ties go to spot markets quoted in the most common currencies
+        preferred = {quote: i for i, quote in enumerate(settings.CRYPTO_PREFERRED_QUOTES)}
+        records.sort(key=lambda r: (
+            ':' in r['symbol'],
+            preferred.get(r['quote'], len(preferred)),
+            r['symbol']
+        ))
+        
+        index = SymbolIndex(records, ('name', 'symbol', 'quote'))
+        quote_pairs = [symbol for symbol in markets if '/USDT' in symbol]
+        self._symbol_index, self._quote_pairs = index, quote_pairs
+    
+    def _get_tickers(self, symbols: List[str]) -> Dict[str, dict]:
+        """
+        Return tickers for symbols from the cached market snapshot
+        
+        Exchanges with a bulk fetchTickers call refresh the whole snapshot in one
+        request; others fetch only the stale symbols, in concurrent chunks.
+        
+        Args:
+            symbols: Normalized trading pairs
+            
+        Returns:
+            Mapping of symbol to ccxt ticker for every symbol the exchange returned
+        """
+        if self.exchange.has.get('fetchTickers'):
+            snapshot = self._ticker_cache.get_or_load('*', self._fetch_ticker_snapshot)
+            return {symbol: snapshot[symbol] for symbol in symbols if symbol in snapshot}
+        
+        tickers = {}
+        missing = []
+        for symbol in symbols:
+            ticker = self._ticker_cache.get(symbol)
+            if ticker is None:
+                missing.append(symbol)
+            else:
+                tickers[symbol] = ticker
+        
+        if missing:
+            fetched = self._fetch_ticker_chunks(tuple(missing))
+            for symbol, ticker in fetched.items():
+                self._ticker_cache.set(symbol, ticker)
+            tickers.update(fetched)
+        
+        return tickers
+    
+    @coalesce
+    def _fetch_ticker_snapshot(self) -> Dict[str, dict]:
+        """Fetch every ticker on the exchange with one bulk call"""
+        return self.exchange.fetch_tickers()
+    
+    @coalesce
+    def _fetch_ticker_chunks(self, symbols: tuple) -> Dict[str, dict]:
+        """Fetch tickers one by one, spreading chunks of symbols over worker threads"""
+        size = settings.CRYPTO_TICKER_CHUNK_SIZE
+        chunks = [symbols[i:i + size] for i in range(0, len(symbols), size)]
+        tickers = {}
+        with ThreadPoolExecutor(max_workers=min(len(chunks), settings.CRYPTO_TICKER_CONCURRENCY)) as pool:
+            for chunk in pool.map(bind_priority(self._fetch_ticker_chunk), chunks):
+                tickers.update(chunk)
+        return tickers
+    
+    def _fetch_ticker_chunk(self, symbols: tuple) -> Dict[str, dict]:
+        tickers = {}
+        for symbol in symbols:
+            try:
+                tickers[symbol] = self.exchange.fetch_ticker(symbol)
+            except Exception:
+                # Skip if unable to fetch ticker
+                continue
+        return tickers
+    
+    @staticmethod
+    def _normalize_symbol(symbol: str) -> str:
+        if '/' not in symbol:
+            return f"{symbol.upper()}/USDT"
+        return symbol.upper()
+    
+    def _load_candles(self, symbol: str, timeframe: str, limit: int) -> List[list]:
+        """
+        Return the newest `limit` candles, fetching only what the store lacks
+        
+        Closed candles are immutable, so once stored they are never fetched
+        again. A warm series costs one tail fetch covering the candles closed
+        since the last request plus the one still forming; holes inside the
+        requested window are fetched range by range. While the exchange's
+        circuit is open, the stored candles are served and flagged as stale.
+        
+        Args:
+            symbol: Normalized trading pair
+            timeframe: Candle timeframe
+            limit: Number of candles to return
+            
+        Returns:
+            List of [timestamp, open, high, low, close, volume] rows
+        """
+        # Calendar-month candles have no fixed width, so gaps cannot be computed
+        if timeframe.endswith('M'):
+            return self.exchange.fetch_ohlcv(symbol, timeframe, limit=limit)
+        
+        exchange_id = self.exchange.id
+        step = self.exchange.parse_timeframe(timeframe) * 1000
+        now = self.exchange.milliseconds()
+        if self._store is None:
+            return self._fetch_latest(symbol, timeframe, limit, step, now)
+        
+        stored = self._store.read(exchange_id, symbol, timeframe, limit=limit)
+        try:
+            return self._sync_candles(symbol, timeframe, limit, stored, step, now)
+        except CircuitOpenError:
+            if not stored:
+                raise
+            # Serve what the store has while the exchange is unreachable
+            mark_stale(f"candles:{exchange_id}", (now - stored[-1][0]) / 1000)
+            return stored
     
+    def _sync_candles(self, symbol: str, timeframe: str, limit: int, stored: List[list], step: int, now: int) -> List[list]:
+        """Bring the stored tail of a series up to date and fill holes in the window"""
+        exchange_id = self.exchange.id
+        behind = (now - stored[-1][0]) // step if stored else limit
+        if behind >= limit:
+            # Cold or too far behind: one full fetch replaces the tail fetch
+            candles = self._fetch_latest(symbol, timeframe, limit, step, now)
+            self._persist(symbol, timeframe, candles, step, now)
+            if candles and len(candles) < limit:
+                self._store.set_first_timestamp(exchange_id, symbol, timeframe, candles[0][0])
+            return candles
+        
+        tail = self._fetch_range(symbol, timeframe, stored[-1][0] + step, behind + 1, step)
+        self._persist(symbol, timeframe, tail, step, now)
+        series = {c[0]: c for c in stored}
+        series.update((c[0], c) for c in tail)
+        
+        end = max(series)
+        start = end - (limit - 1) * step
+        first = self._store.first_timestamp(exchange_id, symbol, timeframe)
+        if first is not None:
+            start = max(start, first)
+        
+        for gap_start, gap_end in self._find_gaps(series, start, end, step):
+            count = (gap_end - gap_start) // step + 1
+            fetched = self._fetch_range(symbol, timeframe, gap_start, count, step)
+            self._persist(symbol, timeframe, fetched, step, now)
+            series.update((c[0], c) for c in fetched)
+            if gap_start == start and (not fetched or fetched[0][0] > gap_start):
+                # The exchange has nothing earlier; don't ask again
+                self._store.set_first_timestamp(
+                    exchange_id, symbol, timeframe, fetched[0][0] if fetched else gap_end + step
+                )
+        
+        return [series[ts] for ts in sorted(series) if ts >= start][-limit:]
+    
+    def _ohlcv_page_size(self) -> int:
+        """Most candles one fetch_ohlcv call returns on this exchange, capped by CRYPTO_OHLCV_PAGE_SIZE"""
+        features = getattr(self.exchange, 'features', None) or {}
+        limit = ((features.get('spot') or {}).get('fetchOHLCV') or {}).get('limit')
+        return min(limit, settings.CRYPTO_OHLCV_PAGE_SIZE) if limit else settings.CRYPTO_OHLCV_PAGE_SIZE
+    
+    def _fetch_latest(self, symbol: str, timeframe: str, limit: int, step: int, now: int) -> List[list]:
+        """Fetch the newest `limit` candles, paging when the exchange returns fewer per call"""
+        if limit <= self._ohlcv_page_size():
+            return self.exchange.fetch_ohlcv(symbol, timeframe, limit=limit)
+        return self._fetch_range(symbol, timeframe, (now // step - (limit - 1)) * step, limit, step)
+    
+    def _fetch_range(self, symbol: str, timeframe: str, since: int, count: int, step: int) -> List[list]:
+        """
+        Fetch `count` candles from `since` in as many calls as the exchange's page size needs
+        
+        Stops early when a call returns fewer candles than asked for (the
+        series ends there) or none inside the range.
+        """
+        page_size = self._ohlcv_page_size()
+        end = since + count * step
+        candles = []
+        while since < end:
+            limit = min(page_size, -(-(end - since) // step))
+            fetched = [c for c in self.exchange.fetch_ohlcv(symbol, timeframe, since=since, limit=limit) if since <= c[0] < end]
+            candles.extend(fetched)
+            if len(fetched) < limit:
+                break
+            since = fetched[-1][0] + step
+        return candles
+    
+    def _derivation_base(self, timeframe: str) -> Optional[str]:
+        """Return the coarsest base timeframe that evenly divides timeframe, if any"""
+        if timeframe.endswith('M') or timeframe in settings.CRYPTO_BASE_TIMEFRAMES:
+            return None
+        target = self.exchange.parse_timeframe(timeframe)
+        candidates = [
+            base for base in settings.CRYPTO_BASE_TIMEFRAMES
+            if not base.endswith('M')
+            and self.exchange.parse_timeframe(base) < target
+            and target % self.exchange.parse_timeframe(base) == 0
+        ]
+        return max(candidates, key=self.exchange.parse_timeframe) if candidates else None
+    
+    def _load_derived_candles(self, symbol: str, timeframe: str, limit: int) -> Optional[List[list]]:
+        """
+        Build the newest `limit` candles by resampling a base timeframe
+        
+        Only the base series is fetched upstream (through the candle store), so
+        reading 1m, 5m, 15m, 1h and 4h candles costs two series (1m and 1h)
+        instead of five.
+        
+        Returns:
+            Candle rows, or None when timeframe is not derivable or would need
+            more than RESAMPLE_MAX_BASE_CANDLES base candles
+        """
+        base = self._derivation_base(timeframe)
+        if base is None:
+            return None
+        
+        base_ms = self.exchange.parse_timeframe(base) * 1000
+        target_ms = self.exchange.parse_timeframe(timeframe) * 1000
+        if (limit + 1) * (target_ms // base_ms) > settings.RESAMPLE_MAX_BASE_CANDLES:
+            return None
+        
+        offset = WEEK_OFFSET_MS if target_ms % (7 * DAY_MS) == 0 else 0
+        now = self.exchange.milliseconds()
+        start = ((now - offset) // target_ms - (limit - 1)) * target_ms + offset
+        # A client is waiting on the derived candles, so the base pages keep its priority
+        candles = [candle for page in self.iter_history_range(symbol, base, start, level=None) for candle in page]
+        if not candles:
+            return []
+        
+        bars = resample_fixed(candles_to_columns(candles), target_ms, offset)
+        return columns_to_candles(bars)[-limit:]
+    
+    def _persist(self, symbol: str, timeframe: str, candles: List[list], step: int, now: int) -> None:
+        # Only closed candles are immutable; the one still forming is never stored
+        closed = [c for c in candles if c[0] + step <= now]
+        self._store.write(self.exchange.id, symbol, timeframe, closed)
+    
+    def iter_history_range(
+        self,
+        symbol: str,
+        timeframe: str,
+        start: int,
+        end: Optional[int] = None,
+        progress: Optional[Callable[[int, int, int], None]] = None,
+        level: Optional[Priority] = Priority.BATCH
+    ) -> Iterator[List[list]]:
+        """
+        Stream candles for a time range, fetching exchange-sized pages in parallel
+        
+        The range is split into pages of as many candles as one exchange call
+        returns (at most CRYPTO_OHLCV_PAGE_SIZE). Pages
+        already complete in the candle store are read locally; the rest are
+        fetched concurrently (bounded by CRYPTO_HISTORY_CONCURRENCY and paced by
+        the exchange's rate-limit bucket, at batch priority for deep ranges). Pages are yielded in timestamp order,
+        deduplicated, as soon as each one and all before it are ready.
+        
+        Args:
+            symbol: Crypto trading pair (e.g., 'BTC/USDT')
+            timeframe: Candle timeframe
+            start: Range start (epoch ms, inclusive)
+            end: Range end (epoch ms, inclusive); defaults to now
+            progress: Optional callback(pages_done, pages_total, candles_so_far)
+            level: Lowest priority the pages are fetched with (None keeps the caller's)
+            
+        Yields:
+            Lists of [timestamp, open, high, low, close, volume] rows
+        """
+        symbol = self._normalize_symbol(symbol)
+        step = self.exchange.parse_timeframe(timeframe) * 1000
+        now = self.exchange.milliseconds()
+        end = min(end if end is not None else now, now)
+        if start > end:
+            raise ValueError("start must be before end")
+        
+        span = self._ohlcv_page_size() * step
+        pages = [(page_start, min(page_start + span, end + 1)) for page_start in range(start, end + 1, span)]
+        
+        pool = ThreadPoolExecutor(
+            max_workers=min(len(pages), settings.CRYPTO_HISTORY_CONCURRENCY),
+            thread_name_prefix="ohlcv-page"
+        )
+        pending = deque()
+        queued = iter(pages)
+        # Deep ranges are batch work; their pages queue behind interactive requests
+        load_page = bind_priority(self._load_page, current_priority() if level is None else max(current_priority(), level))
+        
+        def submit_next():
+            page = next(queued, None)
+            if page is not None:
+                pending.append(pool.submit(
+                    load_page, symbol, timeframe, page[0], page[1], step, now, page[0] == start
+                ))
+        
+        try:
+            # Keep a bounded window of pages in flight so memory stays flat
+            for _ in range(settings.CRYPTO_HISTORY_CONCURRENCY * 2):
+                submit_next()
+            
+            done = 0
+            total = 0
+            last_ts = None
+            while pending:
+                candles = pending.popleft().result()
+                submit_next()
+                if last_ts is not None:
+                    candles = [c for c in candles if c[0] > last_ts]
+                done += 1
+                total += len(candles)
+                logger.debug("%s %s history: page %d/%d, %d candles", symbol, timeframe, done, len(pages), total)
+                if progress:
+                    progress(done, len(pages), total)
+                if candles:
+                    last_ts = candles[-1][0]
+                    yield candles
+            logger.info("%s %s history: %d candles in %d pages", symbol, timeframe, total, len(pages))
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+    
+    def _load_page(
+        self,
+        symbol: str,
+        timeframe: str,
+        page_start: int,
+        page_end: int,
+        step: int,
+        now: int,
+        is_first: bool
+    ) -> List[list]:
+        """Return candles in [page_start, page_end) from the store, fetching if incomplete"""
+        use_store = self._store is not None and not timeframe.endswith('M')
+        stored = []
+        if use_store:
+            exchange_id = self.exchange.id
+            stored = self._store.read(exchange_id, symbol, timeframe, start=page_start, end=page_end - 1)
+            first = self._store.first_timestamp(exchange_id, symbol, timeframe)
+            if self._page_complete(stored, page_start, page_end, step, first):
+                return stored
+        
+        fetched = self._fetch_range(symbol, timeframe, page_start, -(-(page_end - page_start) // step), step)
+        
+        if use_store:
+            self._persist(symbol, timeframe, fetched, step, now)
+            if (is_first and fetched and fetched[0][0] - page_start >= step
+                    and not self._store.read(exchange_id, symbol, timeframe, end=page_start - 1, limit=1)):
+                # Nothing exists before the first candle returned
+                self._store.set_first_timestamp(exchange_id, symbol, timeframe, fetched[0][0])
+        
+        series = {c[0]: c for c in stored}
+        series.update((c[0], c) for c in fetched if page_start <= c[0] < page_end)
+        return [series[ts] for ts in sorted(series)]
+    
+    @staticmethod
+    def _page_complete(
+        stored: List[list],
+        page_start: int,
+        page_end: int,
+        step: int,
+        first: Optional[int]
+    ) -> bool:
+        if not stored:
+            return False
+        # The candle still forming is never stored, so a page reaching it fails tail_ok
+        head_ok = stored[0][0] - page_start < step or (first is not None and stored[0][0] <= first)
+        tail_ok = page_end - stored[-1][0] <= step
+        if not (head_ok and tail_ok):
+            return False
+        return all(b[0] - a[0] == step for a, b in zip(stored, stored[1:]))
+    
+    @staticmethod
+    def _find_gaps(series: Dict[int, list], start: int, end: int, step: int) -> List[tuple]:
+        """Return inclusive (start, end) timestamp ranges missing from series"""
+        gaps = []
+        gap_start = None
+        for ts in range(start, end + step, step):
+            if ts in series:
+                if gap_start is not None:
+                    gaps.append((gap_start, ts - step))
+                    gap_start = None
+            elif gap_start is None:
+                gap_start = ts
+        if gap_start is not None:
+            gaps.append((gap_start, end))
+        return gaps
+    
+    @coalesce
     def get_crypto_data(self, symbol: str) -> CryptoData:
         """
         Get real-time cryptocurrency data
         
+        A ticker cached within CRYPTO_TICKER_TTL (e.g. kept warm for the
+        watchlist) is served without an upstream call.
+        
         Args:
             symbol: Crypto trading pair (e.g., 'BTC/USDT', 'ETH/USDT')
             
         Returns:
             CryptoData object with current market data
         """
-        # Normalize symbol format
-        if '/' not in symbol:
-            symbol = f"{symbol.upper()}/USDT"
-        
-        # Get ticker data
-        ticker = self.exchange.fetch_ticker(symbol)
+        symbol = self._normalize_symbol(symbol)
+        ticker = self._fresh_ticker(symbol)
+        if ticker is None:
+            try:
+                ticker = self.exchange.fetch_ticker(symbol)
+            except CircuitOpenError:
+                ticker = self._last_ticker(symbol)
+                if ticker is None:
+                    raise
+            else:
+                # Answers repeats within the TTL, then the fallback for when the exchange is unreachable
+                self._ticker_cache.set(symbol, ticker)
         
-        # Get 24h OHLCV for additional metrics
-        ohlcv = self.exchange.fetch_ohlcv(symbol, '1d', limit=2)
+        # Most exchanges report the 24h change in the ticker; only fall back
+        # to the previous daily close when they do not
+        previous_close = None
+        if ticker.get('change') is None and ticker.get('percentage') is None:
+            previous_close = ticker.get('previousClose') or self._get_previous_close(symbol)
+        return self._ticker_to_data(symbol, ticker, previous_close)
+    
+    def _fresh_ticker(self, symbol: str) -> Optional[dict]:
+        """Return a cached ticker for symbol still within CRYPTO_TICKER_TTL, or None"""
+        ticker = self._ticker_cache.get(symbol)
+        if ticker is None and self.exchange.has.get('fetchTickers'):
+            ticker = (self._ticker_cache.get('*') or {}).get(symbol)
+        return ticker
+    
+    def _last_ticker(self, symbol: str) -> Optional[dict]:
+        """Return the most recent cached ticker for symbol, however old"""
+        ticker = self._ticker_cache.get_fallback(symbol)
+        if ticker is None:
+            snapshot = self._ticker_cache.get_fallback('*') or {}
+            ticker = snapshot.get(symbol)
+        return ticker
+    
+    def _get_previous_close(self, symbol: str) -> Optional[float]:
+        """Return the close of the last completed UTC day, fetched at most once per day"""
+        day_start = int(time.time() * 1000) // DAY_MS * DAY_MS
+        return self._daily_close_cache.get_or_load(
+            (symbol, day_start),
+            lambda: self._fetch_previous_close(symbol, day_start)
+        )
+    
+    def _fetch_previous_close(self, symbol: str, day_start: int) -> Optional[float]:
+        ohlcv = self.exchange.fetch_ohlcv(symbol, '1d', since=day_start - DAY_MS, limit=2)
+        closes = [candle[4] for candle in ohlcv if candle[0] < day_start]
+        return closes[-1] if closes else None
+    
+    @staticmethod
+    def _ticker_to_data(symbol: str, ticker: dict, previous_close: Optional[float] = None) -> CryptoData:
+        """
+        Build a CryptoData snapshot from a CCXT ticker
         
-        previous_close = ohlcv[0][4] if len(ohlcv) > 1 else ticker['last']
+        Args:
+            symbol: Normalized trading pair
+            ticker: CCXT ticker with at least 'last'
+            previous_close: Reference price when the ticker has no change
+                fields (default: the ticker's 24h open)
+                
+        Returns:
+            CryptoData object with current market data
+        """
         current_price = ticker['last']
-        change_24h = current_price - previous_close
-        change_percent_24h = (change_24h / previous_close * 100) if previous_close else 0
+        change_24h = ticker.get('change')
+        change_percent_24h = ticker.get('percentage')
+        if change_24h is None and change_percent_24h is not None and change_percent_24h != -100:
+            change_24h = current_price - current_price / (1 + change_percent_24h / 100)
+        if change_24h is None:
+            change_24h = current_price - (previous_close or ticker.get('open') or current_price)
+        if change_percent_24h is None:
+            base = current_price - change_24h
+            change_percent_24h = (change_24h / base * 100) if base else 0
         
         return CryptoData(
             symbol=symbol,
@@ -51,17 +638,20 @@ class CryptoService:
             price=current_price,
             change_24h=change_24h,
             change_percent_24h=change_percent_24h,
-            volume_24h=ticker.get('quoteVolume', 0),
+            volume_24h=ticker.get('quoteVolume') or 0,
             high_24h=ticker.get('high'),
             low_24h=ticker.get('low'),
-            timestamp=datetime.fromtimestamp(ticker['timestamp'] / 1000)
+            timestamp=datetime.fromtimestamp(ticker['timestamp'] / 1000) if ticker.get('timestamp') else datetime.now()
         )
     
+    @coalesce
     def get_history(
         self,
         symbol: str,
         timeframe: str = '1d',
-        limit: int = 100
+        limit: int = 100,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None
     ) -> CryptoHistory:
         """
         Get historical cryptocurrency data
@@ -69,31 +659,17 @@ class CryptoService:
         Args:
             symbol: Crypto trading pair (e.g., 'BTC/USDT')
             timeframe: Timeframe (1m, 5m, 15m, 30m, 1h, 4h, 1d, 1w, 1M)
-            limit: Number of data points to retrieve
+            limit: Number of data points to retrieve (ignored when start is given)
+            start: Range start; when given, every candle from start to end is returned
+            end: Range end (default: now)
             
         Returns:
             CryptoHistory object with historical data
         """
-        # Normalize symbol format
-        if '/' not in symbol:
-            symbol = f"{symbol.upper()}/USDT"
-        
-        # Fetch OHLCV data
-        ohlcv = self.exchange.fetch_ohlcv(symbol, timeframe, limit=limit)
-        
-        if not ohlcv:
-            raise ValueError(f"No historical data available for {symbol}")
+        symbol = self._normalize_symbol(symbol)
+        ohlcv = self._get_candles(symbol, timeframe, limit, start, end)
         
-        data_points = []
-        for candle in ohlcv:
-            data_points.append(DataPoint(
-                timestamp=datetime.fromtimestamp(candle[0] / 1000),
-                open=float(candle[1]),
-                high=float(candle[2]),
-                low=float(candle[3]),
-                close=float(candle[4]),
-                volume=float(candle[5])
-            ))
+        data_points = columns_to_data_points(candles_to_columns(ohlcv))
         
         return CryptoHistory(
             symbol=symbol,
@@ -103,6 +679,142 @@ class CryptoService:
             interval=timeframe
         )
     
+    @coalesce
+    def get_history_columns(
+        self,
+        symbol: str,
+        timeframe: str = '1d',
+        limit: int = 100,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None
+    ) -> dict:
+        """
+        Get historical cryptocurrency data in columnar form
+        
+        Builds the columns straight from the candle rows without any per-row
+        model objects; `t` holds epoch milliseconds (UTC).
+        
+        Args:
+            symbol: Crypto trading pair (e.g., 'BTC/USDT')
+            timeframe: Timeframe (1m, 5m, 15m, 30m, 1h, 4h, 1d, 1w, 1M)
+            limit: Number of data points to retrieve (ignored when start is given)
+            start: Range start; when given, every candle from start to end is returned
+            end: Range end (default: now)
+            
+        Returns:
+            Dict with symbol, interval and t/o/h/l/c/v lists
+        """
+        symbol = self._normalize_symbol(symbol)
+        ohlcv = self._get_candles(symbol, timeframe, limit, start, end)
+        
+        return {
+            'symbol': symbol,
+            'interval': timeframe,
+            **columns_to_lists(candles_to_columns(ohlcv))
+        }
+    
+    def iter_history_columns(
+        self,
+        symbol: str,
+        timeframe: str = '1d',
+        limit: int = 100,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None
+    ) -> Iterator[Dict[str, np.ndarray]]:
+        """
+        Stream historical cryptocurrency data as column-array chunks
+        
+        With a start, each page is yielded as soon as it is read from the
+        candle store or fetched, so memory stays flat for any range size.
+        
+        Args:
+            symbol: Crypto trading pair (e.g., 'BTC/USDT')
+            timeframe: Timeframe (1m, 5m, 15m, 30m, 1h, 4h, 1d, 1w, 1M)
+            limit: Number of data points to retrieve (ignored when start is given)
+            start: Range start
+            end: Range end (default: now)
+            
+        Yields:
+            Dicts of t/o/h/l/c/v arrays, one per page
+        """
+        symbol = self._normalize_symbol(symbol)
+        if start is None:
+            yield candles_to_columns(self._get_candles(symbol, timeframe, limit, None, None))
+            return
+        
+        empty = True
+        for page in self.iter_history_range(
+            symbol, timeframe, _to_millis(start), _to_millis(end) if end else None
+        ):
+            empty = False
+            yield candles_to_columns(page)
+        if empty:
+            raise ValueError(f"No historical data available for {symbol}")
+    
+    def get_indicators(
+        self,
+        symbol: str,
+        timeframe: str = '1d',
+        limit: int = 200,
+        params: Optional[IndicatorParams] = None
+    ) -> IndicatorSeries:
+        """
+        Compute technical indicators over historical cryptocurrency data
+        
+        Indicator state is cached per pair and timeframe, so repeated polls
+        over a window that slides forward only process the candles added
+        since the previous call.
+        
+        Args:
+            symbol: Crypto trading pair (e.g., 'BTC/USDT')
+            timeframe: Timeframe (1m, 5m, 15m, 30m, 1h, 4h, 1d, 1w, 1M)
+            limit: Number of candles to return indicators for
+            params: Indicator selection and periods (defaults when omitted)
+            
+        Returns:
+            IndicatorSeries aligned to the candle timestamps
+        """
+        params = params or IndicatorParams()
+        symbol = self._normalize_symbol(symbol)
+        columns = candles_to_columns(self._get_candles(symbol, timeframe, limit, None, None))
+        values = indicator_engine.compute(("crypto", self.exchange.id, symbol, timeframe), columns, params)
+        
+        return IndicatorSeries(
+            symbol=symbol,
+            interval=timeframe,
+            t=columns['t'].tolist(),
+            values=values_to_lists(values)
+        )
+    
+    def _get_candles(
+        self,
+        symbol: str,
+        timeframe: str,
+        limit: int,
+        start: Optional[datetime],
+        end: Optional[datetime]
+    ) -> List[list]:
+        if start is not None:
+            ohlcv = [
+                candle
+                for page in self.iter_history_range(
+                    symbol, timeframe, _to_millis(start), _to_millis(end) if end else None
+                )
+                for candle in page
+            ]
+        else:
+            # Served from the local candle store where possible, and resampled
+            # from a finer base timeframe when this one can be derived
+            ohlcv = self._load_derived_candles(symbol, timeframe, limit)
+            if ohlcv is None:
+                ohlcv = self._load_candles(symbol, timeframe, limit)
+        
+        if not ohlcv:
+            raise ValueError(f"No historical data available for {symbol}")
+        return ohlcv
+    
+    @coalesce
+    @priority(Priority.BATCH)
     def list_cryptocurrencies(self, limit: int = 100) -> List[CryptoListItem]:
         """
         List available cryptocurrencies
@@ -113,34 +825,100 @@ class CryptoService:
         Returns:
             List of CryptoListItem objects
         """
-        markets = self.exchange.load_markets()
+        self._get_markets()
         
-        # Filter for USDT pairs
-        usdt_pairs = [
-            symbol for symbol in markets.keys()
-            if '/USDT' in symbol
-        ][:limit]
+        # USDT pairs are listed once per market refresh
+        usdt_pairs = self._quote_pairs[:limit]
         
-        crypto_list = []
-        for symbol in usdt_pairs:
-            base_currency = symbol.split('/')[0]
-            try:
-                ticker = self.exchange.fetch_ticker(symbol)
-                crypto_list.append(CryptoListItem(
-                    symbol=symbol,
-                    name=base_currency,
-                    price=ticker.get('last'),
-                ))
-            except Exception:
-                # Skip if unable to fetch ticker
+        tickers = self._get_tickers(usdt_pairs)
+        
+        return [
+            CryptoListItem(
+                symbol=symbol,
+                name=symbol.split('/')[0],
+                price=tickers[symbol].get('last'),
+            )
+            for symbol in usdt_pairs
+            if symbol in tickers
+        ]
+    
+    @priority(Priority.BATCH)
+    def get_tickers(self, symbols: List[str]) -> CryptoTickerBatch:
+        """
+        Get real-time data for several cryptocurrencies from one ticker snapshot
+        
+        Change over 24h comes from the exchange's rolling 24h ticker fields.
+        
+        Args:
+            symbols: Crypto symbols or trading pairs (e.g., ['BTC', 'ETH/USDT'])
+            
+        Returns:
+            CryptoTickerBatch with data per resolved symbol and an error per failed one
+        """
+        symbols = list(dict.fromkeys(
+            self._normalize_symbol(s.strip()) for s in symbols if s.strip()
+        ))
+        if not symbols:
+            raise ValueError("No symbols provided")
+        
+        tickers = self._get_tickers(symbols)
+        
+        data = []
+        errors = {}
+        for symbol in symbols:
+            ticker = tickers.get(symbol)
+            if ticker is None or ticker.get('last') is None:
+                errors[symbol] = f"No ticker available for {symbol}"
                 continue
+            
+            data.append(self._ticker_to_data(symbol, ticker))
         
-        return crypto_list
+        return CryptoTickerBatch(tickers=data, errors=errors)
+    
+    @coalesce
+    def get_live_ticker(self, symbol: str) -> dict:
+        """
+        Fetch a fresh ticker for one symbol, bypassing the ticker cache TTL
+        
+        Used by the live ticker pollers; the result also refreshes the cache
+        so REST requests for the symbol see the same value.
+        
+        Args:
+            symbol: Normalized trading pair
+            
+        Returns:
+            Dict of live fields (price, bid, ask, 24h change, range and volume)
+        """
+        markets = self._get_markets()
+        if symbol not in markets:
+            raise ValueError(f"Unknown trading pair: {symbol}")
+        
+        ticker = self.exchange.fetch_ticker(symbol)
+        if ticker.get('last') is None:
+            raise ValueError(f"No ticker available for {symbol}")
+        if not self.exchange.has.get('fetchTickers'):
+            self._ticker_cache.set(symbol, ticker)
+        
+        return {
+            'price': ticker['last'],
+            'bid': ticker.get('bid'),
+            'ask': ticker.get('ask'),
+            'change_24h': ticker.get('change'),
+            'change_percent_24h': ticker.get('percentage'),
+            'high_24h': ticker.get('high'),
+            'low_24h': ticker.get('low'),
+            'volume_24h': ticker.get('quoteVolume'),
+            'base_volume_24h': ticker.get('baseVolume'),
+            'timestamp': ticker.get('timestamp'),
+        }
     
     def search_symbols(self, query: str, limit: int = 10) -> List[dict]:
         """
         Search for cryptocurrency symbols
         
+        Answered from the prebuilt market index: exact base or pair matches
+        first, then prefix, word-prefix and substring matches.
+        
         Args:
             query: Search query
             limit: Maximum number of results
@@ -148,18 +926,39 @@ class CryptoService:
         Returns:
             List of matching symbols
         """
-        markets = self.exchange.load_markets()
-        query_upper = query.upper()
+        self._get_markets()
         
-        matching_symbols = [
-            {
-                'symbol': symbol,
-                'name': symbol.split('/')[0],
-                'exchange': self.exchange.id,
-                'type': 'crypto'
-            }
-            for symbol in markets.keys()
-            if query_upper in symbol.upper()
-        ][:limit]
+        return [
+            {key: record[key] for key in ('symbol', 'name', 'exchange', 'type')}
+            for record in self._symbol_index.search(query, limit)
+        ]
+    
+    def refresh_tickers(self, symbols: List[str]) -> None:
+        """
+        Renew cached tickers for symbols ahead of expiry
+        
+        Exchanges with fetchTickers renew the whole snapshot in one call.
+        
+        Args:
+            symbols: Crypto symbols or trading pairs
+        """
+        if self.exchange.has.get('fetchTickers'):
+            self._ticker_cache.refresh('*', self._fetch_ticker_snapshot)
+            return
         
-        return matching_symbols
+        fetched = self._fetch_ticker_chunks(tuple(self._normalize_symbol(s) for s in symbols))
+        for symbol, ticker in fetched.items():
+            self._ticker_cache.set(symbol, ticker)
+    
+    def refresh_history(self, symbol: str, timeframe: str = '1d', limit: int = 100) -> None:
+        """Pull the newest candles for a pair into the candle store"""
+        self._load_candles(self._normalize_symbol(symbol), timeframe, limit)
+    
+    def cache_stats(self) -> List[dict]:
+        """
+        Get hit, miss and eviction counters for the market, ticker and daily close caches
+        
+        Returns:
+            List of per-cache statistics
+        """
+        return [self._markets_cache.stats(), self._ticker_cache.stats(), self._daily_close_cache.stats()]
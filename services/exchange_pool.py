@@ -0,0 +1,153 @@
+import asyncio
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+import ccxt
+from config import settings
+from models.crypto import ConsolidatedQuote, VenueQuote
+from services.crypto_service import CryptoService
+from services.executor import run_blocking
+
+
+class ExchangePool:
+    """
+    One CryptoService per exchange, created on first use
+    
+    Each service keeps its own CCXT client, market snapshot, caches and rate
+    limit pacing, so exchanges never share state. Only exchanges listed in
+    CRYPTO_EXCHANGES can be selected.
+    """
+    
+    def __init__(self, default: Optional[str] = None, exchanges: Optional[List[str]] = None):
+        """
+        Initialize the pool
+        
+        Args:
+            default: Exchange used when none is requested (default: CRYPTO_DEFAULT_EXCHANGE)
+            exchanges: Selectable exchange ids (default: CRYPTO_EXCHANGES)
+        """
+        self.default = (default or settings.CRYPTO_DEFAULT_EXCHANGE).lower()
+        self.exchanges = [e.lower() for e in (exchanges or settings.CRYPTO_EXCHANGES)]
+        if self.default not in self.exchanges:
+            self.exchanges.insert(0, self.default)
+        self._services: Dict[str, CryptoService] = {}
+        self._lock = threading.Lock()
+    
+    def get(self, exchange_id: Optional[str] = None) -> CryptoService:
+        """
+        Return the service for an exchange, creating its client on first use
+        
+        Args:
+            exchange_id: CCXT exchange id (default: the pool's default exchange)
+            
+        Returns:
+            CryptoService bound to that exchange
+        """
+        exchange_id = (exchange_id or self.default).strip().lower()
+        service = self._services.get(exchange_id)
+        if service is not None:
+            return service
+        if exchange_id not in self.exchanges or exchange_id not in ccxt.exchanges:
+            raise ValueError(f"Unsupported exchange: {exchange_id} (available: {', '.join(self.exchanges)})")
+        
+        with self._lock:
+            service = self._services.get(exchange_id)
+            if service is None:
+                service = CryptoService(exchange_id, _credentials(exchange_id))
+                if getattr(settings, f"{exchange_id.upper()}_SANDBOX", False):
+                    service.exchange.set_sandbox_mode(True)
+                self._services[exchange_id] = service
+            return service
+    
+    async def consolidated_quote(
+        self,
+        symbol: str,
+        exchanges: Optional[List[str]] = None,
+        timeout: Optional[float] = None
+    ) -> ConsolidatedQuote:
+        """
+        Query several exchanges concurrently and combine their quotes
+        
+        Every venue gets its own timeout, so a slow or failing exchange only
+        shows up as an error entry instead of delaying the whole response.
+        
+        Args:
+            symbol: Crypto symbol or trading pair (e.g., BTC, BTC/USDT)
+            exchanges: Exchange ids to query (default: all of CRYPTO_EXCHANGES)
+            timeout: Per-venue timeout in seconds (default: CRYPTO_CONSOLIDATED_TIMEOUT)
+            
+        Returns:
+            ConsolidatedQuote with best bid/ask, volume-weighted price and per-venue results
+        """
+        symbol = CryptoService._normalize_symbol(symbol)
+        timeout = settings.CRYPTO_CONSOLIDATED_TIMEOUT if timeout is None else timeout
+        services = [self.get(exchange_id) for exchange_id in dict.fromkeys(exchanges or self.exchanges)]
+        venues = await asyncio.gather(*(_venue_quote(service, symbol, timeout) for service in services))
+        
+        quoted = [v for v in venues if v.error is None]
+        bids = [v for v in quoted if v.bid is not None]
+        asks = [v for v in quoted if v.ask is not None]
+        best_bid = max(bids, key=lambda v: v.bid, default=None)
+        best_ask = min(asks, key=lambda v: v.ask, default=None)
+        weighted = [v for v in quoted if v.price is not None and v.volume_24h]
+        volume = sum(v.volume_24h for v in weighted)
+        
+        return ConsolidatedQuote(
+            symbol=symbol,
+            best_bid=best_bid.bid if best_bid else None,
+            best_bid_exchange=best_bid.exchange if best_bid else None,
+            best_ask=best_ask.ask if best_ask else None,
+            best_ask_exchange=best_ask.exchange if best_ask else None,
+            vwap=sum(v.price * v.volume_24h for v in weighted) / volume if volume else None,
+            volume_24h=volume,
+            venues=venues,
+            timestamp=datetime.now()
+        )
+    
+    def cache_stats(self) -> Dict[str, List[dict]]:
+        """
+        Get cache counters for every exchange created so far
+        
+        Returns:
+            Mapping of exchange id to its per-cache statistics
+        """
+        return {exchange_id: service.cache_stats() for exchange_id, service in list(self._services.items())}
+
+
+async def _venue_quote(service: CryptoService, symbol: str, timeout: float) -> VenueQuote:
+    exchange_id = service.exchange.id
+    start = time.perf_counter()
+    try:
+        ticker = await asyncio.wait_for(run_blocking(service.get_live_ticker, symbol), timeout)
+    except asyncio.TimeoutError:
+        # The worker thread finishes on its own and still warms the market cache
+        error = f"Timed out after {timeout:g}s"
+    except Exception as e:
+        error = str(e)
+    else:
+        volume = ticker.get('base_volume_24h')
+        if volume is None and ticker.get('volume_24h') and ticker['price']:
+            volume = ticker['volume_24h'] / ticker['price']
+        return VenueQuote(
+            exchange=exchange_id,
+            price=ticker['price'],
+            bid=ticker.get('bid'),
+            ask=ticker.get('ask'),
+            volume_24h=volume,
+            latency_ms=round((time.perf_counter() - start) * 1000, 1)
+        )
+    return VenueQuote(exchange=exchange_id, latency_ms=round((time.perf_counter() - start) * 1000, 1), error=error)
+
+
+def _credentials(exchange_id: str) -> dict:
+    """CCXT credential options from <EXCHANGE>_API_KEY / _SECRET_KEY / _PASSPHRASE settings"""
+    prefix = exchange_id.upper()
+    api_key = getattr(settings, f"{prefix}_API_KEY", "")
+    if not api_key:
+        return {}
+    return {
+        'apiKey': api_key,
+        'secret': getattr(settings, f"{prefix}_SECRET_KEY", ""),
+        'password': getattr(settings, f"{prefix}_PASSPHRASE", ""),
+    }
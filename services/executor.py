@@ -0,0 +1,39 @@
+import asyncio
+import contextvars
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, TypeVar
+from config import settings
+from services.tracing import current_trace
+
+T = TypeVar("T")
+
+# yfinance and ccxt are blocking libraries; their calls run on this bounded
+# pool so a slow upstream only occupies a worker thread, not the event loop.
+_executor = ThreadPoolExecutor(
+    max_workers=settings.SERVICE_THREAD_POOL_SIZE,
+    thread_name_prefix="upstream"
+)
+
+
+async def run_blocking(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    Run a blocking service call on the shared worker pool
+    
+    Args:
+        func: Blocking callable (typically a StockService or CryptoService method)
+        *args: Positional arguments for func
+        **kwargs: Keyword arguments for func
+        
+    Returns:
+        The return value of func
+    """
+    loop = asyncio.get_running_loop()
+    # Carry context variables (e.g. the upstream request priority) into the worker
+    context = contextvars.copy_context()
+    call = functools.partial(context.run, func, *args, **kwargs)
+    trace = current_trace()
+    if trace is not None:
+        call = trace.service_call(call)
+    return await loop.run_in_executor(_executor, call)
+
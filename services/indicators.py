@@ -0,0 +1,297 @@
+import copy
+import threading
+from typing import Any, Dict, Hashable, Optional, Tuple
+import numpy as np
+import pandas as pd
+from config import settings
+from models.common import IndicatorParams
+from services.cache import TTLCache
+from services.resample import DAY_MS
+
+
+def _ema(values: np.ndarray, alpha: float, previous: Optional[float]) -> np.ndarray:
+    """Exponential moving average, continuing from a previous value when given"""
+    if len(values) == 0:
+        return values
+    if previous is None:
+        return pd.Series(values).ewm(alpha=alpha, adjust=False).mean().to_numpy()
+    return pd.Series(np.r_[previous, values]).ewm(alpha=alpha, adjust=False).mean().to_numpy()[1:]
+
+
+def _warmup(result: np.ndarray, seen: int, period: int) -> np.ndarray:
+    """Blank out values computed from fewer than `period` samples"""
+    missing = period - 1 - seen
+    if missing > 0:
+        result = result.copy()
+        result[:missing] = np.nan
+    return result
+
+
+def values_to_lists(values: Dict[str, np.ndarray]) -> Dict[str, list]:
+    """Convert indicator arrays into JSON-ready lists (NaN becomes null)"""
+    return {
+        name: np.where(np.isnan(array), None, array).tolist()
+        for name, array in values.items()
+    }
+
+
+class IndicatorState:
+    """
+    Running state of every indicator over a candle series
+    
+    advance() consumes a chunk of candles with whole-array operations and
+    keeps just enough state (last EMA values, Wilder averages, the close
+    window, the session VWAP sums) to continue with the next chunk, so the
+    result is identical to computing over the full series at once.
+    """
+    
+    def __init__(self, params: IndicatorParams):
+        self.params = params
+        self.seen = 0
+        self.window = max(params.sma_period, params.bb_period)
+        self.closes = np.empty(0)
+        self.last_close: Optional[float] = None
+        self.ema: Dict[str, Optional[float]] = {}
+        self.vwap_day: Optional[int] = None
+        self.vwap_pv = 0.0
+        self.vwap_v = 0.0
+    
+    def copy(self) -> "IndicatorState":
+        return copy.deepcopy(self)
+    
+    def advance(self, columns: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        """
+        Compute indicators for the next chunk of candles and update the state
+        
+        Args:
+            columns: t/o/h/l/c/v arrays of candles following those already seen
+            
+        Returns:
+            Dict of indicator arrays aligned to the chunk
+        """
+        p = self.params
+        close = columns['c']
+        out: Dict[str, np.ndarray] = {}
+        if len(close) == 0:
+            return out
+        
+        history = np.r_[self.closes, close]
+        if "sma" in p.indicators:
+            sma = pd.Series(history).rolling(p.sma_period).mean().to_numpy()[-len(close):]
+            out["sma"] = sma
+        
+        if "bbands" in p.indicators:
+            rolling = pd.Series(history).rolling(p.bb_period)
+            middle = rolling.mean().to_numpy()[-len(close):]
+            std = rolling.std(ddof=0).to_numpy()[-len(close):]
+            out["bb_middle"] = middle
+            out["bb_upper"] = middle + p.bb_std * std
+            out["bb_lower"] = middle - p.bb_std * std
+        
+        if "ema" in p.indicators:
+            ema = self._continue_ema("ema", close, 2 / (p.ema_period + 1))
+            out["ema"] = _warmup(ema, self.seen, p.ema_period)
+        
+        if "rsi" in p.indicators:
+            previous = np.r_[self.last_close if self.last_close is not None else close[0], close[:-1]]
+            change = close - previous
+            alpha = 1 / p.rsi_period
+            gain = self._continue_ema("rsi_gain", np.clip(change, 0, None), alpha)
+            loss = self._continue_ema("rsi_loss", np.clip(-change, 0, None), alpha)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                rsi = np.where(loss == 0, 100.0, 100 - 100 / (1 + gain / loss))
+            out["rsi"] = _warmup(rsi, self.seen, p.rsi_period + 1)
+        
+        if "macd" in p.indicators:
+            fast = self._continue_ema("macd_fast", close, 2 / (p.macd_fast + 1))
+            slow = self._continue_ema("macd_slow", close, 2 / (p.macd_slow + 1))
+            macd = fast - slow
+            signal = self._continue_ema("macd_signal", macd, 2 / (p.macd_signal + 1))
+            out["macd"] = _warmup(macd, self.seen, p.macd_slow)
+            out["macd_signal"] = _warmup(signal, self.seen, p.macd_slow + p.macd_signal - 1)
+            out["macd_hist"] = out["macd"] - out["macd_signal"]
+        
+        if "vwap" in p.indicators:
+            out["vwap"] = self._continue_vwap(columns)
+        
+        self.seen += len(close)
+        self.closes = history[-(self.window - 1):] if self.window > 1 else np.empty(0)
+        self.last_close = float(close[-1])
+        return out
+    
+    def _continue_ema(self, name: str, values: np.ndarray, alpha: float) -> np.ndarray:
+        result = _ema(values, alpha, self.ema.get(name))
+        self.ema[name] = float(result[-1])
+        return result
+    
+    def _continue_vwap(self, columns: Dict[str, np.ndarray]) -> np.ndarray:
+        """
+        VWAP that resets at each UTC day, carrying the running sums across chunks
+        
+        On daily or coarser candles every bar is its own session, so the value
+        is the bar's typical price.
+        """
+        typical = (columns['h'] + columns['l'] + columns['c']) / 3
+        volume = np.where(np.isnan(typical), 0.0, np.nan_to_num(columns['v']))
+        traded = np.nan_to_num(typical) * volume
+        day = columns['t'] // DAY_MS
+        
+        starts = np.flatnonzero(np.r_[True, day[1:] != day[:-1]])
+        lengths = np.diff(np.r_[starts, len(day)])
+        pv = np.cumsum(traded)
+        v = np.cumsum(volume)
+        pv -= np.repeat(pv[starts] - traded[starts], lengths)
+        v -= np.repeat(v[starts] - volume[starts], lengths)
+        
+        if self.vwap_day == day[0]:
+            pv[:lengths[0]] += self.vwap_pv
+            v[:lengths[0]] += self.vwap_v
+        
+        self.vwap_day = int(day[-1])
+        self.vwap_pv = float(pv[-1])
+        self.vwap_v = float(v[-1])
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(v > 0, pv / v, np.nan)
+
+
+class _Entry:
+    """Committed (closed-candle) indicator output for one series"""
+    
+    __slots__ = ("t", "close", "values", "state")
+    
+    def __init__(self, t: np.ndarray, close: np.ndarray, values: Dict[str, np.ndarray], state: IndicatorState):
+        self.t = t
+        self.close = close
+        self.values = values
+        self.state = state
+
+
+class IndicatorEngine:
+    """Indicator computation with per-series cached state and incremental updates"""
+    
+    def __init__(self):
+        self._entries = TTLCache(
+            "indicator_state",
+            ttl=settings.INDICATOR_STATE_TTL,
+            maxsize=settings.INDICATOR_CACHE_ENTRIES
+        )
+        self._lock = threading.Lock()
+        self.full = 0
+        self.incremental = 0
+    
+    def compute(
+        self,
+        key: Hashable,
+        columns: Dict[str, np.ndarray],
+        params: IndicatorParams
+    ) -> Dict[str, np.ndarray]:
+        """
+        Compute indicators for a candle series
+        
+        A request whose first candle falls inside a cached series is answered
+        from that series' committed state: only the candles after the last
+        committed one are processed and the output is sliced to the requested
+        window, so a `limit=N` window or rolling period that slides forward
+        stays incremental. Rolling-window indicators (SMA, Bollinger Bands)
+        are the same as a fresh computation over the window; EMA-based ones
+        carry the longer warm-up of the cached series. Without a usable
+        cached series indicators start from the first requested candle, with
+        warm-up gaps at the head. The last candle is treated as still
+        forming: it is computed on a copy of the state and never committed.
+        
+        Args:
+            key: Series identity (asset, source, symbol, timeframe)
+            columns: t/o/h/l/c/v arrays, ascending by t
+            params: Indicator selection and periods
+            
+        Returns:
+            Dict of indicator arrays aligned to columns['t']
+        """
+        t = columns['t']
+        if len(t) == 0:
+            return {}
+        
+        key = (key, params)
+        entry = self._entries.get(key)
+        position = self._resume_position(entry, columns)
+        
+        if position is None:
+            offset = 0
+            state = IndicatorState(params)
+            committed = {k: v[:-1] for k, v in columns.items()}
+            values = state.advance(committed)
+            entry = _Entry(committed['t'], committed['c'], values, state)
+            with self._lock:
+                self.full += 1
+        else:
+            offset, start = position
+            state = entry.state.copy()
+            committed = {k: v[start:-1] for k, v in columns.items()}
+            new_values = state.advance(committed)
+            values = {
+                name: np.r_[entry.values[name], new_values[name]] if len(committed['t']) else entry.values[name]
+                for name in entry.values
+            }
+            entry = _Entry(
+                np.r_[entry.t, committed['t']],
+                np.r_[entry.close, committed['c']],
+                values,
+                state
+            )
+            with self._lock:
+                self.incremental += 1
+        
+        forming = state.copy().advance({k: v[-1:] for k, v in columns.items()})
+        result = {
+            name: np.r_[entry.values.get(name, forming[name][:0])[offset:], forming[name]]
+            for name in forming
+        }
+        self._entries.set(key, self._bounded(entry, len(t) - 1))
+        return result
+    
+    def stats(self) -> Dict[str, Any]:
+        """Return full-recompute and incremental-update counters plus state cache stats"""
+        with self._lock:
+            counters = {'full': self.full, 'incremental': self.incremental}
+        return {**counters, 'cache': self._entries.stats()}
+    
+    @staticmethod
+    def _resume_position(entry: Optional[_Entry], columns: Dict[str, np.ndarray]) -> Optional[Tuple[int, int]]:
+        """
+        Locate a request inside a cached series
+        
+        Returns:
+            (index of the first requested candle in the cached series, index
+            of the first requested candle after the committed ones), or None
+            to recompute
+        """
+        if entry is None or len(entry.t) == 0:
+            return None
+        t = columns['t']
+        offset = int(np.searchsorted(entry.t, t[0]))
+        if offset == len(entry.t) or entry.t[offset] != t[0]:
+            return None
+        
+        # Requested candles up to the last committed one must match exactly;
+        # adjusted prices (splits, dividends) rewrite history and force a recompute
+        end = len(entry.t) - offset
+        if end >= len(t):
+            return None
+        if not np.array_equal(t[:end], entry.t[offset:]) or not np.array_equal(columns['c'][:end], entry.close[offset:]):
+            return None
+        return offset, end
+    
+    @staticmethod
+    def _bounded(entry: _Entry, requested: int) -> _Entry:
+        """Drop the oldest committed candles beyond INDICATOR_MAX_POINTS (or the request's length)"""
+        excess = len(entry.t) - max(settings.INDICATOR_MAX_POINTS, requested)
+        if excess <= 0:
+            return entry
+        return _Entry(
+            entry.t[excess:],
+            entry.close[excess:],
+            {name: values[excess:] for name, values in entry.values.items()},
+            entry.state
+        )
+
+engine = IndicatorEngine()
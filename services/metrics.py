@@ -0,0 +1,383 @@
+import bisect
+import contextvars
+import functools
+import math
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Sequence, Tuple
+from services.rate_limit import scheduler
+from services.resilience import CircuitOpenError, guards
+from services.tracing import record_span
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds; upstream calls and slow history pages land in the upper buckets
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Provider method the current thread's HTTP round trips are made for (e.g. fetch_ohlcv)
+_upstream_method: contextvars.ContextVar = contextvars.ContextVar("upstream_method", default="request")
+
+# (labels, value) pairs of one metric family
+Samples = Iterable[Tuple[Dict[str, str], float]]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)) + "}"
+
+
+def _format_value(value: float) -> str:
+    if math.isnan(value):
+        return "NaN"
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if value == int(value):
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    """
+    One metric family with a fixed set of label names
+    
+    Label values are passed positionally in label-name order, so recording
+    is a tuple lookup under the metric's own lock.
+    """
+    
+    type = "untyped"
+    
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], Any] = {}
+        self._lock = threading.Lock()
+    
+    def render(self) -> List[str]:
+        """Return the family's exposition lines, header included"""
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type}"]
+        with self._lock:
+            values = list(self._values.items())
+        for labels, value in sorted(values):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}")
+        return lines
+
+
+class Counter(_Metric):
+    """Monotonically increasing count"""
+    
+    type = "counter"
+    
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+
+class Gauge(_Metric):
+    """Value that goes up and down (e.g. requests in flight)"""
+    
+    type = "gauge"
+    
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+    
+    def dec(self, *labels: str, amount: float = 1.0) -> None:
+        self.inc(*labels, amount=-amount)
+    
+    def set(self, value: float, *labels: str) -> None:
+        with self._lock:
+            self._values[labels] = value
+
+
+class Histogram(_Metric):
+    """Distribution of observed values in fixed cumulative buckets"""
+    
+    type = "histogram"
+    
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+    
+    def observe(self, value: float, *labels: str) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(labels)
+            if state is None:
+                # Per-bucket (non-cumulative) counts, the overflow bucket last, then the sum
+                state = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            state[0][index] += 1
+            state[1] += value
+    
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type}"]
+        with self._lock:
+            values = [(labels, list(counts), total) for labels, (counts, total) in self._values.items()]
+        names = self.labelnames + ("le",)
+        for labels, counts, total in sorted(values):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{_format_labels(names, labels + (_format_value(bound),))} {cumulative}")
+            suffix = _format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{suffix} {_format_value(total)}")
+            lines.append(f"{self.name}_count{suffix} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Metrics recorded by the process plus collectors read at scrape time
+    
+    Collectors turn existing statistics (cache counters, breaker state,
+    rate-limit queues) into metric families only when /metrics is scraped,
+    so they add nothing to the request path.
+    """
+    
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: Dict[str, Callable[[], Iterable[Tuple[str, str, str, Samples]]]] = {}
+        self._lock = threading.Lock()
+    
+    def _add(self, metric: _Metric) -> Any:
+        with self._lock:
+            existing = self._metrics.setdefault(metric.name, metric)
+        return existing
+    
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._add(Counter(name, documentation, labelnames))
+    
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._add(Gauge(name, documentation, labelnames))
+    
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self._add(Histogram(name, documentation, labelnames, buckets))
+    
+    def register_collector(self, key: str, collector: Callable[[], Iterable[Tuple[str, str, str, Samples]]]) -> None:
+        """
+        Add (or replace) a scrape-time collector
+        
+        Args:
+            key: Collector identity; registering the same key again replaces it
+            collector: Callable yielding (name, type, help, samples) families
+        """
+        with self._lock:
+            self._collectors[key] = collector
+    
+    def render(self) -> str:
+        """
+        Render every metric in the Prometheus text exposition format
+        
+        Returns:
+            Exposition text (version 0.0.4)
+        """
+        with self._lock:
+            metrics = list(self._metrics.values())
+            collectors = list(self._collectors.values())
+        
+        lines: List[str] = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        for collector in collectors:
+            for name, kind, documentation, samples in collector():
+                lines.append(f"# HELP {name} {documentation}")
+                lines.append(f"# TYPE {name} {kind}")
+                for labels, value in samples:
+                    if value is None:
+                        continue
+                    lines.append(f"{name}{_format_labels(tuple(labels), tuple(labels.values()))} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+# Inbound REST requests, labelled by route template rather than raw path
+http_requests = registry.counter(
+    "http_requests_total", "HTTP requests handled", ("method", "route", "status")
+)
+http_request_duration = registry.histogram(
+    "http_request_duration_seconds", "HTTP request latency until the response body is sent", ("method", "route")
+)
+http_requests_in_flight = registry.gauge(
+    "http_requests_in_flight", "HTTP requests currently being handled", ("method",)
+)
+
+# MCP tool calls
+mcp_tool_calls = registry.counter(
+    "mcp_tool_calls_total", "MCP tool calls by outcome", ("tool", "outcome")
+)
+mcp_tool_duration = registry.histogram(
+    "mcp_tool_duration_seconds", "MCP tool call latency", ("tool",)
+)
+mcp_tool_calls_in_flight = registry.gauge(
+    "mcp_tool_calls_in_flight", "MCP tool calls currently running", ("tool",)
+)
+
+# Upstream provider round trips (yfinance, CCXT exchanges)
+upstream_requests = registry.counter(
+    "upstream_requests_total", "Upstream provider calls by outcome", ("provider", "method", "outcome")
+)
+upstream_request_duration = registry.histogram(
+    "upstream_request_duration_seconds", "Upstream provider call latency, rate-limit wait excluded", ("provider", "method")
+)
+upstream_requests_in_flight = registry.gauge(
+    "upstream_requests_in_flight", "Upstream provider calls currently running", ("provider",)
+)
+
+
+def upstream_method(method: str, func: Callable[..., Any]) -> Callable[..., Any]:
+    """
+    Wrap a provider client method so its HTTP round trips are labelled with its name
+    
+    Args:
+        method: Label for the round trips (e.g. fetch_ohlcv)
+        func: Client method making them
+        
+    Returns:
+        Wrapped callable
+    """
+    @functools.wraps(func)
+    def run(*args, **kwargs):
+        token = _upstream_method.set(method)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _upstream_method.reset(token)
+    
+    return run
+
+
+def current_upstream_method() -> str:
+    """Return the provider method the current round trip belongs to"""
+    return _upstream_method.get()
+
+
+def observe_upstream(provider: str, method: str, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """
+    Call an upstream provider and record its count, latency and outcome
+    
+    Calls rejected by an open circuit are counted but not timed, since they
+    never reach the provider.
+    
+    Args:
+        provider: Provider name (e.g. yahoo, or a CCXT exchange id)
+        method: Provider method label (e.g. fetch_ticker, Ticker.info)
+        func: Blocking upstream call
+        *args: Positional arguments for func
+        **kwargs: Keyword arguments for func
+        
+    Returns:
+        The return value of func
+    """
+    upstream_requests_in_flight.inc(provider)
+    start = time.perf_counter()
+    try:
+        result = func(*args, **kwargs)
+    except CircuitOpenError:
+        upstream_requests.inc(provider, method, "circuit_open")
+        raise
+    except Exception:
+        _observe_upstream_latency(provider, method, time.perf_counter() - start)
+        upstream_requests.inc(provider, method, "error")
+        raise
+    finally:
+        upstream_requests_in_flight.dec(provider)
+    _observe_upstream_latency(provider, method, time.perf_counter() - start)
+    upstream_requests.inc(provider, method, "ok")
+    return result
+
+
+def _observe_upstream_latency(provider: str, method: str, seconds: float) -> None:
+    upstream_request_duration.observe(seconds, provider, method)
+    # ...and the same round trip as a phase of the request waiting on it
+    record_span("upstream", seconds)
+
+
+_CIRCUIT_STATES = {"closed": 0, "half_open": 1, "open": 2}
+
+
+def _upstream_collector() -> Iterator[Tuple[str, str, str, Samples]]:
+    breakers = guards.stats()
+    yield (
+        "upstream_circuit_state", "gauge", "Circuit breaker state (0 closed, 1 half open, 2 open)",
+        [({"provider": name}, _CIRCUIT_STATES[s['state']]) for name, s in breakers.items()]
+    )
+    yield (
+        "upstream_circuit_rejected_total", "counter", "Calls rejected while the circuit was open",
+        [({"provider": name}, s['rejected']) for name, s in breakers.items()]
+    )
+    yield (
+        "upstream_hedges_total", "counter", "Hedged second attempts started",
+        [({"provider": name}, s['hedges']) for name, s in breakers.items()]
+    )
+    
+    buckets = scheduler.stats()
+    yield (
+        "upstream_rate_limit_tokens", "gauge", "Tokens currently available in the provider's bucket",
+        [({"provider": name}, b['tokens']) for name, b in buckets.items()]
+    )
+    yield (
+        "upstream_rate_limit_queued", "gauge", "Calls waiting for a rate-limit token",
+        [({"provider": name, "priority": level}, p['queued']) for name, b in buckets.items() for level, p in b['priorities'].items()]
+    )
+    yield (
+        "upstream_rate_limit_wait_seconds_total", "counter", "Total time spent waiting for rate-limit tokens",
+        [({"provider": name, "priority": level}, p['wait_seconds_total']) for name, b in buckets.items() for level, p in b['priorities'].items()]
+    )
+
+
+registry.register_collector("upstream", _upstream_collector)
+
+
+# Cache statistics callables by source; one collector renders them all so
+# servers sharing a process never emit the same metric family twice
+_cache_sources: Dict[str, Callable[[], List[dict]]] = {}
+_cache_sources_lock = threading.Lock()
+
+
+def register_caches(source: str, stats: Callable[[], List[dict]]) -> None:
+    """
+    Expose TTLCache counters, labelled with their source
+    
+    Args:
+        source: Owner of the caches (e.g. stock, or the server owning an exchange pool);
+            registering the same source again replaces it
+        stats: Callable returning cache_stats() dicts of the caches to expose
+    """
+    with _cache_sources_lock:
+        _cache_sources[source] = stats
+
+
+def _cache_collector() -> Iterator[Tuple[str, str, str, Samples]]:
+    with _cache_sources_lock:
+        sources = list(_cache_sources.items())
+    caches = [({"source": source, "cache": c['name']}, c) for source, stats in sources for c in stats()]
+    yield "cache_entries", "gauge", "Entries held by the cache", [(labels, c['size']) for labels, c in caches]
+    for field, documentation in (
+        ('hits', "Fresh cache hits"),
+        ('stale_hits', "Stale cache hits served while revalidating"),
+        ('misses', "Cache misses"),
+        ('evictions', "Entries evicted to stay within maxsize"),
+        ('fallbacks', "Expired values served while a circuit was open"),
+    ):
+        yield f"cache_{field}_total", "counter", documentation, [(labels, c[field]) for labels, c in caches]
+
+
+registry.register_collector("caches", _cache_collector)
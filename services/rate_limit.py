@@ -0,0 +1,223 @@
+import contextvars
+import functools
+import heapq
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+from enum import IntEnum
+from typing import Any, Callable, Dict, Iterator, Optional
+from config import settings
+from services.tracing import record_span
+
+
+class Priority(IntEnum):
+    """Upstream request classes; lower values are served first"""
+    INTERACTIVE = 0  # A client is waiting on the answer
+    BATCH = 1  # Multi-symbol lists, batch quotes and deep history ranges
+    PREFETCH = 2  # Cache warming and background revalidation
+
+
+_priority: contextvars.ContextVar = contextvars.ContextVar("upstream_priority", default=Priority.INTERACTIVE)
+
+
+def current_priority() -> Priority:
+    """Return the priority upstream calls made from this context are queued with"""
+    return _priority.get()
+
+
+@contextmanager
+def priority(level: Priority) -> Iterator[None]:
+    """
+    Queue upstream calls made inside the block with at most this priority
+    
+    Blocks only ever lower the priority: a batch call made while warming the
+    cache stays a prefetch.
+    
+    Args:
+        level: Priority class for the block
+    """
+    token = _priority.set(max(_priority.get(), level))
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def bind_priority(func: Callable[..., Any], level: Optional[Priority] = None) -> Callable[..., Any]:
+    """
+    Wrap func so it runs with the caller's (or the given) priority on another thread
+    
+    Args:
+        func: Callable to hand to a worker pool
+        level: Priority to run with (default: the current one)
+        
+    Returns:
+        Wrapped callable
+    """
+    level = current_priority() if level is None else level
+    
+    @functools.wraps(func)
+    def run(*args, **kwargs):
+        token = _priority.set(level)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _priority.reset(token)
+    
+    return run
+
+
+class TokenBucket:
+    """
+    Token bucket shared by every thread calling one upstream provider
+    
+    Tokens refill at `rate` per second up to `burst`. Waiting callers are
+    served strictly by priority, then in arrival order, so background work
+    only gets the budget interactive requests leave over. A call costing
+    more than `burst` takes its tokens in burst-sized parts, each queued
+    again at its priority, so it never puts the bucket in debt and higher
+    priority calls are served between the parts.
+    """
+    
+    def __init__(self, name: str, rate: float, burst: float):
+        """
+        Initialize the bucket
+        
+        Args:
+            name: Provider name shown in the stats
+            rate: Tokens (requests) per second; 0 disables limiting
+            burst: Bucket capacity
+        """
+        self.name = name
+        self.rate = rate
+        self.burst = max(burst, 1.0)
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._cond = threading.Condition()
+        self._waiters: list = []
+        self._sequence = itertools.count()
+        self._acquired = {level: 0 for level in Priority}
+        self._wait_total = {level: 0.0 for level in Priority}
+        self._wait_max = {level: 0.0 for level in Priority}
+    
+    def acquire(self, cost: float = 1.0, level: Optional[Priority] = None) -> float:
+        """
+        Block until the bucket grants `cost` tokens
+        
+        Args:
+            cost: Tokens the call consumes (e.g. an exchange endpoint weight)
+            level: Priority class (default: the current context's priority)
+            
+        Returns:
+            Seconds spent waiting
+        """
+        level = current_priority() if level is None else level
+        start = time.monotonic()
+        if self.rate > 0:
+            remaining = cost
+            while remaining > 0:
+                part = min(remaining, self.burst)
+                self._take(part, level)
+                remaining -= part
+        
+        with self._cond:
+            waited = time.monotonic() - start
+            self._acquired[level] += 1
+            self._wait_total[level] += waited
+            self._wait_max[level] = max(self._wait_max[level], waited)
+        record_span("ratelimit", waited)
+        return waited
+    
+    def _take(self, need: float, level: Priority) -> None:
+        """Wait for this caller's turn and `need` (at most `burst`) tokens, then take them"""
+        with self._cond:
+            ticket = (level, next(self._sequence))
+            heapq.heappush(self._waiters, ticket)
+            try:
+                while True:
+                    self._refill()
+                    if self._waiters[0] != ticket:
+                        self._cond.wait()
+                    elif self._tokens < need:
+                        self._cond.wait((need - self._tokens) / self.rate)
+                    else:
+                        break
+                self._tokens -= need
+            finally:
+                self._waiters.remove(ticket)
+                heapq.heapify(self._waiters)
+                self._cond.notify_all()
+    
+    def _refill(self) -> None:
+        # Caller holds the lock
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+    
+    def stats(self) -> Dict[str, Any]:
+        """Return the budget, current tokens and per-priority queue depth and wait times"""
+        with self._cond:
+            self._refill()
+            queued = {level: 0 for level in Priority}
+            for level, _ in self._waiters:
+                queued[level] += 1
+            return {
+                'rate': self.rate,
+                'burst': self.burst,
+                'tokens': round(self._tokens, 3),
+                'queue_depth': len(self._waiters),
+                'priorities': {
+                    level.name.lower(): {
+                        'queued': queued[level],
+                        'acquired': self._acquired[level],
+                        'wait_seconds_total': round(self._wait_total[level], 3),
+                        'wait_seconds_max': round(self._wait_max[level], 3),
+                        'wait_seconds_mean': round(self._wait_total[level] / self._acquired[level], 4) if self._acquired[level] else 0.0,
+                    }
+                    for level in Priority
+                },
+            }
+
+
+class RateLimitScheduler:
+    """Registry of the token buckets budgeting each upstream provider"""
+    
+    def __init__(self):
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+    
+    def bucket(self, provider: str, rate: Optional[float] = None, burst: Optional[float] = None) -> TokenBucket:
+        """
+        Return the provider's bucket, creating it on first use
+        
+        A budget in UPSTREAM_RATE_LIMITS takes precedence over the given
+        defaults, which in turn fall back to UPSTREAM_DEFAULT_RATE/BURST.
+        
+        Args:
+            provider: Provider name (e.g. yahoo, or a CCXT exchange id)
+            rate: Default requests per second for this provider
+            burst: Default bucket capacity for this provider
+            
+        Returns:
+            The shared TokenBucket
+        """
+        with self._lock:
+            bucket = self._buckets.get(provider)
+            if bucket is None:
+                budget = settings.UPSTREAM_RATE_LIMITS.get(provider, {})
+                bucket = self._buckets[provider] = TokenBucket(
+                    provider,
+                    rate=budget.get('rate', settings.UPSTREAM_DEFAULT_RATE if rate is None else rate),
+                    burst=budget.get('burst', settings.UPSTREAM_DEFAULT_BURST if burst is None else burst)
+                )
+            return bucket
+    
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Return per-provider budget and queue statistics"""
+        with self._lock:
+            buckets = list(self._buckets.values())
+        return {bucket.name: bucket.stats() for bucket in buckets}
+
+
+scheduler = RateLimitScheduler()
@@ -0,0 +1,128 @@
+from typing import Dict
+import numpy as np
+
+DAY_MS = 24 * 60 * 60 * 1000
+
+# 1970-01-01 was a Thursday; weekly candles open on Monday
+WEEK_OFFSET_MS = 4 * DAY_MS
+
+
+def resample_fixed(
+    columns: Dict[str, np.ndarray],
+    target_ms: int,
+    offset_ms: int = 0,
+    drop_partial_head: bool = True
+) -> Dict[str, np.ndarray]:
+    """
+    Aggregate candles into fixed-width buckets aligned to UTC
+    
+    Bucket boundaries are offset_ms + k * target_ms. The last bucket is kept
+    even if incomplete (it is the candle still forming).
+    
+    Args:
+        columns: t/o/h/l/c/v arrays of the finer candles, ascending by t
+        target_ms: Width of the coarser candle in milliseconds
+        offset_ms: Alignment offset from the epoch (e.g. WEEK_OFFSET_MS)
+        drop_partial_head: Drop the first bucket when the data starts mid-bucket
+        
+    Returns:
+        t/o/h/l/c/v arrays of the coarser candles
+    """
+    columns = _valid_rows(columns)
+    t = columns['t']
+    starts = (t - offset_ms) // target_ms * target_ms + offset_ms
+    result = _aggregate(columns, starts, starts)
+    if drop_partial_head and len(t) and t[0] != starts[0]:
+        result = {key: values[1:] for key, values in result.items()}
+    return result
+
+
+def resample_sessions(
+    columns: Dict[str, np.ndarray],
+    wall_ms: np.ndarray,
+    target_ms: int
+) -> Dict[str, np.ndarray]:
+    """
+    Aggregate intraday bars into buckets aligned to each session's first bar
+    
+    Exchange sessions rarely open on the hour (e.g. 09:30 New York), so
+    hourly bars are counted from the session open rather than the epoch.
+    
+    Args:
+        columns: t/o/h/l/c/v arrays of the finer bars, ascending by t
+        wall_ms: Exchange-local wall-clock time of each bar as epoch-style ms
+        target_ms: Width of the coarser bar in milliseconds
+        
+    Returns:
+        t/o/h/l/c/v arrays of the coarser bars (t in UTC ms)
+    """
+    keep = _valid_mask(columns)
+    columns = {key: values[keep] for key, values in columns.items()}
+    wall_ms = wall_ms[keep]
+    
+    day = wall_ms // DAY_MS
+    first = np.flatnonzero(np.r_[True, day[1:] != day[:-1]]) if len(day) else np.array([], dtype=np.int64)
+    session_open = np.repeat(wall_ms[first], np.diff(np.r_[first, len(day)]))
+    wall_start = session_open + (wall_ms - session_open) // target_ms * target_ms
+    return _aggregate(columns, wall_start, wall_start - (wall_ms - columns['t']))
+
+
+def resample_calendar(
+    columns: Dict[str, np.ndarray],
+    wall_ms: np.ndarray,
+    unit: str
+) -> Dict[str, np.ndarray]:
+    """
+    Aggregate daily bars into calendar weeks (Monday start) or months
+    
+    Args:
+        columns: t/o/h/l/c/v arrays of the daily bars, ascending by t
+        wall_ms: Exchange-local wall-clock time of each bar as epoch-style ms
+        unit: 'W' for weeks or 'M' for months
+        
+    Returns:
+        t/o/h/l/c/v arrays of the coarser bars (t in UTC ms)
+    """
+    keep = _valid_mask(columns)
+    columns = {key: values[keep] for key, values in columns.items()}
+    wall_ms = wall_ms[keep]
+    
+    days = wall_ms // DAY_MS
+    if unit == 'W':
+        start_days = days - (days + 3) % 7
+    elif unit == 'M':
+        start_days = days.astype('datetime64[D]').astype('datetime64[M]').astype('datetime64[D]').astype(np.int64)
+    else:
+        raise ValueError(f"Unsupported calendar unit: {unit}")
+    wall_start = start_days * DAY_MS
+    return _aggregate(columns, wall_start, wall_start - (wall_ms - columns['t']))
+
+
+def _aggregate(
+    columns: Dict[str, np.ndarray],
+    keys: np.ndarray,
+    starts: np.ndarray
+) -> Dict[str, np.ndarray]:
+    """First open, max high, min low, last close and summed volume per run of equal keys"""
+    if len(keys) == 0:
+        return {key: values[:0] for key, values in columns.items()}
+    
+    first = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    last = np.r_[first[1:] - 1, len(keys) - 1]
+    return {
+        't': starts[first].astype(np.int64),
+        'o': columns['o'][first],
+        'h': np.fmax.reduceat(columns['h'], first),
+        'l': np.fmin.reduceat(columns['l'], first),
+        'c': columns['c'][last],
+        'v': np.add.reduceat(np.nan_to_num(columns['v']), first),
+    }
+
+
+def _valid_mask(columns: Dict[str, np.ndarray]) -> np.ndarray:
+    return ~(np.isnan(columns['o']) | np.isnan(columns['c']))
+
+
+def _valid_rows(columns: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    keep = _valid_mask(columns)
+    return {key: values[keep] for key, values in columns.items()}
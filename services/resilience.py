@@ -0,0 +1,249 @@
+import contextvars
+import math
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional
+import numpy as np
+from config import settings
+
+# Attempts run here so the caller can start a hedge while the first one is in flight
+_attempt_executor = ThreadPoolExecutor(
+    max_workers=settings.SERVICE_THREAD_POOL_SIZE,
+    thread_name_prefix="upstream-attempt"
+)
+
+# Sources a request was answered from stale data, by name -> age in seconds
+_stale_sources: contextvars.ContextVar = contextvars.ContextVar("stale_sources", default=None)
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a provider whose circuit breaker is open"""
+    
+    def __init__(self, provider: str, retry_after: float):
+        super().__init__(f"{provider} is unavailable (circuit open); retry in {math.ceil(retry_after)}s")
+        self.provider = provider
+        self.retry_after = retry_after
+
+
+@contextmanager
+def track_staleness() -> Iterator[Dict[str, float]]:
+    """
+    Collect the stale fallbacks served while handling one request
+    
+    Yields:
+        Dict filled with source name -> age in seconds for every stale value used
+    """
+    sources: Dict[str, float] = {}
+    token = _stale_sources.set(sources)
+    try:
+        yield sources
+    finally:
+        _stale_sources.reset(token)
+
+
+def mark_stale(source: str, age: float) -> None:
+    """Record that the current request is being answered with stale data"""
+    sources = _stale_sources.get()
+    if sources is not None:
+        sources[source] = max(age, sources.get(source, 0.0))
+
+
+class UpstreamGuard:
+    """
+    Circuit breaker and request hedging for one upstream provider
+    
+    After CIRCUIT_FAILURE_THRESHOLD consecutive failures (errors, or calls
+    slower than CIRCUIT_SLOW_CALL_SECONDS) the circuit opens and calls raise
+    CircuitOpenError at once. After CIRCUIT_RESET_TIMEOUT one probe call is
+    let through; its success closes the circuit again.
+    
+    Hedged calls (idempotent reads only) start a second attempt when the
+    first has not answered within the provider's recent p95 latency, and
+    return whichever answer arrives first.
+    """
+    
+    def __init__(
+        self,
+        name: str,
+        is_failure: Callable[[Exception], bool] = lambda e: True,
+        bucket: Optional[Any] = None
+    ):
+        """
+        Initialize the guard
+        
+        Args:
+            name: Provider name (e.g. yahoo, or a CCXT exchange id)
+            is_failure: Whether an exception means the provider is unhealthy
+                (client errors such as an unknown symbol should not count)
+            bucket: Rate-limit bucket a hedge attempt takes its token from
+        """
+        self.name = name
+        self.is_failure = is_failure
+        self.bucket = bucket
+        self._lock = threading.Lock()
+        self._latencies: deque = deque(maxlen=200)
+        self._state = "closed"
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        
+        self.calls = 0
+        self.failures = 0
+        self.rejected = 0
+        self.opened = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+    
+    def call(self, func: Callable[..., Any], *args: Any, hedge: bool = False, **kwargs: Any) -> Any:
+        """
+        Call the provider through the breaker, optionally hedged
+        
+        Args:
+            func: Blocking upstream call
+            *args: Positional arguments for func
+            hedge: Allow a second concurrent attempt (idempotent reads only)
+            **kwargs: Keyword arguments for func
+            
+        Returns:
+            The return value of func
+        """
+        probe = self._admit()
+        start = time.monotonic()
+        try:
+            if hedge and settings.HEDGE_ENABLED:
+                result = self._hedged(func, args, kwargs)
+            else:
+                result = self._attempt(func, args, kwargs)
+        except Exception as e:
+            self._record(self.is_failure(e), probe)
+            raise
+        self._record(time.monotonic() - start >= settings.CIRCUIT_SLOW_CALL_SECONDS, probe)
+        return result
+    
+    def _admit(self) -> bool:
+        """Raise if the circuit is open; return whether this call is the half-open probe"""
+        with self._lock:
+            self.calls += 1
+            if self._state == "closed":
+                return False
+            remaining = self._opened_at + settings.CIRCUIT_RESET_TIMEOUT - time.monotonic()
+            if remaining > 0 or self._probing:
+                self.rejected += 1
+                raise CircuitOpenError(self.name, max(remaining, 0.0) or settings.CIRCUIT_RESET_TIMEOUT)
+            self._state = "half_open"
+            self._probing = True
+            return True
+    
+    def _record(self, failed: bool, probe: bool) -> None:
+        with self._lock:
+            if probe:
+                self._probing = False
+            if not failed:
+                self._failures = 0
+                self._state = "closed"
+                return
+            self.failures += 1
+            self._failures += 1
+            if probe or self._failures >= settings.CIRCUIT_FAILURE_THRESHOLD:
+                if self._state != "open":
+                    self.opened += 1
+                self._state = "open"
+                self._opened_at = time.monotonic()
+    
+    def _attempt(self, func: Callable[..., Any], args: tuple, kwargs: dict) -> Any:
+        start = time.monotonic()
+        result = func(*args, **kwargs)
+        with self._lock:
+            self._latencies.append(time.monotonic() - start)
+        return result
+    
+    def _hedge_delay(self) -> Optional[float]:
+        with self._lock:
+            if len(self._latencies) < settings.HEDGE_MIN_SAMPLES:
+                return None
+            latencies = list(self._latencies)
+        return max(float(np.percentile(latencies, settings.HEDGE_PERCENTILE)), settings.HEDGE_MIN_DELAY)
+    
+    def _hedged(self, func: Callable[..., Any], args: tuple, kwargs: dict) -> Any:
+        delay = self._hedge_delay()
+        if delay is None:
+            # Not enough history to know what "slow" means yet
+            return self._attempt(func, args, kwargs)
+        
+        first = _attempt_executor.submit(contextvars.copy_context().run, self._attempt, func, args, kwargs)
+        done, _ = wait([first], timeout=delay)
+        if done:
+            return first.result()
+        
+        with self._lock:
+            self.hedges += 1
+        if self.bucket is not None:
+            self.bucket.acquire()
+        second = _attempt_executor.submit(contextvars.copy_context().run, self._attempt, func, args, kwargs)
+        
+        pending = {first, second}
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is second:
+                        with self._lock:
+                            self.hedge_wins += 1
+                    # The loser keeps running on its worker and its answer is dropped
+                    return future.result()
+                error = future.exception()
+        raise error
+    
+    def stats(self) -> Dict[str, Any]:
+        """Return breaker state, failure and hedging counters and recent latency"""
+        with self._lock:
+            latencies = list(self._latencies)
+            return {
+                'state': self._state,
+                'calls': self.calls,
+                'failures': self.failures,
+                'rejected': self.rejected,
+                'opened': self.opened,
+                'hedges': self.hedges,
+                'hedge_wins': self.hedge_wins,
+                'p50_ms': round(float(np.percentile(latencies, 50)) * 1000, 1) if latencies else None,
+                'p95_ms': round(float(np.percentile(latencies, 95)) * 1000, 1) if latencies else None,
+            }
+
+
+class GuardRegistry:
+    """One UpstreamGuard per provider, shared by every service instance"""
+    
+    def __init__(self):
+        self._guards: Dict[str, UpstreamGuard] = {}
+        self._lock = threading.Lock()
+    
+    def guard(self, name: str, **kwargs: Any) -> UpstreamGuard:
+        """
+        Return the provider's guard, creating it on first use
+        
+        Args:
+            name: Provider name
+            **kwargs: UpstreamGuard options used when it is created
+            
+        Returns:
+            The shared UpstreamGuard
+        """
+        with self._lock:
+            guard = self._guards.get(name)
+            if guard is None:
+                guard = self._guards[name] = UpstreamGuard(name, **kwargs)
+            return guard
+    
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Return per-provider breaker and hedging statistics"""
+        with self._lock:
+            guards = list(self._guards.values())
+        return {guard.name: guard.stats() for guard in guards}
+
+
+guards = GuardRegistry()
@@ -0,0 +1,97 @@
+import functools
+import threading
+from typing import Any, Callable, Dict, Hashable
+
+
+class _Call:
+    """An upstream call in flight and the outcome its waiters will share"""
+    
+    __slots__ = ("done", "result", "error")
+    
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Collapse concurrent calls with the same key into one execution"""
+    
+    def __init__(self):
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+        self.executed = 0
+        self.shared = 0
+    
+    def do(self, key: Hashable, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """
+        Run func once for all callers currently waiting on key
+        
+        The first caller executes func; callers arriving while it runs block
+        until it finishes and receive the same result or exception.
+        
+        Args:
+            key: Identity of the call
+            func: Callable to execute
+            *args: Positional arguments for func
+            **kwargs: Keyword arguments for func
+            
+        Returns:
+            The (shared) return value of func
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                self.shared += 1
+                leader = False
+            else:
+                call = self._calls[key] = _Call()
+                self.executed += 1
+                leader = True
+        
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        
+        try:
+            call.result = func(*args, **kwargs)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+    
+    def stats(self) -> Dict[str, int]:
+        """Return executed and shared call counters"""
+        with self._lock:
+            return {
+                'in_flight': len(self._calls),
+                'executed': self.executed,
+                'shared': self.shared,
+            }
+
+
+# Shared by every service method decorated with @coalesce
+group = SingleFlight()
+
+
+def coalesce(func: Callable[..., Any]) -> Callable[..., Any]:
+    """
+    Decorator that shares one execution among identical concurrent calls
+    
+    The key is the function plus its arguments, so bound methods on different
+    service instances (e.g. different exchanges) are never merged.
+    """
+    name = f"{func.__module__}.{func.__qualname__}"
+    
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        key = (name, args, tuple(sorted(kwargs.items())))
+        return group.do(key, func, *args, **kwargs)
+    
+    return wrapper
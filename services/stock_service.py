@@ -1,55 +1,240 @@
+import re
 from datetime import datetime
-from typing import Optional, List
+from typing import Optional, List, Dict, Iterator, Tuple
+import numpy as np
+import pandas as pd
+import requests
 import yfinance as yf
-from models.stock import StockData, StockQuote, StockHistory
-from models.common import DataPoint, MarketStatus, TimeRange, Interval
+from config import settings
+from models.stock import StockData, StockQuote, StockQuoteBatch, StockHistory
+from models.common import DataPoint, MarketStatus, TimeRange, Interval, IndicatorParams, IndicatorSeries
+from services import metrics
+from services.cache import TTLCache
+from services.cassette import cassettes
+from services.conversion import frame_to_columns, columns_to_lists, columns_to_data_points
+from services.indicators import engine as indicator_engine, values_to_lists
+from services.rate_limit import Priority, priority, scheduler
+from services.resilience import CircuitOpenError, guards
+from services.resample import resample_calendar, resample_sessions
+from services.singleflight import coalesce
+from services.symbol_directory import directory as symbol_directory
+
+try:
+    from curl_cffi.requests import exceptions as curl_errors  # HTTP client of newer yfinance releases
+except ImportError:
+    curl_errors = None
+
+
+# Price fields go stale in seconds, company fundamentals in hours
+_price_cache = TTLCache(
+    "stock_price",
+    ttl=settings.STOCK_PRICE_TTL,
+    maxsize=settings.CACHE_MAX_ENTRIES,
+    stale_ttl=settings.STOCK_PRICE_STALE_TTL
+)
+_fundamentals_cache = TTLCache(
+    "stock_fundamentals",
+    ttl=settings.STOCK_FUNDAMENTALS_TTL,
+    maxsize=settings.CACHE_MAX_ENTRIES,
+    stale_ttl=settings.STOCK_FUNDAMENTALS_STALE_TTL
+)
+_history_cache = TTLCache(
+    "stock_history",
+    ttl=settings.STOCK_HISTORY_TTL,
+    maxsize=settings.CACHE_MAX_ENTRIES // 4
+)
+
+_YAHOO_NETWORK_ERRORS = (requests.RequestException, ConnectionError, TimeoutError) + (
+    (curl_errors.RequestException,) if curl_errors is not None else ()
+)
+
+
+def _is_yahoo_failure(error: Exception) -> bool:
+    """Whether an error means Yahoo is unhealthy: network errors, timeouts, 429 and 5xx, not unknown symbols"""
+    if type(error).__name__ == "YFRateLimitError":
+        return True
+    if isinstance(error, _YAHOO_NETWORK_ERRORS):
+        status = getattr(getattr(error, "response", None), "status_code", None)
+        return status is None or status == 429 or status >= 500
+    return False
+
+
+# Every Yahoo request takes a token from this shared budget first, then goes
+# through the provider's circuit breaker
+_yahoo = scheduler.bucket("yahoo")
+_yahoo_guard = guards.guard("yahoo", is_failure=_is_yahoo_failure, bucket=_yahoo)
+
+
+def _call_yahoo(method: str, func, *args, cost: int = 1, hedge: bool = True, **kwargs):
+    """Rate-limit, circuit-break and (for cheap idempotent reads) hedge a yfinance call"""
+    func = cassettes.wrap("yahoo", method, func)
+    if cassettes.replaying:
+        # Recorded responses spend no upstream budget and cannot trip the breaker
+        return metrics.observe_upstream("yahoo", method, func, *args, **kwargs)
+    _yahoo.acquire(cost)
+    return metrics.observe_upstream("yahoo", method, _yahoo_guard.call, func, *args, hedge=hedge, **kwargs)
+
+
+def _ticker_history(symbol: str, **kwargs) -> pd.DataFrame:
+    return yf.Ticker(symbol).history(**kwargs)
+
+
+def _ticker_info(symbol: str) -> dict:
+    return yf.Ticker(symbol).info
+
+
+# Yahoo keeps 5m bars for about 60 days, so intraday intervals are only
+# derived locally for periods inside that window
+_INTRADAY_BASE_PERIODS = {"1d", "5d", "1mo"}
+
+# Bars Yahoo returns per trading session, used to size date-sliced stream pages
+_BARS_PER_SESSION = {"1m": 390, "5m": 78, "15m": 26, "30m": 13, "1h": 7, "1d": 1, "1wk": 0.2, "1mo": 0.05}
+
+# Where a period=max stream starts (Yahoo's oldest daily bars are from 1962)
+_MAX_PERIOD_START = pd.Timestamp("1962-01-01")
+
+_PERIOD_OFFSETS = {"d": "days", "wk": "weeks", "mo": "months", "y": "years"}
+
+
+def _resample_base(period: str, interval: str) -> Optional[Interval]:
+    """Interval fetched and resampled locally for this request, or None to fetch it directly"""
+    try:
+        base = Interval(interval).base
+    except ValueError:
+        return None
+    if base is not None and (base == Interval.ONE_DAY or period in _INTRADAY_BASE_PERIODS):
+        return base
+    return None
+
+
+def _history_pages(period: str, interval: str) -> List[Tuple[Optional[str], str]]:
+    """
+    Split a history period into [start, end) date windows of about STREAM_CHUNK_SIZE bars
+    
+    Windows are cut backwards from today, so their bounds move with the
+    date (recorded pages replay on later days); the first window of "max"
+    has no start (Yahoo's earliest data). Windows of weekly and monthly bars
+    start on a Monday or the first of a month, so no resampled bar
+    straddles two pages. Periods that are not of the <n>d/wk/mo/y, ytd or
+    max form give no windows.
+    """
+    today = pd.Timestamp.now().normalize()
+    if period == "max":
+        start = _MAX_PERIOD_START
+    elif period == "ytd":
+        start = today.replace(month=1, day=1)
+    else:
+        match = re.fullmatch(r"(\d+)(d|wk|mo|y)", period)
+        if match is None:
+            return []
+        start = today - pd.DateOffset(**{_PERIOD_OFFSETS[match.group(2)]: int(match.group(1))})
+    end = today + pd.Timedelta(days=1)
+    
+    base = _resample_base(period, interval)
+    fetched = base.value if base is not None else interval
+    bars_per_day = _BARS_PER_SESSION.get(fetched, 1) * 5 / 7
+    days = max(31 if interval in ("1wk", "1mo") else 1, int(settings.STREAM_CHUNK_SIZE / bars_per_day))
+    
+    bounds = [end]
+    while True:
+        bound = bounds[-1] - pd.Timedelta(days=days)
+        if interval == "1wk":
+            bound -= pd.Timedelta(days=bound.weekday())
+        elif interval == "1mo":
+            bound = bound.replace(day=1)
+        if bound <= start:
+            break
+        bounds.append(bound)
+    bounds.append(start)
+    bounds.reverse()
+    pages = [(a.strftime("%Y-%m-%d"), b.strftime("%Y-%m-%d")) for a, b in zip(bounds, bounds[1:])]
+    if period == "max":
+        pages[0] = (None, pages[0][1])
+    return pages
+
+
+def _frame_chunks(frame: pd.DataFrame) -> Iterator[Dict[str, np.ndarray]]:
+    size = settings.STREAM_CHUNK_SIZE
+    for offset in range(0, len(frame), size):
+        yield frame_to_columns(frame.iloc[offset:offset + size])
 
 
 class StockService:
     """Service for fetching stock market data using yfinance"""
     
     @staticmethod
-    def get_stock_data(symbol: str) -> StockData:
-        """
-        Get comprehensive stock data for a symbol
-        
-        Args:
-            symbol: Stock ticker symbol (e.g., 'AAPL', 'GOOGL')
-            
-        Returns:
-            StockData object with comprehensive information
-        """
-        ticker = yf.Ticker(symbol)
-        info = ticker.info
-        
-        # Get current quote
-        hist = ticker.history(period="1d")
+    @coalesce
+    def _fetch_price(symbol: str) -> dict:
+        """Fetch the latest price snapshot from recent daily bars"""
+        hist = _call_yahoo("Ticker.history", _ticker_history, symbol, period="5d")
         if hist.empty:
             raise ValueError(f"No data available for symbol {symbol}")
         
-        current_price = hist['Close'].iloc[-1]
-        previous_close = info.get('previousClose', current_price)
+        last = hist.iloc[-1]
+        return {
+            'price': float(last['Close']),
+            'previous_close': float(hist['Close'].iloc[-2]) if len(hist) > 1 else None,
+            'volume': int(last['Volume']),
+            'day_high': float(last['High']),
+            'day_low': float(last['Low']),
+        }
+    
+    @staticmethod
+    @coalesce
+    def _fetch_fundamentals(symbol: str) -> dict:
+        """Fetch the slow-moving company profile and financial metrics"""
+        return _call_yahoo("Ticker.info", _ticker_info, symbol) or {}
+    
+    @staticmethod
+    def _get_price(symbol: str) -> dict:
+        return _price_cache.get_or_load(symbol, lambda: StockService._fetch_price(symbol))
+    
+    @staticmethod
+    def _get_fundamentals(symbol: str) -> dict:
+        return _fundamentals_cache.get_or_load(symbol, lambda: StockService._fetch_fundamentals(symbol))
+    
+    @staticmethod
+    def _build_quote(symbol: str, price: dict, info: dict) -> StockQuote:
+        current_price = price['price']
+        previous_close = price['previous_close'] or info.get('previousClose') or current_price
         change = current_price - previous_close
         change_percent = (change / previous_close * 100) if previous_close else 0
         
-        quote = StockQuote(
-            symbol=symbol.upper(),
+        return StockQuote(
+            symbol=symbol,
             name=info.get('longName'),
-            price=float(current_price),
+            price=current_price,
             change=float(change),
             change_percent=float(change_percent),
-            volume=int(hist['Volume'].iloc[-1]) if not hist['Volume'].empty else 0,
+            volume=price['volume'],
             market_cap=info.get('marketCap'),
             pe_ratio=info.get('trailingPE'),
-            day_high=info.get('dayHigh'),
-            day_low=info.get('dayLow'),
+            day_high=price['day_high'],
+            day_low=price['day_low'],
             year_high=info.get('fiftyTwoWeekHigh'),
             year_low=info.get('fiftyTwoWeekLow'),
             timestamp=datetime.now()
         )
+    
+    @staticmethod
+    @coalesce
+    def get_stock_data(symbol: str) -> StockData:
+        """
+        Get comprehensive stock data for a symbol
+        
+        Args:
+            symbol: Stock ticker symbol (e.g., 'AAPL', 'GOOGL')
+            
+        Returns:
+            StockData object with comprehensive information
+        """
+        symbol = symbol.upper()
+        price = StockService._get_price(symbol)
+        info = StockService._get_fundamentals(symbol)
+        quote = StockService._build_quote(symbol, price, info)
         
         stock_data = StockData(
-            symbol=symbol.upper(),
+            symbol=symbol,
             name=info.get('longName'),
             exchange=info.get('exchange'),
             currency=info.get('currency'),
@@ -75,45 +260,114 @@ class StockService:
         return stock_data
     
     @staticmethod
+    @coalesce
     def get_quote(symbol: str) -> StockQuote:
         """
         Get real-time quote for a stock
         
+        Only the lightweight price snapshot is ever waited on. Name, market
+        cap, P/E and 52-week range come from the fundamentals cache when it
+        has them; otherwise they are left empty and the slow ticker.info
+        record is loaded in the background for later requests.
+        
         Args:
             symbol: Stock ticker symbol
             
         Returns:
             StockQuote object
         """
-        ticker = yf.Ticker(symbol)
-        info = ticker.info
-        hist = ticker.history(period="1d")
+        symbol = symbol.upper()
+        price = StockService._get_price(symbol)
+        info = _fundamentals_cache.get_or_schedule(
+            symbol, lambda: StockService._fetch_fundamentals(symbol)
+        ) or {}
+        return StockService._build_quote(symbol, price, info)
+    
+    @staticmethod
+    @priority(Priority.BATCH)
+    def get_quotes(symbols: List[str]) -> StockQuoteBatch:
+        """
+        Get real-time quotes for several stocks in one batched download
         
-        if hist.empty:
-            raise ValueError(f"No data available for symbol {symbol}")
+        Fundamental fields (name, market cap, PE, 52-week range) are filled
+        from the fundamentals cache when present; the batch never triggers
+        per-symbol ticker.info calls.
         
-        current_price = hist['Close'].iloc[-1]
-        previous_close = info.get('previousClose', current_price)
-        change = current_price - previous_close
-        change_percent = (change / previous_close * 100) if previous_close else 0
+        Args:
+            symbols: Stock ticker symbols
+            
+        Returns:
+            StockQuoteBatch with a quote per resolved symbol and an error per failed one
+        """
+        symbols = list(dict.fromkeys(s.strip().upper() for s in symbols if s.strip()))
+        if not symbols:
+            raise ValueError("No symbols provided")
         
-        return StockQuote(
-            symbol=symbol.upper(),
-            name=info.get('longName'),
-            price=float(current_price),
-            change=float(change),
-            change_percent=float(change_percent),
-            volume=int(hist['Volume'].iloc[-1]) if not hist['Volume'].empty else 0,
-            market_cap=info.get('marketCap'),
-            pe_ratio=info.get('trailingPE'),
-            day_high=info.get('dayHigh'),
-            day_low=info.get('dayLow'),
-            year_high=info.get('fiftyTwoWeekHigh'),
-            year_low=info.get('fiftyTwoWeekLow'),
-            timestamp=datetime.now()
+        try:
+            prices = StockService._fetch_prices(tuple(symbols))
+        except CircuitOpenError:
+            # Yahoo is unreachable: answer from the last known prices, flagged as stale
+            prices = {symbol: _price_cache.get_fallback(symbol) for symbol in symbols}
+            prices = {symbol: price for symbol, price in prices.items() if price is not None}
+            if not prices:
+                raise
+        
+        quotes = []
+        errors = {}
+        for symbol in symbols:
+            price = prices.get(symbol)
+            if price is None:
+                errors[symbol] = f"No data available for symbol {symbol}"
+                continue
+            _price_cache.set(symbol, price)
+            info = _fundamentals_cache.get(symbol) or {}
+            quotes.append(StockService._build_quote(symbol, price, info))
+        
+        return StockQuoteBatch(quotes=quotes, errors=errors)
+    
+    @staticmethod
+    @coalesce
+    def _fetch_prices(symbols: tuple) -> dict:
+        """Fetch price snapshots for many symbols with a single yf.download"""
+        # yfinance requests each ticker separately, so the batch costs one token per symbol
+        frame = _call_yahoo(
+            "download",
+            yf.download,
+            list(symbols),
+            period="5d",
+            group_by="column",
+            progress=False,
+            threads=True,
+            cost=len(symbols),
+            hedge=False
         )
+        if frame is None or frame.empty:
+            return {}
+        if not isinstance(frame.columns, pd.MultiIndex):
+            frame.columns = pd.MultiIndex.from_product([frame.columns, [symbols[0]]])
+        
+        # Columns are (field, ticker); each field becomes a dates x tickers frame
+        close = frame['Close'].ffill()
+        valid = close.notna().sum()
+        last_close = close.iloc[-1]
+        previous_close = close.iloc[-2] if len(close) > 1 else last_close * np.nan
+        volume = frame['Volume'].ffill().iloc[-1].fillna(0)
+        day_high = frame['High'].ffill().iloc[-1]
+        day_low = frame['Low'].ffill().iloc[-1]
+        
+        snapshot = pd.DataFrame({
+            'price': last_close,
+            'previous_close': previous_close.where(valid > 1),
+            'volume': volume.astype('int64'),
+            'day_high': day_high,
+            'day_low': day_low,
+        }).dropna(subset=['price'])
+        snapshot = snapshot.astype(object).where(snapshot.notna(), None)
+        
+        return snapshot.to_dict(orient='index')
     
     @staticmethod
+    @coalesce
     def get_history(
         symbol: str,
         period: str = "1mo",
@@ -130,22 +384,9 @@ class StockService:
         Returns:
             StockHistory object with historical data points
         """
-        ticker = yf.Ticker(symbol)
-        hist = ticker.history(period=period, interval=interval)
-        
-        if hist.empty:
-            raise ValueError(f"No historical data available for symbol {symbol}")
+        hist = StockService._get_history_frame(symbol, period, interval)
         
-        data_points = []
-        for timestamp, row in hist.iterrows():
-            data_points.append(DataPoint(
-                timestamp=timestamp.to_pydatetime(),
-                open=float(row['Open']),
-                high=float(row['High']),
-                low=float(row['Low']),
-                close=float(row['Close']),
-                volume=float(row['Volume'])
-            ))
+        data_points = columns_to_data_points(frame_to_columns(hist), hist.index.to_pydatetime())
         
         return StockHistory(
             symbol=symbol.upper(),
@@ -155,11 +396,172 @@ class StockService:
             interval=interval
         )
     
+    @staticmethod
+    @coalesce
+    def get_history_columns(
+        symbol: str,
+        period: str = "1mo",
+        interval: str = "1d"
+    ) -> dict:
+        """
+        Get historical stock data in columnar form
+        
+        Builds the columns straight from the DataFrame arrays without any
+        per-row model objects; `t` holds epoch milliseconds (UTC).
+        
+        Args:
+            symbol: Stock ticker symbol
+            period: Time period (1d, 5d, 1mo, 3mo, 6mo, 1y, 2y, 5y, max)
+            interval: Data interval (1m, 5m, 15m, 30m, 1h, 1d, 1wk, 1mo)
+            
+        Returns:
+            Dict with symbol, interval and t/o/h/l/c/v lists
+        """
+        hist = StockService._get_history_frame(symbol, period, interval)
+        
+        return {
+            'symbol': symbol.upper(),
+            'interval': interval,
+            **columns_to_lists(frame_to_columns(hist))
+        }
+    
+    @staticmethod
+    def get_indicators(
+        symbol: str,
+        period: str = "6mo",
+        interval: str = "1d",
+        params: Optional[IndicatorParams] = None
+    ) -> IndicatorSeries:
+        """
+        Compute technical indicators over historical stock data
+        
+        Indicator state is cached per symbol and interval, so repeated polls
+        over a window that slides forward only process the candles added
+        since the previous call.
+        
+        Args:
+            symbol: Stock ticker symbol
+            period: Time period (1d, 5d, 1mo, 3mo, 6mo, 1y, 2y, 5y, max)
+            interval: Data interval (1m, 5m, 15m, 30m, 1h, 1d, 1wk, 1mo)
+            params: Indicator selection and periods (defaults when omitted)
+            
+        Returns:
+            IndicatorSeries aligned to the candle timestamps
+        """
+        params = params or IndicatorParams()
+        columns = frame_to_columns(StockService._get_history_frame(symbol, period, interval))
+        values = indicator_engine.compute(("stock", symbol.upper(), interval), columns, params)
+        
+        return IndicatorSeries(
+            symbol=symbol.upper(),
+            interval=interval,
+            t=columns['t'].tolist(),
+            values=values_to_lists(values)
+        )
+    
+    @staticmethod
+    def iter_history_columns(
+        symbol: str,
+        period: str = "1mo",
+        interval: str = "1d"
+    ) -> Iterator[Dict[str, np.ndarray]]:
+        """
+        Stream historical stock data as column-array chunks
+        
+        Periods spanning more than one chunk are fetched from Yahoo in
+        date-sliced pages, each converted and yielded before the next is
+        requested, so memory stays flat; shorter ones are sliced from the
+        cached history frame.
+        
+        Args:
+            symbol: Stock ticker symbol
+            period: Time period (1d, 5d, 1mo, 3mo, 6mo, 1y, 2y, 5y, max)
+            interval: Data interval (1m, 5m, 15m, 30m, 1h, 1d, 1wk, 1mo)
+            
+        Yields:
+            Dicts of t/o/h/l/c/v arrays of at most STREAM_CHUNK_SIZE rows
+        """
+        pages = _history_pages(period, interval)
+        if len(pages) <= 1:
+            yield from _frame_chunks(StockService._get_history_frame(symbol, period, interval))
+            return
+        
+        symbol = symbol.upper()
+        base = _resample_base(period, interval)
+        found = False
+        for start, end in pages:
+            frame = _call_yahoo(
+                "Ticker.history", _ticker_history, symbol,
+                start=start, end=end, interval=base.value if base is not None else interval
+            )
+            if frame.empty:
+                continue
+            if base is not None:
+                frame = StockService._resample_frame(frame, Interval(interval))
+            found = True
+            yield from _frame_chunks(frame)
+        if not found:
+            raise ValueError(f"No historical data available for symbol {symbol}")
+    
+    @staticmethod
+    def _get_history_frame(symbol: str, period: str, interval: str) -> pd.DataFrame:
+        """
+        Return OHLCV bars, resampling derivable intervals from a cached base series
+        
+        Asking for 15m, 30m and 1h bars of the same symbol costs one upstream
+        5m fetch; 1wk and 1mo bars are built from daily bars.
+        """
+        symbol = symbol.upper()
+        base = _resample_base(period, interval)
+        if base is not None:
+            frame = _history_cache.get_or_load(
+                (symbol, period, base.value),
+                lambda: StockService._fetch_history(symbol, period, base.value)
+            )
+            return StockService._resample_frame(frame, Interval(interval))
+        
+        return _history_cache.get_or_load(
+            (symbol, period, interval),
+            lambda: StockService._fetch_history(symbol, period, interval)
+        )
+    
+    @staticmethod
+    def _resample_frame(frame: pd.DataFrame, interval: Interval) -> pd.DataFrame:
+        columns = frame_to_columns(frame)
+        tz = frame.index.tz
+        wall = frame.index.tz_localize(None) if tz is not None else frame.index
+        wall_ms = wall.as_unit('ms').asi8
+        
+        if interval == Interval.ONE_WEEK:
+            bars = resample_calendar(columns, wall_ms, 'W')
+        elif interval == Interval.ONE_MONTH:
+            bars = resample_calendar(columns, wall_ms, 'M')
+        else:
+            bars = resample_sessions(columns, wall_ms, interval.milliseconds)
+        
+        index = pd.to_datetime(bars['t'], unit='ms', utc=True)
+        index = index.tz_convert(tz) if tz is not None else index.tz_localize(None)
+        return pd.DataFrame(
+            {'Open': bars['o'], 'High': bars['h'], 'Low': bars['l'], 'Close': bars['c'], 'Volume': bars['v']},
+            index=index
+        )
+    
+    @staticmethod
+    @coalesce
+    def _fetch_history(symbol: str, period: str, interval: str) -> pd.DataFrame:
+        hist = _call_yahoo("Ticker.history", _ticker_history, symbol, period=period, interval=interval)
+        if hist.empty:
+            raise ValueError(f"No historical data available for symbol {symbol}")
+        return hist
+    
     @staticmethod
     def search_symbols(query: str, limit: int = 10) -> List[dict]:
         """
         Search for stock symbols
         
+        Answered from the local symbol directory by ticker and company name
+        (prefix, substring and typo-tolerant matches); no upstream call is made.
+        
         Args:
             query: Search query
             limit: Maximum number of results
@@ -167,20 +569,54 @@ class StockService:
         Returns:
             List of matching symbols with basic info
         """
-        # Note: yfinance doesn't have built-in search, so this is a simple implementation
-        # In production, you might want to use a dedicated API like Alpha Vantage or IEX
-        try:
-            ticker = yf.Ticker(query.upper())
-            info = ticker.info
+        return symbol_directory.search(query, limit)
+    
+    @staticmethod
+    def refresh_price(symbol: str) -> None:
+        """Renew the cached price snapshot for a symbol ahead of expiry"""
+        symbol = symbol.upper()
+        _price_cache.refresh(symbol, lambda: StockService._fetch_price(symbol))
+    
+    @staticmethod
+    def refresh_prices(symbols: List[str]) -> None:
+        """
+        Renew the cached price snapshots for several symbols with one batched download
+        
+        Args:
+            symbols: Stock ticker symbols
             
-            if info and 'symbol' in info:
-                return [{
-                    'symbol': info.get('symbol', query.upper()),
-                    'name': info.get('longName', ''),
-                    'exchange': info.get('exchange', ''),
-                    'type': 'stock'
-                }]
-        except Exception:
-            pass
-        
-        return []
+        Raises:
+            ValueError: If some symbols got no data (the others are still renewed)
+        """
+        symbols = tuple(dict.fromkeys(symbol.upper() for symbol in symbols))
+        prices = StockService._fetch_prices(symbols)
+        for symbol, price in prices.items():
+            _price_cache.refresh(symbol, lambda price=price: price)
+        missing = [symbol for symbol in symbols if symbol not in prices]
+        if missing:
+            raise ValueError(f"No price data for {', '.join(missing)}")
+    
+    @staticmethod
+    def refresh_fundamentals(symbol: str) -> None:
+        """Renew the cached company profile and metrics for a symbol ahead of expiry"""
+        symbol = symbol.upper()
+        _fundamentals_cache.refresh(symbol, lambda: StockService._fetch_fundamentals(symbol))
+    
+    @staticmethod
+    def refresh_history(symbol: str, period: str = "1mo", interval: str = "1d") -> None:
+        """Renew a cached history frame for a symbol ahead of expiry"""
+        symbol = symbol.upper()
+        _history_cache.refresh(
+            (symbol, period, interval),
+            lambda: StockService._fetch_history(symbol, period, interval)
+        )
+    
+    @staticmethod
+    def cache_stats() -> List[dict]:
+        """
+        Get hit, miss and eviction counters for the quote and history caches
+        
+        Returns:
+            List of per-tier cache statistics
+        """
+        return [_price_cache.stats(), _fundamentals_cache.stats(), _history_cache.stats()]
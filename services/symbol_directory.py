@@ -0,0 +1,155 @@
+import io
+import logging
+import os
+import threading
+import time
+from typing import List, Optional
+import httpx
+import pandas as pd
+from config import settings
+from services.cassette import cassettes
+from services.symbol_index import SymbolIndex
+
+logger = logging.getLogger(__name__)
+
+# Listing shipped with the code; a refreshed copy in DATA_CACHE_DIR takes precedence
+BUNDLED_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "stock_symbols.csv")
+
+_EXCHANGES = {
+    'A': 'NYSE American',
+    'N': 'NYSE',
+    'P': 'NYSE ARCA',
+    'Q': 'NASDAQ',
+    'V': 'IEX',
+    'Z': 'Cboe BZX',
+}
+
+_FIELDS = ('symbol', 'name', 'exchange', 'type')
+
+
+class SymbolDirectory:
+    """Local stock symbol listing with an in-memory search index"""
+    
+    def __init__(self):
+        self._index: Optional[SymbolIndex] = None
+        self._lock = threading.Lock()
+        self._next_attempt = 0.0
+        self.path = os.path.join(settings.DATA_CACHE_DIR, "stock_symbols.csv")
+    
+    def search(self, query: str, limit: int = 10) -> List[dict]:
+        """
+        Search the listing by ticker and company name without any network call
+        
+        Args:
+            query: Ticker or company name fragment (typos are tolerated)
+            limit: Maximum number of results
+            
+        Returns:
+            Matching symbols with name, exchange and type, best first
+        """
+        index = self._index or self._load()
+        self._refresh_if_due()
+        return [dict(record) for record in index.search(query, limit)]
+    
+    def refresh(self) -> int:
+        """
+        Download the listing from STOCK_SYMBOLS_URL and swap in the new index
+        
+        Accepts the Nasdaq Trader pipe-delimited symbol directory or a CSV
+        with symbol, name, exchange and type columns.
+        
+        Returns:
+            Number of symbols in the new listing
+        """
+        response = httpx.get(settings.STOCK_SYMBOLS_URL, timeout=30.0, follow_redirects=True)
+        response.raise_for_status()
+        frame = _parse_listing(response.text)
+        if frame.empty:
+            raise ValueError("Symbol listing is empty")
+        
+        # Write to a temporary file and rename so readers never see a partial listing
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        temp_path = f"{self.path}.{os.getpid()}.tmp"
+        frame.to_csv(temp_path, index=False)
+        os.replace(temp_path, self.path)
+        
+        self._index = _build_index(frame)
+        return len(frame)
+    
+    def _load(self) -> SymbolIndex:
+        with self._lock:
+            if self._index is None:
+                self._index = _build_index(_read_listing(self._listing_path()))
+            return self._index
+    
+    def _listing_path(self) -> str:
+        if settings.STOCK_SYMBOLS_FILE:
+            return settings.STOCK_SYMBOLS_FILE
+        return self.path if os.path.exists(self.path) else BUNDLED_PATH
+    
+    def _refresh_if_due(self) -> None:
+        """Start a background download when the refreshed copy is missing or too old"""
+        interval = settings.STOCK_SYMBOLS_REFRESH_INTERVAL
+        if not interval or not settings.STOCK_SYMBOLS_URL or settings.STOCK_SYMBOLS_FILE or cassettes.replaying:
+            return
+        now = time.time()
+        if now < self._next_attempt:
+            return
+        try:
+            if now - os.path.getmtime(self.path) < interval:
+                return
+        except OSError:
+            pass
+        
+        with self._lock:
+            if now < self._next_attempt:
+                return
+            # A failed download is retried after one interval, not on every search
+            self._next_attempt = now + interval
+        threading.Thread(target=self._refresh_in_background, name="symbol-directory", daemon=True).start()
+    
+    def _refresh_in_background(self) -> None:
+        try:
+            count = self.refresh()
+            logger.info("Stock symbol directory refreshed: %d symbols", count)
+        except Exception as e:
+            # Keep serving the current listing
+            logger.warning("Stock symbol directory refresh failed: %s", e)
+
+
+def _read_listing(path: str) -> pd.DataFrame:
+    if path.endswith(".parquet"):
+        frame = pd.read_parquet(path)
+    else:
+        frame = pd.read_csv(path, dtype=str, keep_default_na=False)
+    return frame.reindex(columns=_FIELDS, fill_value="")
+
+
+def _parse_listing(text: str) -> pd.DataFrame:
+    """Normalize a downloaded listing into symbol/name/exchange/type columns"""
+    if "|" not in text.split("\n", 1)[0]:
+        return pd.read_csv(io.StringIO(text), dtype=str, keep_default_na=False).reindex(columns=_FIELDS, fill_value="")
+    
+    # Nasdaq Trader format; the last line is a "File Creation Time" footer
+    frame = pd.read_csv(io.StringIO(text), sep="|", dtype=str, keep_default_na=False)
+    frame = frame[frame["Symbol"].str.len() > 0]
+    if "Test Issue" in frame:
+        frame = frame[frame["Test Issue"] != "Y"]
+    frame = frame[~frame["Symbol"].str.contains(r"[$^]|File Creation", regex=True)]
+    
+    exchange = frame["Listing Exchange"] if "Listing Exchange" in frame else pd.Series("Q", index=frame.index)
+    return pd.DataFrame({
+        # Yahoo writes share classes with a dash (BRK.B -> BRK-B)
+        'symbol': frame["Symbol"].str.replace(".", "-", regex=False),
+        'name': frame["Security Name"].str.replace(r" - .*$", "", regex=True),
+        'exchange': exchange.map(_EXCHANGES).fillna(exchange),
+        'type': frame["ETF"].map({'Y': 'etf'}).fillna('stock') if "ETF" in frame else 'stock',
+    })
+
+
+def _build_index(frame: pd.DataFrame) -> SymbolIndex:
+    records = frame.to_dict("records")
+    return SymbolIndex(records, ('symbol', 'name'), fuzzy_threshold=settings.STOCK_SEARCH_FUZZY_THRESHOLD)
+
+
+directory = SymbolDirectory()
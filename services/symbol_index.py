@@ -0,0 +1,184 @@
+import re
+from collections import Counter, defaultdict
+from typing import Dict, List, Sequence, Set
+
+# Scores by how a query matches a field; earlier fields win ties within a kind
+_EXACT = 400
+_PREFIX = 300
+_WORD_PREFIX = 200
+_SUBSTRING = 100
+_FUZZY = 99  # Scaled by similarity, so always below a substring match
+
+# Fuzzy matching only scores this many records with the most shared trigrams
+_FUZZY_CANDIDATES = 64
+
+_WORD_SPLIT = re.compile(r"[^0-9A-Z]+")
+
+
+def _normalize(text: str) -> str:
+    return (text or "").strip().upper()
+
+
+def _trigrams(text: str) -> Set[str]:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def _word_trigrams(word: str) -> Set[str]:
+    # Padding lets short words and their first/last letters count
+    return _trigrams(f" {word} ")
+
+
+class SymbolIndex:
+    """
+    Immutable in-memory search index over symbol records
+    
+    Every prefix of each field (and of each word in it) maps to the records
+    containing it, and every trigram maps to the records containing it for
+    substring lookups. A search only scores the handful of candidate records
+    those postings return, instead of scanning the whole listing; queries
+    under three characters, too short for trigrams, scan it for substrings.
+    Build a new index and swap the reference to update it; readers never see
+    a partial one.
+    """
+    
+    def __init__(
+        self,
+        records: Sequence[dict],
+        fields: Sequence[str],
+        max_prefix: int = 16,
+        fuzzy_threshold: float = 0.0
+    ):
+        """
+        Build the index
+        
+        Args:
+            records: Result dicts, in tie-break order (e.g. most popular first)
+            fields: Record keys to index, most important first
+            max_prefix: Longest prefix indexed; longer queries fall back to trigrams
+            fuzzy_threshold: Minimum word similarity (0-1) for typo-tolerant
+                matches when exact kinds leave room under the limit; 0 disables them
+        """
+        self.records = list(records)
+        self.fields = tuple(fields)
+        self.max_prefix = max_prefix
+        self.fuzzy_threshold = fuzzy_threshold
+        self._values: List[tuple] = []
+        self._prefixes: Dict[str, Set[int]] = defaultdict(set)
+        self._trigrams: Dict[str, Set[int]] = defaultdict(set)
+        self._word_grams: List[List[Set[str]]] = []
+        self._fuzzy: Dict[str, Set[int]] = defaultdict(set)
+        
+        for i, record in enumerate(self.records):
+            values = tuple(_normalize(str(record.get(field) or "")) for field in self.fields)
+            self._values.append(values)
+            for value in values:
+                if not value:
+                    continue
+                words = {value} | {word for word in _WORD_SPLIT.split(value) if word}
+                for word in words:
+                    for end in range(1, min(len(word), max_prefix) + 1):
+                        self._prefixes[word[:end]].add(i)
+                for gram in _trigrams(value):
+                    self._trigrams[gram].add(i)
+            
+            if fuzzy_threshold:
+                grams = [
+                    _word_trigrams(word)
+                    for value in values
+                    for word in _WORD_SPLIT.split(value) if word
+                ]
+                self._word_grams.append(grams)
+                for gram in set().union(*grams):
+                    self._fuzzy[gram].add(i)
+        
+        self._prefixes = dict(self._prefixes)
+        self._trigrams = dict(self._trigrams)
+        self._fuzzy = dict(self._fuzzy)
+    
+    def __len__(self) -> int:
+        return len(self.records)
+    
+    def search(self, query: str, limit: int = 10) -> List[dict]:
+        """
+        Return the best matching records
+        
+        Exact matches rank first, then prefix matches of the whole field, then
+        prefix matches of a word inside it, then plain substring matches;
+        within each kind earlier fields, shorter values and earlier records win.
+        When fuzzy matching is enabled and fewer than `limit` records matched,
+        the rest are filled with the most similar records (typos, swapped letters).
+        
+        Args:
+            query: Search text (case-insensitive)
+            limit: Maximum number of results
+            
+        Returns:
+            Matching records, best first
+        """
+        query = _normalize(query)
+        if not query or limit <= 0:
+            return []
+        
+        candidates = set(self._prefixes.get(query[:self.max_prefix], ()))
+        if len(query) >= 3:
+            postings = sorted((self._trigrams.get(gram, set()) for gram in _trigrams(query)), key=len)
+            if postings:
+                candidates |= set.intersection(*postings)
+        else:
+            # Too short for trigrams; a scan is cheap at listing sizes
+            candidates |= {i for i, values in enumerate(self._values) if any(query in value for value in values)}
+        
+        ranked = []
+        for i in candidates:
+            score, length = self._score(query, self._values[i])
+            if score:
+                ranked.append((-score, length, i))
+        if self.fuzzy_threshold and len(ranked) < limit:
+            matched = {i for _, _, i in ranked}
+            ranked.extend(
+                (-score, length, i)
+                for score, length, i in self._fuzzy_matches(query)
+                if i not in matched
+            )
+        ranked.sort()
+        return [self.records[i] for _, _, i in ranked[:limit]]
+    
+    def _fuzzy_matches(self, query: str) -> List[tuple]:
+        """Score records by trigram (Dice) similarity of their words to the query words"""
+        # One- and two-letter words carry too little signal to match loosely
+        query_grams = [_word_trigrams(word) for word in _WORD_SPLIT.split(query) if len(word) >= 3]
+        if not query_grams:
+            return []
+        
+        shared = Counter()
+        for gram in set().union(*query_grams):
+            shared.update(self._fuzzy.get(gram, ()))
+        
+        matches = []
+        for i, _ in shared.most_common(_FUZZY_CANDIDATES):
+            words = self._word_grams[i]
+            similarity = sum(
+                max(2 * len(q & w) / (len(q) + len(w)) for w in words)
+                for q in query_grams
+            ) / len(query_grams)
+            if similarity >= self.fuzzy_threshold:
+                matches.append((int(_FUZZY * similarity), 0, i))
+        return matches
+    
+    def _score(self, query: str, values: tuple) -> tuple:
+        best = (0, 0)
+        for rank, value in enumerate(values):
+            if not value or query not in value:
+                continue
+            if value == query:
+                kind = _EXACT
+            elif value.startswith(query):
+                kind = _PREFIX
+            elif any(word.startswith(query) for word in _WORD_SPLIT.split(value)):
+                kind = _WORD_PREFIX
+            else:
+                kind = _SUBSTRING
+            score = kind - rank
+            if score > best[0]:
+                best = (score, len(value))
+        return best
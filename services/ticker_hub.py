@@ -0,0 +1,172 @@
+import asyncio
+import logging
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+from config import settings
+from services.executor import run_blocking
+
+logger = logging.getLogger(__name__)
+
+
+class Subscription:
+    """
+    One client's view of the hub: a mailbox holding the newest pending update per symbol
+    
+    Publishing never waits on the client. If the client has not drained a
+    symbol's previous update yet, the new one is merged into it, so a slow
+    consumer receives fewer, coalesced messages instead of an ever-growing
+    backlog, and never holds up the poller or other subscribers.
+    """
+    
+    def __init__(self, hub: "TickerHub"):
+        self._hub = hub
+        self._pending: Dict[str, dict] = {}
+        self._ready = asyncio.Event()
+        self.symbols: Set[str] = set()
+        self.conflated = 0
+    
+    def offer(self, message: dict) -> None:
+        """Queue a message, merging it into an undelivered one for the same symbol"""
+        symbol = message['symbol']
+        pending = self._pending.get(symbol)
+        if pending is None or pending['type'] == 'error' or message['type'] == 'error':
+            self._pending[symbol] = message
+        else:
+            pending['data'].update(message['data'])
+            self.conflated += 1
+        self._ready.set()
+    
+    async def next_batch(self) -> List[dict]:
+        """Wait for pending updates and take all of them"""
+        await self._ready.wait()
+        self._ready.clear()
+        messages = list(self._pending.values())
+        self._pending.clear()
+        return messages
+    
+    def subscribe(self, symbols: Iterable[str]) -> None:
+        for symbol in symbols:
+            if symbol not in self.symbols:
+                self.symbols.add(symbol)
+                self._hub._attach(symbol, self)
+    
+    def unsubscribe(self, symbols: Iterable[str]) -> None:
+        for symbol in symbols:
+            if symbol in self.symbols:
+                self.symbols.discard(symbol)
+                self._pending.pop(symbol, None)
+                self._hub._detach(symbol, self)
+    
+    def close(self) -> None:
+        """Drop every subscription; pollers without subscribers stop"""
+        self.unsubscribe(list(self.symbols))
+
+
+class _Feed:
+    """Poller state for one symbol"""
+    
+    __slots__ = ("subscribers", "task", "latest", "error")
+    
+    def __init__(self):
+        self.subscribers: Set[Subscription] = set()
+        self.task: Optional[asyncio.Task] = None
+        self.latest: Optional[dict] = None
+        self.error: Optional[str] = None
+
+
+class TickerHub:
+    """
+    Fan-out of live tickers: one upstream poller per symbol, any number of subscribers
+    
+    The poller for a symbol starts with its first subscriber and stops with
+    its last. Each poll result is compared with the previous one and only the
+    fields that changed are published; new subscribers get the latest full
+    snapshot immediately.
+    """
+    
+    def __init__(self, fetch: Callable[[str], dict], interval: Optional[float] = None):
+        """
+        Initialize the hub
+        
+        Args:
+            fetch: Blocking callable returning the live fields of a symbol
+            interval: Seconds between polls of one symbol (default: LIVE_POLL_INTERVAL)
+        """
+        self._fetch = fetch
+        self.interval = interval if interval is not None else settings.LIVE_POLL_INTERVAL
+        self._feeds: Dict[str, _Feed] = {}
+        self.polls = 0
+        self.published = 0
+    
+    def subscription(self) -> Subscription:
+        """Create an empty subscription for a new client"""
+        return Subscription(self)
+    
+    def stats(self) -> Dict[str, Any]:
+        """Return poller, subscriber and message counters"""
+        return {
+            'symbols': len(self._feeds),
+            'subscribers': sum(len(feed.subscribers) for feed in self._feeds.values()),
+            'polls': self.polls,
+            'published': self.published,
+        }
+    
+    def _attach(self, symbol: str, subscription: Subscription) -> None:
+        feed = self._feeds.get(symbol)
+        if feed is None:
+            feed = self._feeds[symbol] = _Feed()
+            feed.task = asyncio.get_running_loop().create_task(self._poll(symbol, feed))
+        feed.subscribers.add(subscription)
+        
+        if feed.error is not None:
+            subscription.offer({'type': 'error', 'symbol': symbol, 'error': feed.error})
+        elif feed.latest is not None:
+            subscription.offer({'type': 'snapshot', 'symbol': symbol, 'data': dict(feed.latest)})
+    
+    def _detach(self, symbol: str, subscription: Subscription) -> None:
+        feed = self._feeds.get(symbol)
+        if feed is None:
+            return
+        feed.subscribers.discard(subscription)
+        if not feed.subscribers:
+            feed.task.cancel()
+            del self._feeds[symbol]
+    
+    async def _poll(self, symbol: str, feed: _Feed) -> None:
+        while True:
+            try:
+                data = await run_blocking(self._fetch, symbol)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.polls += 1
+                if feed.error != str(e):
+                    feed.error = str(e)
+                    logger.warning("Live ticker poll failed for %s: %s", symbol, e)
+                    self._publish(feed, {'type': 'error', 'symbol': symbol, 'error': feed.error})
+            else:
+                self.polls += 1
+                self._update(symbol, feed, data)
+            await asyncio.sleep(self.interval)
+    
+    def _update(self, symbol: str, feed: _Feed, data: dict) -> None:
+        if feed.latest is None or feed.error is not None:
+            feed.latest = data
+            feed.error = None
+            self._publish(feed, {'type': 'snapshot', 'symbol': symbol, 'data': dict(data)})
+            return
+        
+        # Exchange timestamps move on every poll; only a changed value is news
+        changed = {
+            key: value
+            for key, value in data.items()
+            if key != 'timestamp' and feed.latest.get(key) != value
+        }
+        feed.latest = data
+        if changed:
+            changed['timestamp'] = data.get('timestamp')
+            self._publish(feed, {'type': 'delta', 'symbol': symbol, 'data': changed})
+    
+    def _publish(self, feed: _Feed, message: dict) -> None:
+        for subscription in feed.subscribers:
+            subscription.offer({**message, 'data': dict(message['data'])} if 'data' in message else dict(message))
+            self.published += 1
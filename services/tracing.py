@@ -0,0 +1,252 @@
+import contextvars
+import cProfile
+import functools
+import io
+import json
+import logging
+import pstats
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+from config import settings
+
+logger = logging.getLogger(__name__)
+if settings.TIMING_LOG_ENABLED and not logger.handlers:
+    # Timing lines should show up even when the server has no logging configured
+    _handler = logging.StreamHandler()
+    _handler.setFormatter(logging.Formatter("%(asctime)s %(name)s %(message)s"))
+    logger.addHandler(_handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+# Trace of the request being handled; shared by every thread working on it
+_trace: contextvars.ContextVar = contextvars.ContextVar("request_trace", default=None)
+
+
+class Trace:
+    """
+    Time spent per phase while handling one request
+    
+    Phases accumulate: two upstream calls add up under one `upstream` entry
+    with a count of 2. Nested phases overlap (upstream time is part of the
+    service call that made it), which Server-Timing allows.
+    """
+    
+    def __init__(self, profile: bool = False):
+        """
+        Initialize the trace
+        
+        Args:
+            profile: Run every service call under cProfile as well
+        """
+        self.start = time.perf_counter()
+        self.profile = profile
+        self.profiles: List[cProfile.Profile] = []
+        self.spans: Dict[str, List[float]] = {}
+        self.first_service_call: Optional[float] = None
+        self.last_service_end: Optional[float] = None
+        self._lock = threading.Lock()
+    
+    def add(self, name: str, seconds: float) -> None:
+        """Add the duration of one occurrence of a phase"""
+        with self._lock:
+            span = self.spans.get(name)
+            if span is None:
+                self.spans[name] = [seconds, 1]
+            else:
+                span[0] += seconds
+                span[1] += 1
+    
+    def service_call(self, func: Callable[..., Any]) -> Callable[..., Any]:
+        """
+        Wrap a blocking call handed to the worker pool
+        
+        Records how long it queued for a worker (`queue`) and ran (`service`),
+        and profiles it when the trace is profiling.
+        
+        Args:
+            func: Zero-argument callable to run on a worker thread
+            
+        Returns:
+            Wrapped callable
+        """
+        submitted = time.perf_counter()
+        if self.first_service_call is None:
+            self.first_service_call = submitted
+        
+        def run():
+            started = time.perf_counter()
+            self.add("queue", started - submitted)
+            profiler = cProfile.Profile() if self.profile else None
+            try:
+                if profiler is None:
+                    return func()
+                return profiler.runcall(func)
+            finally:
+                ended = time.perf_counter()
+                self.add("service", ended - started)
+                with self._lock:
+                    self.last_service_end = max(ended, self.last_service_end or ended)
+                    if profiler is not None:
+                        self.profiles.append(profiler)
+        
+        return run
+    
+    def finish(self) -> Dict[str, List[float]]:
+        """
+        Close the trace when the response is ready to go out
+        
+        Adds `route` (request start to the first service call: routing,
+        dependencies and parameter validation), `serialize` (after the last
+        service call: response validation and JSON encoding) and `total`.
+        
+        Returns:
+            Phase name -> [seconds, count]
+        """
+        now = time.perf_counter()
+        with self._lock:
+            spans = {name: list(span) for name, span in self.spans.items()}
+            first, last = self.first_service_call, self.last_service_end
+        spans = {"route": [(first or now) - self.start, 1], **spans}
+        if last is not None:
+            spans["serialize"] = [now - last, 1]
+        spans["total"] = [now - self.start, 1]
+        return spans
+    
+    def profile_report(self, loop_profile: Optional[cProfile.Profile] = None, top: int = 40) -> str:
+        """
+        Render the collected profiles as a pstats report
+        
+        Args:
+            loop_profile: Profile of the event-loop thread, if one was taken
+            top: Number of functions to list, by cumulative time
+            
+        Returns:
+            Report text
+        """
+        with self._lock:
+            profiles = ([loop_profile] if loop_profile is not None else []) + self.profiles
+        if not profiles:
+            return "No profile data was collected\n"
+        out = io.StringIO()
+        stats = pstats.Stats(profiles[0], stream=out)
+        for profile in profiles[1:]:
+            stats.add(profile)
+        stats.sort_stats("cumulative").print_stats(top)
+        return out.getvalue()
+
+
+@contextmanager
+def trace_request(profile: bool = False) -> Iterator[Trace]:
+    """
+    Trace the phases of the request handled inside the block
+    
+    Args:
+        profile: Profile service calls made while handling it
+        
+    Yields:
+        The request's Trace
+    """
+    trace = Trace(profile)
+    token = _trace.set(trace)
+    try:
+        yield trace
+    finally:
+        _trace.reset(token)
+
+
+def current_trace() -> Optional[Trace]:
+    """Return the trace of the request being handled, if any"""
+    return _trace.get()
+
+
+def record_span(name: str, seconds: float) -> None:
+    """Add a measured phase duration to the current request's trace"""
+    trace = _trace.get()
+    if trace is not None:
+        trace.add(name, seconds)
+
+
+@contextmanager
+def span(name: str) -> Iterator[None]:
+    """Time the block as a phase of the current request"""
+    trace = _trace.get()
+    if trace is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        trace.add(name, time.perf_counter() - start)
+
+
+def traced(name: str) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """
+    Decorator timing every call of a function as a phase of the current request
+    
+    Outside a traced request the function is called directly.
+    
+    Args:
+        name: Phase name (e.g. convert)
+        
+    Returns:
+        Decorator
+    """
+    def decorator(func: Callable[..., Any]) -> Callable[..., Any]:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            trace = _trace.get()
+            if trace is None:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                trace.add(name, time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+def server_timing(spans: Dict[str, List[float]]) -> str:
+    """
+    Format phase durations as a Server-Timing header value
+    
+    Args:
+        spans: Phase name -> [seconds, count] (see Trace.finish)
+        
+    Returns:
+        Header value, e.g. `upstream;dur=84.2;desc="2 calls", total;dur=91.0`
+    """
+    entries = []
+    for name, (seconds, count) in spans.items():
+        entry = f"{name};dur={seconds * 1000:.1f}"
+        if count > 1:
+            entry += f';desc="{int(count)} calls"'
+        entries.append(entry)
+    return ", ".join(entries)
+
+
+def log_timing(kind: str, name: str, status: Any, spans: Dict[str, List[float]]) -> None:
+    """
+    Write one JSON log line with the phase breakdown of a finished request
+    
+    Only requests slower than TIMING_LOG_MIN_DURATION are logged.
+    
+    Args:
+        kind: What was handled (request or tool)
+        name: Route (e.g. GET /api/v1/stocks/{symbol}/history) or tool name
+        status: HTTP status code or tool outcome
+        spans: Phase name -> [seconds, count] (see Trace.finish)
+    """
+    total = spans["total"][0]
+    if total < settings.TIMING_LOG_MIN_DURATION:
+        return
+    logger.info(json.dumps({
+        'kind': kind,
+        'name': name,
+        'status': status,
+        'duration_ms': round(total * 1000, 1),
+        'phases': {phase: {'ms': round(seconds * 1000, 1), 'count': int(count)} for phase, (seconds, count) in spans.items()},
+    }))
@@ -0,0 +1,182 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import random
+import time
+from typing import Any, Callable, Dict, List, Optional
+from config import settings
+from services.executor import run_blocking
+from services.rate_limit import Priority, priority, scheduler
+from services.stock_service import StockService
+
+logger = logging.getLogger(__name__)
+
+
+class _Job:
+    """One periodic refresh: a blocking call, how often it must run and what it costs upstream"""
+    
+    __slots__ = ("name", "func", "args", "interval", "provider", "cost", "runs", "failures")
+    
+    def __init__(
+        self,
+        name: str,
+        func: Callable[..., Any],
+        args: tuple,
+        interval: float,
+        provider: Optional[str] = None,
+        cost: float = 1.0
+    ):
+        self.name = name
+        self.func = func
+        self.args = args
+        self.interval = interval
+        self.provider = provider
+        self.cost = cost
+        self.runs = 0
+        self.failures = 0
+
+
+class CacheWarmer:
+    """
+    Background scheduler keeping watchlist data warm in the service caches
+    
+    Every job runs a little before its cache entry would expire (at
+    WATCHLIST_REFRESH_AHEAD of the TTL). Jobs run one at a time with at least
+    WATCHLIST_MIN_SPACING seconds between upstream calls, the first round is
+    spread over WATCHLIST_STARTUP_SPREAD seconds and every interval gets a
+    little jitter, so refreshes trickle out instead of bursting into the
+    provider rate limits.
+    
+    Intervals are checked against those limits when the jobs are built: a
+    watchlist needing more than WATCHLIST_BUDGET_SHARE of a provider's rate
+    (or more runs than the spacing allows) is refreshed less often, with a
+    warning, rather than falling further behind every cycle.
+    """
+    
+    def __init__(self, jobs: List[_Job]):
+        self.jobs = jobs
+        self._task: Optional[asyncio.Task] = None
+        self._sequence = itertools.count()
+        self.late = 0.0
+    
+    @classmethod
+    def for_watchlist(cls, crypto_service: Any, watchlist: Optional[List[str]] = None) -> "CacheWarmer":
+        """
+        Build the refresh jobs for a watchlist
+        
+        Entries containing '/' are crypto pairs; anything else is a stock
+        ticker. Stocks share one batched price refresh and each get their
+        fundamentals and daily history refreshed; crypto pairs share one
+        ticker refresh and get their daily candles pulled into the candle store.
+        
+        Args:
+            crypto_service: CryptoService instance whose caches serve requests
+            watchlist: Symbols to keep warm (default: WATCHLIST)
+            
+        Returns:
+            CacheWarmer with one job per data kind (and per symbol where not batched)
+        """
+        watchlist = settings.WATCHLIST if watchlist is None else watchlist
+        ahead = settings.WATCHLIST_REFRESH_AHEAD
+        stocks = list(dict.fromkeys(s.strip().upper() for s in watchlist if s.strip() and '/' not in s))
+        pairs = list(dict.fromkeys(s.strip().upper() for s in watchlist if '/' in s))
+        
+        jobs = []
+        if stocks:
+            # yfinance downloads each ticker separately, so the batch costs one token per symbol
+            jobs.append(_Job("stock_prices", StockService.refresh_prices, (stocks,), settings.STOCK_PRICE_TTL * ahead, "yahoo", len(stocks)))
+        for symbol in stocks:
+            jobs.append(_Job(f"stock_fundamentals:{symbol}", StockService.refresh_fundamentals, (symbol,), settings.STOCK_FUNDAMENTALS_TTL * ahead, "yahoo"))
+            for period in settings.WATCHLIST_HISTORY_PERIODS:
+                jobs.append(_Job(f"stock_history:{symbol}:{period}", StockService.refresh_history, (symbol, period, "1d"), settings.STOCK_HISTORY_TTL * ahead, "yahoo"))
+        
+        if pairs:
+            exchange_id = crypto_service.exchange.id
+            jobs.append(_Job("crypto_tickers", crypto_service.refresh_tickers, (pairs,), settings.CRYPTO_TICKER_TTL * ahead, exchange_id))
+            if settings.CANDLE_STORE_ENABLED:
+                for symbol in pairs:
+                    jobs.append(_Job(f"crypto_history:{symbol}", crypto_service.refresh_history, (symbol, '1d'), settings.WATCHLIST_CANDLE_INTERVAL, exchange_id))
+        
+        _fit_budget(jobs)
+        return cls(jobs)
+    
+    def start(self) -> None:
+        """Start refreshing in the running event loop (no-op for an empty watchlist)"""
+        if self.jobs and self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+    
+    async def stop(self) -> None:
+        """Cancel the scheduler and wait for it to finish"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+    
+    def stats(self) -> Dict[str, Any]:
+        """Return job run, failure and lateness counters"""
+        return {
+            'running': self._task is not None and not self._task.done(),
+            'jobs': len(self.jobs),
+            'runs': sum(job.runs for job in self.jobs),
+            'failures': sum(job.failures for job in self.jobs),
+            'max_late_seconds': round(self.late, 3),
+        }
+    
+    async def _run(self) -> None:
+        # Refreshes only spend the rate-limit budget interactive requests leave over
+        with priority(Priority.PREFETCH):
+            now = time.monotonic()
+            spread = settings.WATCHLIST_STARTUP_SPREAD
+            queue = [
+                (now + spread * i / len(self.jobs), next(self._sequence), job)
+                for i, job in enumerate(self.jobs)
+            ]
+            heapq.heapify(queue)
+            
+            while True:
+                due, _, job = heapq.heappop(queue)
+                delay = due - time.monotonic()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                else:
+                    self.late = max(self.late, -delay)
+                
+                try:
+                    await run_blocking(job.func, *job.args)
+                    job.runs += 1
+                except Exception as e:
+                    job.failures += 1
+                    logger.warning("Cache warm-up %s failed: %s", job.name, e)
+                
+                jitter = random.uniform(-0.1, 0.05) * job.interval
+                heapq.heappush(queue, (time.monotonic() + job.interval + jitter, next(self._sequence), job))
+                await asyncio.sleep(settings.WATCHLIST_MIN_SPACING)
+
+
+def _fit_budget(jobs: List[_Job]) -> None:
+    """Stretch job intervals until they fit the providers' refresh budgets and the run spacing"""
+    for provider in dict.fromkeys(job.provider for job in jobs if job.provider is not None):
+        budget = scheduler.bucket(provider).rate * settings.WATCHLIST_BUDGET_SHARE
+        own = [job for job in jobs if job.provider == provider]
+        demand = sum(job.cost / job.interval for job in own)
+        if budget > 0 and demand > budget:
+            _stretch(own, demand / budget, f"{demand:.2f} {provider} requests/s against a budget of {budget:.2f}/s")
+    
+    spacing = settings.WATCHLIST_MIN_SPACING
+    runs = sum(1 / job.interval for job in jobs)
+    if spacing > 0 and runs * spacing > 1:
+        _stretch(jobs, runs * spacing, f"{runs:.2f} refreshes/s with {spacing}s between them")
+
+
+def _stretch(jobs: List[_Job], factor: float, reason: str) -> None:
+    for job in jobs:
+        job.interval *= factor
+    logger.warning(
+        "Watchlist needs %s; refreshing %d jobs %.1fx less often (%s every %.0fs), so entries may expire between refreshes",
+        reason, len(jobs), factor, jobs[0].name, jobs[0].interval
+    )
@@ -0,0 +1,35 @@
+import time
+import pytest
+
+
+class FakeClock:
+    """Stand-in for the time module whose monotonic clock only moves when told"""
+    
+    def __init__(self, start: float = 1000.0):
+        self.now = start
+    
+    def monotonic(self) -> float:
+        return self.now
+    
+    def advance(self, seconds: float) -> None:
+        self.now += seconds
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def _wait_for(predicate, timeout: float = 2.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.005)
+    return True
+
+
+@pytest.fixture
+def wait_for():
+    """Poll a predicate on the real clock until it holds or a timeout passes"""
+    return _wait_for
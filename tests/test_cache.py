@@ -0,0 +1,113 @@
+import pytest
+import services.cache
+from config import settings
+from services.cache import TTLCache
+from services.resilience import CircuitOpenError, track_staleness
+
+
+@pytest.fixture
+def cache(clock, monkeypatch):
+    monkeypatch.setattr(services.cache, "time", clock)
+    return TTLCache("test", ttl=10, maxsize=3, stale_ttl=5)
+
+
+def test_entry_is_fresh_until_ttl(cache, clock):
+    cache.set("a", 1)
+    clock.advance(9.9)
+    assert cache.get("a") == 1
+    clock.advance(0.1)
+    assert cache.get("a") is None
+    assert cache.stats()['hits'] == 1
+    assert cache.stats()['misses'] == 1
+
+
+def test_set_with_age_shortens_freshness(cache, clock):
+    cache.set("a", 1, age=8)
+    assert cache.get("a") == 1
+    clock.advance(2)
+    assert cache.get("a") is None
+
+
+def test_least_recently_used_entry_is_evicted(cache):
+    for key in "abc":
+        cache.set(key, key)
+    cache.get("a")
+    cache.set("d", "d")
+    assert cache.get("b") is None
+    assert [cache.get(key) for key in "acd"] == ["a", "c", "d"]
+    assert cache.stats()['evictions'] == 1
+
+
+def test_get_or_load_loads_once_while_fresh(cache):
+    calls = []
+    loader = lambda: calls.append(1) or len(calls)
+    assert cache.get_or_load("a", loader) == 1
+    assert cache.get_or_load("a", loader) == 1
+    assert len(calls) == 1
+
+
+def test_stale_entry_is_served_while_refreshed_in_background(cache, clock, wait_for):
+    cache.set("a", "old")
+    clock.advance(12)
+    assert cache.get_or_load("a", lambda: "new") == "old"
+    assert wait_for(lambda: cache.stats()['refreshes'] == 1)
+    assert cache.get("a") == "new"
+    assert cache.stats()['stale_hits'] == 1
+
+
+def test_failed_background_refresh_keeps_stale_value(cache, clock, wait_for):
+    cache.set("a", "old")
+    clock.advance(12)
+    
+    def loader():
+        raise RuntimeError("upstream down")
+    
+    assert cache.get_or_load("a", loader) == "old"
+    assert wait_for(lambda: "a" not in cache._refreshing)
+    assert cache.get_or_load("a", lambda: "unused") == "old"
+
+
+def test_expired_entry_is_loaded_synchronously(cache, clock):
+    cache.set("a", "old")
+    clock.advance(15)
+    assert cache.get_or_load("a", lambda: "new") == "new"
+    assert cache.get("a") == "new"
+
+
+def test_open_circuit_falls_back_to_expired_entry(cache, clock):
+    cache.set("a", "old")
+    clock.advance(100)
+    
+    def loader():
+        raise CircuitOpenError("yahoo", 30)
+    
+    with track_staleness() as stale:
+        assert cache.get_or_load("a", loader) == "old"
+    assert stale == {"test": 100}
+    assert cache.stats()['fallbacks'] == 1
+
+
+def test_open_circuit_without_usable_entry_raises(cache, clock):
+    def loader():
+        raise CircuitOpenError("yahoo", 30)
+    
+    with pytest.raises(CircuitOpenError):
+        cache.get_or_load("missing", loader)
+    
+    cache.set("a", "old")
+    clock.advance(settings.CIRCUIT_STALE_MAX_AGE)
+    with pytest.raises(CircuitOpenError):
+        cache.get_or_load("a", loader)
+
+
+def test_refresh_replaces_entry_regardless_of_age(cache):
+    cache.set("a", "old")
+    assert cache.refresh("a", lambda: "new") == "new"
+    assert cache.get("a") == "new"
+    
+    def loader():
+        raise RuntimeError("upstream down")
+    
+    with pytest.raises(RuntimeError):
+        cache.refresh("a", loader)
+    assert cache.get("a") == "new"
@@ -0,0 +1,150 @@
+import numpy as np
+import pandas as pd
+import pytest
+import requests
+import services.cassette
+from services.cassette import CassetteMiss, CassetteStore, http_key
+
+
+class Upstream:
+    """Provider stand-in answering with a queue of responses (exceptions are raised)"""
+    
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.calls = 0
+    
+    def __call__(self, *args, **kwargs):
+        response = self.responses[min(self.calls, len(self.responses) - 1)]
+        self.calls += 1
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+
+class ProviderQuirk(Exception):
+    """Exception from a module cassettes do not re-create"""
+
+
+def _round_trip(tmp_path, *responses, calls=None, key=None):
+    """Record the responses, then replay the same calls from a fresh store"""
+    calls = calls or [((), {})] * len(responses)
+    options = {} if key is None else {'key': key}
+    recorder = CassetteStore('record', str(tmp_path))
+    record = recorder.wrap("yahoo", "Ticker.history", Upstream(*responses), **options)
+    for args, kwargs in calls:
+        try:
+            record(*args, **kwargs)
+        except Exception:
+            pass
+    player = CassetteStore('replay', str(tmp_path))
+    return recorder, player, player.wrap("yahoo", "Ticker.history", Upstream(AssertionError("called upstream")), **options)
+
+
+def _history(index: pd.DatetimeIndex) -> pd.DataFrame:
+    return pd.DataFrame({
+        'Open': np.linspace(1, 2, len(index)),
+        'Close': [1.5, np.nan, 2.5][:len(index)],
+        'Volume': np.arange(len(index), dtype=np.int64),
+    }, index=index)
+
+
+def test_live_mode_passes_calls_through(tmp_path):
+    upstream = Upstream("ok")
+    assert CassetteStore('live', str(tmp_path)).wrap("yahoo", "Ticker.info", upstream) is upstream
+    with pytest.raises(ValueError):
+        CassetteStore('rewind', str(tmp_path))
+
+
+def test_replay_answers_without_the_provider(tmp_path):
+    info = {'symbol': "AAPL", 'regularMarketPrice': 190.5, 'tags': ["a", None]}
+    calls = [(("AAPL",), {'period': "1mo"}), (("MSFT",), {'period': "1mo"})]
+    recorder, player, replay = _round_trip(tmp_path, info, {'symbol': "MSFT"}, calls=calls)
+    assert recorder.stats()['recorded'] == 2
+    assert replay("AAPL", period="1mo") == info
+    assert replay("MSFT", period="1mo") == {'symbol': "MSFT"}
+    assert player.stats()['replayed'] == 2
+
+
+@pytest.mark.parametrize("index", [
+    pd.date_range("2024-03-08 09:30", periods=3, freq="1h", tz="America/New_York"),
+    pd.date_range("2024-03-08", periods=3, freq="1D", tz="UTC").as_unit('ms'),
+    pd.date_range("2024-03-08", periods=3, freq="1D", name="Date"),
+    pd.Index(["AAPL", "MSFT", "SOFI"], name="Ticker"),
+])
+def test_frames_round_trip(tmp_path, index):
+    frame = _history(index)
+    _, _, replay = _round_trip(tmp_path, frame)
+    pd.testing.assert_frame_equal(replay(), frame, check_freq=False)
+
+
+def test_multiindex_columns_round_trip(tmp_path):
+    index = pd.date_range("2024-03-08", periods=2, freq="1D", tz="America/New_York", name="Date")
+    columns = pd.MultiIndex.from_tuples(
+        [("Close", "AAPL"), ("Close", "MSFT"), ("Volume", "AAPL"), ("Volume", "MSFT")],
+        names=["Price", "Ticker"]
+    )
+    frame = pd.DataFrame([[1.0, 2.0, 10, 20], [1.5, 2.5, 11, 21]], index=index, columns=columns)
+    _, _, replay = _round_trip(tmp_path, frame)
+    pd.testing.assert_frame_equal(replay(), frame, check_freq=False)
+
+
+@pytest.mark.parametrize("error, expected", [
+    (ValueError("No data found"), ValueError),
+    (requests.ConnectionError("unreachable"), requests.ConnectionError),
+    (ProviderQuirk("odd"), RuntimeError),
+])
+def test_errors_are_replayed(tmp_path, error, expected):
+    _, _, replay = _round_trip(tmp_path, error)
+    with pytest.raises(expected) as raised:
+        replay()
+    assert type(raised.value) is expected
+    assert str(error) in str(raised.value)
+
+
+def test_repeated_calls_replay_in_recorded_order(tmp_path):
+    _, _, replay = _round_trip(tmp_path, 1, 2, 3)
+    assert [replay() for _ in range(5)] == [1, 2, 3, 3, 3]
+
+
+def test_replayed_values_are_not_shared(tmp_path):
+    _, _, replay = _round_trip(tmp_path, {'bids': [[1, 2]]})
+    replay()['bids'].clear()
+    assert replay() == {'bids': [[1, 2]]}
+
+
+def test_unrecorded_call_misses(tmp_path):
+    _, player, replay = _round_trip(tmp_path, "ok", calls=[(("AAPL",), {})])
+    with pytest.raises(CassetteMiss):
+        replay("MSFT")
+    assert player.stats()['misses'] == 1
+
+
+def test_http_calls_match_without_volatile_parameters(tmp_path):
+    recorded = (("https://api.example.com/klines?symbol=BTCUSDT&timestamp=1&signature=abc", "GET", {}, None), {})
+    _, player, replay = _round_trip(tmp_path, [[1, 2]], calls=[recorded], key=http_key)
+    assert replay("https://api.example.com/klines?symbol=BTCUSDT&timestamp=2&signature=def", "GET", {}, None) == [[1, 2]]
+    assert player.stats()['loose_hits'] == 1
+    with pytest.raises(CassetteMiss):
+        replay("https://api.example.com/klines?symbol=ETHUSDT&timestamp=2", "GET", {}, None)
+
+
+def _window(today: pd.Timestamp, days: int) -> dict:
+    """Ticker.history arguments for the last `days` days up to and including today"""
+    return {
+        'start': (today - pd.Timedelta(days=days)).strftime("%Y-%m-%d"),
+        'end': (today + pd.Timedelta(days=1)).strftime("%Y-%m-%d"),
+        'interval': "1d",
+    }
+
+
+def test_date_ranges_replay_on_a_later_day(tmp_path, monkeypatch):
+    recorded_on = pd.Timestamp("2026-03-02")
+    monkeypatch.setattr(services.cassette, "_today", lambda: recorded_on)
+    _, player, replay = _round_trip(tmp_path, "page", calls=[(("AAPL",), _window(recorded_on, 30))])
+    
+    replayed_on = recorded_on + pd.Timedelta(days=3)
+    monkeypatch.setattr(services.cassette, "_today", lambda: replayed_on)
+    assert replay("AAPL", **_window(replayed_on, 30)) == "page"
+    assert player.stats()['loose_hits'] == 1
+    with pytest.raises(CassetteMiss):
+        replay("AAPL", **_window(replayed_on, 60))
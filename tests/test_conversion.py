@@ -0,0 +1,36 @@
+import numpy as np
+import pandas as pd
+from models.common import DataPoint
+from services.conversion import candles_to_columns, columns_to_data_points, frame_to_columns
+
+
+def _validated(columns, timestamps):
+    return [
+        DataPoint(timestamp=ts, open=o, high=h, low=l, close=c, volume=v)
+        for ts, o, h, l, c, v in zip(timestamps, *(columns[key].tolist() for key in 'ohlcv'))
+    ]
+
+
+def test_stock_rows_match_validated_models():
+    index = pd.date_range("2024-03-08 09:30", periods=4, freq="1h", tz="America/New_York")
+    frame = pd.DataFrame({
+        'Open': [1.0, 2.0, np.nan, 4.0],
+        'High': [1.5, 2.5, 3.5, 4.5],
+        'Low': [0.5, 1.5, 2.5, 3.5],
+        'Close': [1.2, 2.2, 3.2, 4.2],
+        'Volume': [100, 200, 0, 400],
+    }, index=index)
+    columns = frame_to_columns(frame)
+    points = columns_to_data_points(columns, frame.index.to_pydatetime())
+    expected = _validated(columns, frame.index.to_pydatetime())
+    assert [p.model_dump_json() for p in points] == [p.model_dump_json() for p in expected]
+    assert all(type(p.volume) is float for p in points)
+
+
+def test_crypto_rows_match_validated_models():
+    candles = [[1_700_000_000_000 + i * 60_000, 1, 2, 0.5, 1.5, 10 + i] for i in range(5)]
+    columns = candles_to_columns(candles)
+    points = columns_to_data_points(columns)
+    expected = _validated(columns, [p.timestamp for p in points])
+    assert [p.model_dump() for p in points] == [p.model_dump() for p in expected]
+    assert points[0].timestamp.timestamp() * 1000 == candles[0][0]
@@ -0,0 +1,74 @@
+from datetime import datetime, timezone
+import pytest
+from services.crypto_service import CryptoService
+from services.rate_limit import Priority, current_priority
+
+STEP = 60_000
+NOW = 1_700_000_040_000 // STEP * STEP
+
+
+class CappedOHLCV:
+    """fetch_ohlcv stand-in returning at most `cap` one-minute candles per call, like OKX"""
+    
+    def __init__(self, cap: int):
+        self.cap = cap
+        self.calls = 0
+    
+    def __call__(self, symbol, timeframe="1m", since=None, limit=None, params=None):
+        self.calls += 1
+        limit = min(limit or 100, self.cap)
+        start = NOW - (limit - 1) * STEP if since is None else -(-since // STEP) * STEP
+        count = max(0, min(limit, (NOW - start) // STEP + 1))
+        return [[start + i * STEP, 1.0, 1.0, 1.0, 1.0, 1.0] for i in range(count)]
+
+
+@pytest.fixture
+def okx(monkeypatch):
+    service = CryptoService("okx")
+    service._store = None
+    upstream = CappedOHLCV(300)
+    monkeypatch.setattr(service.exchange, "fetch_ohlcv", upstream)
+    monkeypatch.setattr(service.exchange, "milliseconds", lambda: NOW)
+    return service, upstream
+
+
+def _assert_contiguous(candles, first, count):
+    assert [c[0] for c in candles] == [first + i * STEP for i in range(count)]
+
+
+def test_pages_follow_the_exchange_limit(okx):
+    service, upstream = okx
+    assert service._ohlcv_page_size() == 300
+    start = NOW - 2500 * STEP
+    candles = [c for page in service.iter_history_range("BTC/USDT", "1m", start) for c in page]
+    _assert_contiguous(candles, start, 2501)
+    assert upstream.calls == 9
+
+
+def test_latest_candles_beyond_one_call_are_paged(okx):
+    service, _ = okx
+    _assert_contiguous(service._load_candles("BTC/USDT", "1m", 800), NOW - 799 * STEP, 800)
+
+
+def test_short_series_stops_paging(okx):
+    service, upstream = okx
+    candles = service._fetch_range("BTC/USDT", "1m", NOW - 99 * STEP, 1000, STEP)
+    _assert_contiguous(candles, NOW - 99 * STEP, 100)
+    assert upstream.calls == 1
+
+
+def test_only_explicit_ranges_are_demoted(okx, monkeypatch):
+    service, upstream = okx
+    levels = []
+    
+    def record(*args, **kwargs):
+        levels.append(current_priority())
+        return upstream(*args, **kwargs)
+    
+    monkeypatch.setattr(service.exchange, "fetch_ohlcv", record)
+    service._get_candles("BTC/USDT", "5m", 50, None, None)
+    assert set(levels) == {Priority.INTERACTIVE}
+    
+    levels.clear()
+    service._get_candles("BTC/USDT", "1m", 50, datetime.fromtimestamp((NOW - 600 * STEP) / 1000, timezone.utc), None)
+    assert set(levels) == {Priority.BATCH}
@@ -0,0 +1,44 @@
+import pytest
+import services.cache
+from config import settings
+from services.crypto_service import CryptoService
+
+
+def _ticker(symbol, last):
+    return {'symbol': symbol, 'last': last, 'close': last, 'percentage': 1.0, 'change': 1.0}
+
+
+@pytest.fixture
+def service(clock, monkeypatch):
+    monkeypatch.setattr(services.cache, "time", clock)
+    service = CryptoService("okx")
+    calls = []
+    
+    def fetch_ticker(symbol, params=None):
+        calls.append(symbol)
+        return _ticker(symbol, 101.0)
+    
+    monkeypatch.setattr(service.exchange, "fetch_ticker", fetch_ticker)
+    monkeypatch.setattr(service.exchange, "fetch_tickers", lambda symbols=None, params=None: {"BTC/USDT": _ticker("BTC/USDT", 100.0)})
+    return service, calls
+
+
+def test_warmed_snapshot_answers_without_upstream_call(service, clock):
+    service, calls = service
+    service.refresh_tickers(["BTC/USDT"])
+    assert service.get_crypto_data("BTC/USDT").price == 100.0
+    assert calls == []
+    
+    clock.advance(settings.CRYPTO_TICKER_TTL)
+    assert service.get_crypto_data("BTC/USDT").price == 101.0
+    assert calls == ["BTC/USDT"]
+
+
+def test_fetched_ticker_is_reused_within_ttl(service, clock):
+    service, calls = service
+    service.get_crypto_data("ETH/USDT")
+    service.get_crypto_data("ETH/USDT")
+    assert calls == ["ETH/USDT"]
+    clock.advance(settings.CRYPTO_TICKER_TTL)
+    service.get_crypto_data("ETH/USDT")
+    assert calls == ["ETH/USDT", "ETH/USDT"]
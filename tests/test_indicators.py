@@ -0,0 +1,167 @@
+import numpy as np
+import pandas as pd
+import pytest
+from config import settings
+from models.common import IndicatorParams
+from services.indicators import IndicatorEngine, IndicatorState
+
+PARAMS = IndicatorParams()
+
+
+@pytest.fixture
+def columns():
+    rng = np.random.default_rng(7)
+    n = 500
+    close = 100 + rng.normal(0, 1, n).cumsum()
+    t = pd.date_range("2024-03-01", periods=n, freq="15min", tz="UTC").as_unit('ms').asi8
+    return {
+        't': t,
+        'o': close + rng.normal(0, 0.3, n),
+        'h': close + rng.random(n),
+        'l': close - rng.random(n),
+        'c': close,
+        'v': rng.integers(1, 1000, n).astype(float),
+    }
+
+
+def _reference(columns: dict, p: IndicatorParams) -> dict:
+    """Textbook indicator definitions written directly against pandas"""
+    close = pd.Series(columns['c'])
+    
+    def ema(series, span):
+        return series.ewm(span=span, adjust=False).mean()
+    
+    def blank(series, count):
+        series = series.copy()
+        series.iloc[:count] = np.nan
+        return series
+    
+    change = close.diff().fillna(0)
+    gain = change.clip(lower=0).ewm(alpha=1 / p.rsi_period, adjust=False).mean()
+    loss = (-change).clip(lower=0).ewm(alpha=1 / p.rsi_period, adjust=False).mean()
+    rsi = (100 - 100 / (1 + gain / loss)).where(loss != 0, 100.0)
+    
+    macd = ema(close, p.macd_fast) - ema(close, p.macd_slow)
+    signal = ema(macd, p.macd_signal)
+    
+    middle = close.rolling(p.bb_period).mean()
+    std = close.rolling(p.bb_period).std(ddof=0)
+    
+    frame = pd.DataFrame({
+        'day': pd.to_datetime(columns['t'], unit='ms').date,
+        'pv': (columns['h'] + columns['l'] + columns['c']) / 3 * columns['v'],
+        'v': columns['v'],
+    })
+    sums = frame.groupby('day')[['pv', 'v']].cumsum()
+    
+    result = {
+        'sma': close.rolling(p.sma_period).mean(),
+        'ema': blank(ema(close, p.ema_period), p.ema_period - 1),
+        'rsi': blank(rsi, p.rsi_period),
+        'macd': blank(macd, p.macd_slow - 1),
+        'macd_signal': blank(signal, p.macd_slow + p.macd_signal - 2),
+        'bb_middle': middle,
+        'bb_upper': middle + p.bb_std * std,
+        'bb_lower': middle - p.bb_std * std,
+        'vwap': sums['pv'] / sums['v'],
+    }
+    result['macd_hist'] = result['macd'] - result['macd_signal']
+    return {name: series.to_numpy() for name, series in result.items()}
+
+
+def _head(columns: dict, stop: int, start: int = 0) -> dict:
+    return {key: values[start:stop] for key, values in columns.items()}
+
+
+def _assert_same(actual: dict, expected: dict) -> None:
+    assert set(actual) == set(expected)
+    for name in expected:
+        np.testing.assert_allclose(actual[name], expected[name], rtol=1e-9, atol=1e-9, err_msg=name)
+
+
+def test_matches_pandas_reference(columns):
+    _assert_same(IndicatorEngine().compute("s", columns, PARAMS), _reference(columns, PARAMS))
+
+
+def test_custom_periods_match_pandas_reference(columns):
+    params = IndicatorParams(sma_period=5, ema_period=9, rsi_period=7, macd_fast=5, macd_slow=13, macd_signal=4, bb_period=10, bb_std=1.5)
+    _assert_same(IndicatorEngine().compute("s", columns, params), _reference(columns, params))
+
+
+def test_selection_limits_output(columns):
+    params = IndicatorParams(indicators="sma,rsi")
+    assert set(IndicatorEngine().compute("s", columns, params)) == {"sma", "rsi"}
+
+
+def test_chunked_state_matches_single_pass(columns):
+    whole = IndicatorState(PARAMS).advance(columns)
+    state = IndicatorState(PARAMS)
+    parts = [state.advance(_head(columns, stop, start)) for start, stop in ((0, 7), (7, 180), (180, 181), (181, 500))]
+    _assert_same({name: np.concatenate([part[name] for part in parts]) for name in whole}, whole)
+
+
+def test_incremental_update_matches_full_computation(columns):
+    engine = IndicatorEngine()
+    engine.compute("s", _head(columns, 400), PARAMS)
+    result = engine.compute("s", columns, PARAMS)
+    assert engine.stats()['incremental'] == 1
+    _assert_same(result, _reference(columns, PARAMS))
+
+
+def test_forming_candle_is_not_committed(columns):
+    engine = IndicatorEngine()
+    revised = {key: values.copy() for key, values in _head(columns, 400).items()}
+    revised['c'][-1] += 5
+    engine.compute("s", revised, PARAMS)
+    _assert_same(engine.compute("s", columns, PARAMS), _reference(columns, PARAMS))
+    assert engine.stats()['incremental'] == 1
+
+
+def test_sliding_window_is_incremental(columns):
+    engine = IndicatorEngine()
+    for shift in range(4):
+        window = _head(columns, 400 + shift, start=shift)
+        result = engine.compute("s", window, PARAMS)
+        expected = _reference(_head(columns, 400 + shift), PARAMS)
+        _assert_same(result, {name: values[shift:] for name, values in expected.items()})
+    assert (engine.stats()['full'], engine.stats()['incremental']) == (1, 3)
+
+
+def test_rolling_indicators_match_a_fresh_window(columns):
+    engine = IndicatorEngine()
+    engine.compute("s", _head(columns, 400), PARAMS)
+    window = _head(columns, 450, start=100)
+    result = engine.compute("s", window, PARAMS)
+    fresh = _reference(window, PARAMS)
+    for name in ("sma", "bb_middle", "bb_upper", "bb_lower"):
+        np.testing.assert_allclose(result[name][PARAMS.bb_period:], fresh[name][PARAMS.bb_period:], rtol=1e-9)
+
+
+def test_window_outside_cached_series_is_recomputed(columns):
+    engine = IndicatorEngine()
+    engine.compute("s", _head(columns, 500, start=200), PARAMS)
+    for window in (_head(columns, 500, start=100), _head(columns, 300, start=200)):
+        _assert_same(engine.compute("s", window, PARAMS), _reference(window, PARAMS))
+    assert engine.stats()['incremental'] == 0
+
+
+def test_cached_series_is_bounded(columns, monkeypatch):
+    monkeypatch.setattr(settings, "INDICATOR_MAX_POINTS", 150)
+    engine = IndicatorEngine()
+    engine.compute("s", _head(columns, 100), PARAMS)
+    for stop in range(101, 500, 50):
+        result = engine.compute("s", _head(columns, stop, start=stop - 100), PARAMS)
+        expected = _reference(_head(columns, stop), PARAMS)
+    entry = engine._entries.get(("s", PARAMS))
+    assert len(entry.t) == 150
+    assert engine.stats()['full'] == 1
+    _assert_same(result, {name: values[-100:] for name, values in expected.items()})
+
+
+def test_rewritten_history_forces_recompute(columns):
+    engine = IndicatorEngine()
+    engine.compute("s", _head(columns, 400), PARAMS)
+    adjusted = {key: values.copy() for key, values in columns.items()}
+    adjusted['c'][:100] *= 0.5
+    _assert_same(engine.compute("s", adjusted, PARAMS), _reference(adjusted, PARAMS))
+    assert engine.stats()['full'] == 2
@@ -0,0 +1,109 @@
+import threading
+import time
+import pytest
+import services.rate_limit
+from services.rate_limit import Priority, TokenBucket, bind_priority, current_priority, priority
+
+
+def _queue(bucket, levels, wait_for):
+    """Queue one waiter per level on an empty bucket, in the given arrival order"""
+    served = []
+    threads = []
+    
+    def acquire(level):
+        bucket.acquire(level=level)
+        served.append(level)
+    
+    for count, level in enumerate(levels, 1):
+        thread = threading.Thread(target=acquire, args=(level,))
+        thread.start()
+        threads.append(thread)
+        assert wait_for(lambda: bucket.stats()['queue_depth'] == count)
+    return served, threads
+
+
+def test_waiters_are_served_by_priority_then_arrival(wait_for):
+    bucket = TokenBucket("test", rate=10, burst=1)
+    bucket.acquire()
+    levels = [Priority.PREFETCH, Priority.BATCH, Priority.PREFETCH, Priority.INTERACTIVE, Priority.BATCH]
+    served, threads = _queue(bucket, levels, wait_for)
+    for thread in threads:
+        thread.join(5)
+    assert served == sorted(levels)
+    assert bucket.stats()['priorities']['prefetch']['acquired'] == 2
+
+
+def test_later_interactive_call_overtakes_queued_prefetch(wait_for):
+    bucket = TokenBucket("test", rate=5, burst=1)
+    bucket.acquire()
+    served, threads = _queue(bucket, [Priority.PREFETCH], wait_for)
+    bucket.acquire(level=Priority.INTERACTIVE)
+    served.append(Priority.INTERACTIVE)
+    threads[0].join(5)
+    assert served == [Priority.INTERACTIVE, Priority.PREFETCH]
+
+
+def test_tokens_refill_at_rate_up_to_burst(clock, monkeypatch):
+    monkeypatch.setattr(services.rate_limit, "time", clock)
+    bucket = TokenBucket("test", rate=2, burst=4)
+    for _ in range(4):
+        assert bucket.acquire() == 0
+    assert bucket.stats()['tokens'] == 0
+    clock.advance(1)
+    assert bucket.stats()['tokens'] == 2
+    clock.advance(10)
+    assert bucket.stats()['tokens'] == 4
+
+
+def test_acquire_waits_for_the_rate():
+    bucket = TokenBucket("test", rate=50, burst=1)
+    start = time.monotonic()
+    for _ in range(6):
+        bucket.acquire()
+    assert time.monotonic() - start == pytest.approx(0.1, abs=0.05)
+
+
+def test_cost_above_burst_is_taken_in_parts(wait_for):
+    bucket = TokenBucket("test", rate=20, burst=2)
+    done = {}
+    
+    def batch():
+        bucket.acquire(cost=8, level=Priority.BATCH)
+        done['batch'] = time.monotonic()
+    
+    thread = threading.Thread(target=batch)
+    thread.start()
+    assert wait_for(lambda: bucket.stats()['queue_depth'] == 1)
+    waited = bucket.acquire(level=Priority.INTERACTIVE)
+    done['interactive'] = time.monotonic()
+    thread.join(5)
+    
+    # The interactive call gets the next token instead of waiting out the batch
+    assert waited < 0.15
+    assert done['interactive'] < done['batch']
+    assert bucket.stats()['tokens'] >= 0
+
+
+def test_zero_rate_never_waits():
+    bucket = TokenBucket("test", rate=0, burst=1)
+    assert sum(bucket.acquire() for _ in range(100)) < 0.01
+
+
+def test_priority_blocks_only_lower_priority():
+    assert current_priority() == Priority.INTERACTIVE
+    with priority(Priority.PREFETCH):
+        with priority(Priority.INTERACTIVE):
+            assert current_priority() == Priority.PREFETCH
+        with priority(Priority.BATCH):
+            assert current_priority() == Priority.PREFETCH
+    assert current_priority() == Priority.INTERACTIVE
+
+
+def test_bind_priority_carries_level_to_another_thread():
+    seen = []
+    with priority(Priority.BATCH):
+        func = bind_priority(lambda: seen.append(current_priority()))
+    thread = threading.Thread(target=func)
+    thread.start()
+    thread.join(5)
+    assert seen == [Priority.BATCH]
@@ -0,0 +1,105 @@
+import numpy as np
+import pandas as pd
+import pytest
+from services.resample import DAY_MS, WEEK_OFFSET_MS, resample_calendar, resample_fixed, resample_sessions
+
+_AGG = {'o': 'first', 'h': 'max', 'l': 'min', 'c': 'last', 'v': 'sum'}
+
+
+def _candles(index: pd.DatetimeIndex, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 100 + rng.normal(0, 1, len(index)).cumsum()
+    frame = pd.DataFrame({
+        'o': close + rng.normal(0, 0.5, len(index)),
+        'c': close,
+        'v': rng.integers(1, 1000, len(index)).astype(float),
+    }, index=index)
+    frame['h'] = frame[['o', 'c']].max(axis=1) + rng.random(len(index))
+    frame['l'] = frame[['o', 'c']].min(axis=1) - rng.random(len(index))
+    return frame
+
+
+def _columns(frame: pd.DataFrame) -> dict:
+    columns = {key: frame[key].to_numpy() for key in 'ohlcv'}
+    columns['t'] = frame.index.as_unit('ms').asi8
+    return columns
+
+
+def _wall_ms(frame: pd.DataFrame) -> np.ndarray:
+    return frame.index.tz_localize(None).as_unit('ms').asi8
+
+
+def _assert_bars(bars: dict, expected: pd.DataFrame) -> None:
+    expected = expected.dropna(subset=['o'])
+    np.testing.assert_array_equal(bars['t'], expected.index.as_unit('ms').asi8)
+    for key in 'ohlcv':
+        np.testing.assert_allclose(bars[key], expected[key].to_numpy())
+
+
+def test_fixed_buckets_match_pandas():
+    frame = _candles(pd.date_range("2024-03-01", periods=600, freq="1min", tz="UTC"))
+    expected = frame.resample("15min", origin="epoch").agg(_AGG)
+    _assert_bars(resample_fixed(_columns(frame), 15 * 60 * 1000), expected)
+
+
+def test_weekly_buckets_open_on_monday():
+    frame = _candles(pd.date_range("2024-01-01", periods=60, freq="1D", tz="UTC"))
+    bars = resample_fixed(_columns(frame), 7 * DAY_MS, WEEK_OFFSET_MS)
+    expected = frame.resample("W-MON", label="left", closed="left").agg(_AGG)
+    _assert_bars(bars, expected)
+    assert (pd.to_datetime(bars['t'], unit='ms').dayofweek == 0).all()
+
+
+def test_partial_head_is_dropped_and_partial_tail_kept():
+    frame = _candles(pd.date_range("2024-03-01 00:07", "2024-03-01 00:52", freq="1min", tz="UTC"))
+    bars = resample_fixed(_columns(frame), 15 * 60 * 1000)
+    assert list(pd.to_datetime(bars['t'], unit='ms').strftime("%H:%M")) == ["00:15", "00:30", "00:45"]
+    
+    kept = resample_fixed(_columns(frame), 15 * 60 * 1000, drop_partial_head=False)
+    assert len(kept['t']) == 4
+
+
+def test_rows_without_prices_are_skipped():
+    frame = _candles(pd.date_range("2024-03-01", periods=30, freq="1min", tz="UTC"))
+    frame.iloc[3:5, frame.columns.get_loc('o')] = np.nan
+    frame.iloc[20, frame.columns.get_loc('c')] = np.nan
+    expected = frame.dropna(subset=['o', 'c']).resample("10min", origin="epoch").agg(_AGG)
+    _assert_bars(resample_fixed(_columns(frame), 10 * 60 * 1000), expected)
+
+
+def test_sessions_bucket_from_the_open():
+    days = pd.bdate_range("2024-03-07", periods=4)
+    index = pd.DatetimeIndex([
+        day + pd.Timedelta(hours=9, minutes=30) + pd.Timedelta(minutes=30 * i)
+        for day in days for i in range(13)
+    ]).tz_localize("America/New_York")
+    frame = _candles(index)
+    
+    bars = resample_sessions(_columns(frame), _wall_ms(frame), 60 * 60 * 1000)
+    
+    expected = pd.concat(
+        session.resample("1h", origin="start").agg(_AGG)
+        for _, session in frame.groupby(frame.index.date)
+    )
+    _assert_bars(bars, expected)
+    assert set(pd.to_datetime(bars['t'], unit='ms', utc=True).tz_convert("America/New_York").minute) == {30}
+
+
+@pytest.mark.parametrize("unit, rule", [('W', "W-MON"), ('M', "MS")])
+def test_calendar_buckets_match_pandas(unit, rule):
+    frame = _candles(pd.bdate_range("2024-01-02", "2024-06-28").tz_localize("America/New_York"))
+    bars = resample_calendar(_columns(frame), _wall_ms(frame), unit)
+    expected = frame.resample(rule, label="left", closed="left").agg(_AGG)
+    _assert_bars(bars, expected)
+
+
+def test_calendar_rejects_unknown_unit():
+    frame = _candles(pd.bdate_range("2024-01-02", periods=5, tz="UTC"))
+    with pytest.raises(ValueError):
+        resample_calendar(_columns(frame), _wall_ms(frame), 'Q')
+
+
+def test_empty_input_gives_empty_bars():
+    frame = _candles(pd.DatetimeIndex([], tz="UTC"))
+    assert all(len(values) == 0 for values in resample_fixed(_columns(frame), DAY_MS).values())
+    assert all(len(values) == 0 for values in resample_sessions(_columns(frame), _wall_ms(frame), DAY_MS).values())
@@ -0,0 +1,195 @@
+import time
+import pytest
+import requests
+from yfinance.exceptions import YFRateLimitError
+import services.resilience
+from config import settings
+from services.resilience import CircuitOpenError, UpstreamGuard, mark_stale, track_staleness
+from services.stock_service import _is_yahoo_failure
+
+
+class FlakyUpstream:
+    """Callable that fails with the given error while `failing` is set"""
+    
+    def __init__(self, error: Exception = ConnectionError("connection reset")):
+        self.error = error
+        self.failing = True
+        self.calls = 0
+    
+    def __call__(self):
+        self.calls += 1
+        if self.failing:
+            raise self.error
+        return "ok"
+
+
+@pytest.fixture
+def guard(clock, monkeypatch):
+    monkeypatch.setattr(services.resilience, "time", clock)
+    monkeypatch.setattr(settings, "CIRCUIT_FAILURE_THRESHOLD", 3)
+    monkeypatch.setattr(settings, "CIRCUIT_RESET_TIMEOUT", 30.0)
+    monkeypatch.setattr(settings, "CIRCUIT_SLOW_CALL_SECONDS", 5.0)
+    return UpstreamGuard("test", is_failure=lambda e: not isinstance(e, ValueError))
+
+
+def _trip(guard, upstream):
+    for _ in range(settings.CIRCUIT_FAILURE_THRESHOLD):
+        with pytest.raises(ConnectionError):
+            guard.call(upstream)
+
+
+def test_circuit_opens_after_consecutive_failures(guard):
+    upstream = FlakyUpstream()
+    _trip(guard, upstream)
+    assert guard.stats()['state'] == "open"
+    
+    with pytest.raises(CircuitOpenError) as raised:
+        guard.call(upstream)
+    assert upstream.calls == 3
+    assert raised.value.provider == "test"
+    assert raised.value.retry_after == 30
+    assert guard.stats()['rejected'] == 1
+
+
+def test_success_resets_the_failure_count(guard):
+    upstream = FlakyUpstream()
+    for _ in range(3):
+        upstream.failing = True
+        for _ in range(2):
+            with pytest.raises(ConnectionError):
+                guard.call(upstream)
+        upstream.failing = False
+        assert guard.call(upstream) == "ok"
+    assert guard.stats()['state'] == "closed"
+
+
+def test_rejections_report_remaining_time(guard, clock):
+    _trip(guard, FlakyUpstream())
+    clock.advance(20)
+    with pytest.raises(CircuitOpenError) as raised:
+        guard.call(FlakyUpstream())
+    assert raised.value.retry_after == pytest.approx(10)
+
+
+def test_single_probe_after_reset_timeout_closes_on_success(guard, clock):
+    upstream = FlakyUpstream()
+    _trip(guard, upstream)
+    clock.advance(30)
+    
+    def probe():
+        # Concurrent calls are still rejected while the probe is in flight
+        assert guard.stats()['state'] == "half_open"
+        with pytest.raises(CircuitOpenError):
+            guard.call(upstream)
+        return "ok"
+    
+    assert guard.call(probe) == "ok"
+    assert guard.stats()['state'] == "closed"
+    assert upstream.calls == 3
+
+
+def test_failed_probe_reopens_at_once(guard, clock):
+    upstream = FlakyUpstream()
+    _trip(guard, upstream)
+    clock.advance(30)
+    with pytest.raises(ConnectionError):
+        guard.call(upstream)
+    stats = guard.stats()
+    assert (stats['state'], stats['opened']) == ("open", 2)
+    
+    clock.advance(29)
+    with pytest.raises(CircuitOpenError):
+        guard.call(upstream)
+    clock.advance(1)
+    upstream.failing = False
+    assert guard.call(upstream) == "ok"
+    assert guard.stats()['state'] == "closed"
+
+
+def test_slow_calls_count_as_failures(guard, clock):
+    def slow():
+        clock.advance(settings.CIRCUIT_SLOW_CALL_SECONDS)
+        return "late"
+    
+    for _ in range(3):
+        assert guard.call(slow) == "late"
+    assert guard.stats()['state'] == "open"
+
+
+def test_client_errors_do_not_count(guard):
+    upstream = FlakyUpstream(ValueError("No data found for symbol"))
+    for _ in range(10):
+        with pytest.raises(ValueError):
+            guard.call(upstream)
+    assert guard.stats()['state'] == "closed"
+    assert guard.stats()['failures'] == 0
+
+
+def test_hedge_starts_after_recent_p95(monkeypatch):
+    monkeypatch.setattr(settings, "HEDGE_ENABLED", True)
+    monkeypatch.setattr(settings, "HEDGE_MIN_SAMPLES", 5)
+    monkeypatch.setattr(settings, "HEDGE_MIN_DELAY", 0.02)
+    guard = UpstreamGuard("test")
+    for _ in range(5):
+        guard.call(lambda: None, hedge=True)
+    assert guard.stats()['hedges'] == 0
+    
+    attempts = []
+    
+    def read():
+        attempts.append(time.monotonic())
+        if len(attempts) == 1:
+            time.sleep(0.5)
+            return "first"
+        return "second"
+    
+    start = time.monotonic()
+    assert guard.call(read, hedge=True) == "second"
+    assert time.monotonic() - start < 0.3
+    assert attempts[1] - attempts[0] >= 0.02
+    assert (guard.stats()['hedges'], guard.stats()['hedge_wins']) == (1, 1)
+
+
+def test_no_hedge_without_enough_samples_or_when_disabled(monkeypatch):
+    monkeypatch.setattr(settings, "HEDGE_ENABLED", True)
+    monkeypatch.setattr(settings, "HEDGE_MIN_SAMPLES", 50)
+    guard = UpstreamGuard("test")
+    for _ in range(10):
+        guard.call(lambda: None, hedge=True)
+    guard.call(time.sleep, 0.05, hedge=True)
+    guard.call(time.sleep, 0.05)
+    assert guard.stats()['hedges'] == 0
+
+
+def test_stale_sources_are_tracked_per_request():
+    mark_stale("ignored", 5)
+    with track_staleness() as stale:
+        mark_stale("quotes", 5)
+        mark_stale("quotes", 12)
+        mark_stale("quotes", 3)
+        mark_stale("history", 1)
+    assert stale == {"quotes": 12, "history": 1}
+    with track_staleness() as stale:
+        pass
+    assert stale == {}
+
+
+def _http_error(status):
+    response = requests.Response()
+    response.status_code = status
+    return requests.HTTPError(f"{status}", response=response)
+
+
+@pytest.mark.parametrize("error, expected", [
+    (ConnectionError("reset"), True),
+    (TimeoutError("timed out"), True),
+    (requests.ConnectionError("unreachable"), True),
+    (_http_error(429), True),
+    (_http_error(503), True),
+    (_http_error(404), False),
+    (ValueError("No data found for symbol"), False),
+    (KeyError("regularMarketPrice"), False),
+    (YFRateLimitError(), True),
+])
+def test_yahoo_failure_predicate(error, expected):
+    assert _is_yahoo_failure(error) is expected
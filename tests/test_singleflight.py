@@ -0,0 +1,103 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from services.singleflight import SingleFlight, coalesce, group
+
+
+def _run_concurrently(flight, key, func, callers, wait_for):
+    """Start callers on key and return their futures once all but the leader wait"""
+    pool = ThreadPoolExecutor(max_workers=callers)
+    futures = [pool.submit(flight.do, key, func) for _ in range(callers)]
+    assert wait_for(lambda: flight.stats()['shared'] == callers - 1)
+    pool.shutdown(wait=False)
+    return futures
+
+
+def test_concurrent_calls_share_one_execution(wait_for):
+    flight = SingleFlight()
+    release = threading.Event()
+    calls = []
+    
+    def fetch():
+        calls.append(1)
+        release.wait(2)
+        return object()
+    
+    futures = _run_concurrently(flight, "AAPL", fetch, 8, wait_for)
+    release.set()
+    results = [future.result(2) for future in futures]
+    assert len(calls) == 1
+    assert all(result is results[0] for result in results)
+    assert flight.stats() == {'in_flight': 0, 'executed': 1, 'shared': 7}
+
+
+def test_error_is_shared_with_every_waiter(wait_for):
+    flight = SingleFlight()
+    release = threading.Event()
+    
+    def fetch():
+        release.wait(2)
+        raise ValueError("No data found")
+    
+    futures = _run_concurrently(flight, "AAPL", fetch, 4, wait_for)
+    release.set()
+    for future in futures:
+        with pytest.raises(ValueError, match="No data found"):
+            future.result(2)
+    assert flight.stats()['executed'] == 1
+
+
+def test_key_is_released_after_the_call():
+    flight = SingleFlight()
+    assert flight.do("AAPL", lambda: 1) == 1
+    assert flight.do("AAPL", lambda: 2) == 2
+    
+    def fail():
+        raise RuntimeError("upstream down")
+    
+    with pytest.raises(RuntimeError):
+        flight.do("AAPL", fail)
+    assert flight.do("AAPL", lambda: 3) == 3
+    assert flight.stats() == {'in_flight': 0, 'executed': 4, 'shared': 0}
+
+
+def test_different_keys_run_independently(wait_for):
+    flight = SingleFlight()
+    release = threading.Event()
+    started = []
+    
+    def fetch(symbol):
+        started.append(symbol)
+        release.wait(2)
+        return symbol
+    
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        futures = [pool.submit(flight.do, symbol, fetch, symbol) for symbol in ("AAPL", "MSFT")]
+        assert wait_for(lambda: len(started) == 2)
+        release.set()
+        assert [future.result(2) for future in futures] == ["AAPL", "MSFT"]
+    assert flight.stats()['shared'] == 0
+
+
+def test_coalesce_keys_on_arguments(wait_for):
+    release = threading.Event()
+    calls = []
+    shared = group.stats()['shared']
+    
+    @coalesce
+    def fetch(symbol, period="1mo"):
+        calls.append((symbol, period))
+        release.wait(2)
+        return (symbol, period)
+    
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        futures = [
+            pool.submit(fetch, "AAPL", period="1mo"),
+            pool.submit(fetch, "AAPL", period="1mo"),
+            pool.submit(fetch, "AAPL", period="1y"),
+        ]
+        assert wait_for(lambda: len(calls) == 2 and group.stats()['shared'] == shared + 1)
+        release.set()
+        results = [future.result(2) for future in futures]
+    assert results == [("AAPL", "1mo"), ("AAPL", "1mo"), ("AAPL", "1y")]
+    assert sorted(calls) == [("AAPL", "1mo"), ("AAPL", "1y")]
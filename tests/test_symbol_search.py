@@ -0,0 +1,29 @@
+import httpx
+import pytest
+import yfinance as yf
+from services.stock_service import StockService
+
+
+@pytest.fixture(autouse=True)
+def offline(monkeypatch):
+    def network(*args, **kwargs):
+        raise AssertionError("search made a network call")
+    
+    monkeypatch.setattr(yf, "Ticker", network)
+    monkeypatch.setattr(httpx, "get", network)
+
+
+@pytest.mark.parametrize("query, symbol", [
+    ("AAPL", "AAPL"),
+    ("apple", "AAPL"),
+    ("MICROSOFT", "MSFT"),
+    ("ZWS", "ZWS"),
+    ("BF-B", "BF-B"),
+])
+def test_bundled_listing_answers_offline(query, symbol):
+    assert StockService.search_symbols(query, 5)[0]['symbol'] == symbol
+
+
+def test_unknown_words_stay_offline():
+    for query in ("QWERTYUIOP", "XYZZY", "SOFI"):
+        assert all(result['symbol'] != query for result in StockService.search_symbols(query, 5))